@@ -0,0 +1,72 @@
+"""
+Lastvergleich der beiden Client-Modi der aktuellen Memory-API:
+
+- "threadpool" (MEMORY_API_ASYNC=false): `async def`-Handler, die die
+  blockierenden OpenAI-/Qdrant-Clients per run_in_threadpool aufrufen,
+- "async" (MEMORY_API_ASYNC=true): AsyncOpenAI/AsyncQdrantClient.
+
+Die früheren `def`-Handler (vor MEMORY_API_ASYNC) misst das Skript nicht;
+für diesen Vergleich den Benchmark gegen einen älteren Checkout laufen lassen.
+
+Läuft komplett offline gegen fake_openai.py und In-Memory-Qdrant:
+
+    python bench_async.py --requests 2000 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import json
+from typing import Any, Dict
+
+import httpx
+
+from common import fake_openai, memory_api, run_load
+
+
+async def _seed(client: httpx.AsyncClient, notes: int) -> None:
+    items = [
+        {"text": f"Notiz {i} über Projekt {i % 7}", "metadata": {"project": f"P{i % 7}"}}
+        for i in range(notes)
+    ]
+    for start in range(0, len(items), 100):
+        resp = await client.post("/memory/batch_upsert", json=items[start:start + 100])
+        resp.raise_for_status()
+
+
+async def _bench_mode(base_url: str, args: argparse.Namespace) -> Dict[str, Any]:
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        await _seed(client, args.notes)
+
+        async def one(i: int) -> None:
+            # eindeutige Query, damit der Embedding-Cache nicht greift
+            resp = await client.post(
+                "/memory/search", json={"query": f"Frage {i} zu Projekt {i % 7}", "top_k": 5}
+            )
+            resp.raise_for_status()
+
+        return await run_load(one, args.requests, args.concurrency)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--notes", type=int, default=500)
+    parser.add_argument("--embed-latency-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    fake_env = {"FAKE_EMBED_LATENCY_MS": str(args.embed_latency_ms)}
+    report: Dict[str, Any] = {"config": vars(args), "modes": {}}
+
+    with fake_openai(fake_env) as openai_url:
+        for mode, flag in (("threadpool", "false"), ("async", "true")):
+            env = {"MEMORY_API_ASYNC": flag, "EMBED_CACHE_SIZE": "0"}
+            with memory_api(openai_url, env) as base_url:
+                report["modes"][mode] = asyncio.run(_bench_mode(base_url, args))
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+"""
+End-to-End-Benchmark der Memory-API und der MCP-Tools, komplett offline gegen
+fake_openai.py und In-Memory-Qdrant. Jede Workload läuft gegen eine frisch
+gestartete Memory-API:
+
+- ingest: Einzel- und Batch-Schreibzugriffe (/memory/upsert, /memory/batch_upsert)
+- search: Vektor- und hybride Suche auf vorbefülltem Memory, ein Teil der
+  Queries wiederholt sich (Suchergebnis-Cache)
+- chat: Chat-Turns wie in jar_el_chat_host.py über den MCP-Server (stdio):
+  memory_observe und memory_search_structured parallel, danach die gestreamte
+  Antwort; gemessen bis zum letzten Token, zusätzlich die Zeit bis zum ersten
+
+Der Bericht (JSON auf stdout, mit --output zusätzlich in eine Datei) enthält
+pro Workload Durchsatz, p50/p95/p99, Fehler, die LLM-Token laut Fake-Server
+und die /stats der Memory-API, damit sich Läufe über Änderungen vergleichen
+lassen:
+
+    python bench_e2e.py --requests 500 --concurrency 16 --output before.json
+
+Die chat-Workload braucht das Paket `mcp`. Sind MCP-Client und Memory-API in
+getrennten Umgebungen installiert, den Benchmark mit dem MCP-Interpreter
+starten und BENCH_SERVER_PYTHON auf den der Memory-API setzen.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from common import MCP_DIR, REPO_ROOT, fake_openai, latency_summary, memory_api, run_load
+
+WORKLOADS = ("ingest", "search", "chat")
+
+PROJECTS = ["Jar-El", "Lehre", "Forschung", "Haus", "Reisen", "Finanzen", "Garten"]
+TOPICS = [
+    "Qdrant", "Embeddings", "Klausur", "Vorlesung", "Förderantrag", "Heizung",
+    "Zugverbindung", "Steuererklärung", "Tomaten", "Docker", "Raspberry Pi", "Paper",
+    "Gutachten", "Budget", "Termin", "Backup", "Notebook", "Kalender",
+]
+VERBS = ["nutze", "plane", "verschiebe", "prüfe", "dokumentiere", "bevorzuge", "kaufe"]
+SMALLTALK = ["Danke!", "ok", "Alles klar.", "Hallo", "Super, danke dir", "Gute Nacht"]
+
+
+class TextGenerator:
+    """
+    Deterministische Notizen, Queries und Chat-Nachrichten (gleicher Seed ->
+    gleiche Workload).
+    """
+
+    def __init__(self, seed: int) -> None:
+        self.seed = seed
+
+    def _rng(self, kind: str, i: int) -> random.Random:
+        return random.Random(f"{self.seed}:{kind}:{i}")
+
+    def project(self, i: int) -> str:
+        return PROJECTS[i % len(PROJECTS)]
+
+    def note(self, i: int) -> str:
+        rng = self._rng("note", i)
+        a, b = rng.sample(TOPICS, 2)
+        return (
+            f"Im Projekt {self.project(i)} {rng.choice(VERBS)} ich {a} zusammen mit {b}, "
+            f"Notiz {i}: Entscheidung bis KW {rng.randint(1, 52)}."
+        )
+
+    def query(self, i: int) -> str:
+        rng = self._rng("query", i)
+        a, b = rng.sample(TOPICS, 2)
+        return f"Was hatte ich zu {a} und {b} im Projekt {rng.choice(PROJECTS)} festgehalten?"
+
+    def message(self, i: int) -> str:
+        rng = self._rng("message", i)
+        if rng.random() < 0.3:
+            return rng.choice(SMALLTALK)
+        a, b = rng.sample(TOPICS, 2)
+        return (
+            f"Ich habe mich entschieden, für {self.project(i)} künftig {a} statt {b} zu "
+            f"verwenden, weil es einfacher zu warten ist (Turn {i})."
+        )
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _fake_root(openai_url: str) -> str:
+    return openai_url[: -len("/v1")]
+
+
+async def _reset_llm_stats(client: httpx.AsyncClient, openai_url: str) -> None:
+    (await client.post(_fake_root(openai_url) + "/stats/reset")).raise_for_status()
+
+
+async def _llm_stats(client: httpx.AsyncClient, openai_url: str) -> Dict[str, int]:
+    return (await client.get(_fake_root(openai_url) + "/stats")).json()
+
+
+async def _seed(client: httpx.AsyncClient, gen: TextGenerator, notes: int) -> None:
+    items = [
+        {"text": gen.note(i), "metadata": {"project": gen.project(i)}} for i in range(notes)
+    ]
+    for start in range(0, len(items), 100):
+        resp = await client.post("/memory/batch_upsert", json=items[start:start + 100])
+        resp.raise_for_status()
+
+
+async def _wait_summarize_drained(client: httpx.AsyncClient, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        queue = (await client.get("/stats")).json()["summarize_queue"]
+        if not queue["pending"] and not queue["processing"]:
+            return
+        await asyncio.sleep(0.2)
+
+
+async def _ingest(
+    client: httpx.AsyncClient, gen: TextGenerator, args: argparse.Namespace
+) -> Dict[str, Any]:
+    async def one(i: int) -> None:
+        # jeder fünfte Request schreibt einen Batch, die übrigen einzelne Notizen
+        if i % 5 == 0:
+            base = args.requests + i * args.batch_size
+            items = [
+                {"text": gen.note(base + j), "metadata": {"project": gen.project(base + j)}}
+                for j in range(args.batch_size)
+            ]
+            resp = await client.post("/memory/batch_upsert", json=items)
+        else:
+            resp = await client.post(
+                "/memory/upsert",
+                json={"text": gen.note(i), "metadata": {"project": gen.project(i)}},
+            )
+        resp.raise_for_status()
+
+    return await run_load(one, args.requests, args.concurrency)
+
+
+async def _search(
+    client: httpx.AsyncClient, gen: TextGenerator, args: argparse.Namespace
+) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    # vorab festgelegt, damit die Reihenfolge der Worker das Ergebnis nicht ändert
+    query_ids = [
+        rng.randrange(args.query_pool) if rng.random() < args.repeat_ratio else args.query_pool + i
+        for i in range(args.requests)
+    ]
+
+    async def one(i: int) -> None:
+        resp = await client.post(
+            "/memory/search",
+            json={
+                "query": gen.query(query_ids[i]),
+                "top_k": 5,
+                # Modus je Query fest, damit Wiederholungen den Cache treffen
+                "mode": "hybrid" if query_ids[i] % 2 else "vector",
+            },
+        )
+        resp.raise_for_status()
+
+    return await run_load(one, args.requests, args.concurrency)
+
+
+async def _chat(
+    openai_url: str, api_url: str, gen: TextGenerator, args: argparse.Namespace
+) -> Dict[str, Any]:
+    from mcp import ClientSession, StdioServerParameters
+    from mcp.client.stdio import stdio_client
+    from openai import AsyncOpenAI
+
+    with tempfile.TemporaryDirectory(prefix="jarel-bench-mcp-") as tmp:
+        server = StdioServerParameters(
+            command=sys.executable,
+            args=[str(MCP_DIR / "jar_el_memory_server.py")],
+            env={
+                **os.environ,
+                "OPENAI_API_KEY": "bench",
+                "OPENAI_BASE_URL": openai_url,
+                "MEMORY_API_URL": api_url,
+                "OBSERVE_QUEUE_PATH": os.path.join(tmp, "observe_queue.db"),
+            },
+            cwd=str(MCP_DIR),
+        )
+        chat = AsyncOpenAI(api_key="bench", base_url=openai_url)
+        first_token: List[float] = []
+
+        async with stdio_client(server) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+
+                async def turn(i: int) -> None:
+                    start = time.perf_counter()
+                    text = gen.message(i)
+                    observe = asyncio.create_task(
+                        session.call_tool(
+                            "memory_observe", {"text": text, "role": "user", "channel": "chat"}
+                        )
+                    )
+                    result = await session.call_tool(
+                        "memory_search_structured",
+                        {"query": text, "top_k": 5, "fields": ["text"], "max_text_len": 500},
+                    )
+                    if result.isError:
+                        raise RuntimeError(result.content[0].text)
+                    hits = json.loads(result.content[0].text).get("matches", [])
+                    memory = "\n".join(f"- {h.get('text', '')}" for h in hits)
+                    stream = await chat.chat.completions.create(
+                        model="bench",
+                        messages=[
+                            {"role": "system", "content": "Du bist ein persönlicher Assistent."},
+                            {"role": "system", "content": f"Relevante Erinnerungen:\n{memory}"},
+                            {"role": "user", "content": text},
+                        ],
+                        stream=True,
+                    )
+                    got_first = False
+                    async for chunk in stream:
+                        if not got_first and chunk.choices and chunk.choices[0].delta.content:
+                            first_token.append(time.perf_counter() - start)
+                            got_first = True
+                    if (await observe).isError:
+                        raise RuntimeError("memory_observe fehlgeschlagen")
+
+                report = await run_load(turn, args.requests, args.concurrency)
+                report["first_token"] = latency_summary(first_token)
+
+                # Hintergrundarbeit (Klassifikation, Speichern) vor dem Token-Zählen abwarten
+                deadline = time.monotonic() + 120
+                while time.monotonic() < deadline:
+                    status = json.loads(
+                        (await session.call_tool("memory_status", {})).content[0].text
+                    )
+                    queue = status["observe_queue"]
+                    if not queue.get("pending") and not queue.get("processing"):
+                        break
+                    await asyncio.sleep(0.2)
+                report["mcp_status"] = status
+
+        await chat.close()
+    return report
+
+
+async def _run_workload(
+    name: str, openai_url: str, api_url: str, args: argparse.Namespace
+) -> Dict[str, Any]:
+    if name == "chat":
+        try:
+            import mcp  # noqa: F401
+        except ImportError as exc:
+            return {"skipped": f"MCP-Client nicht verfügbar: {exc}"}
+
+    gen = TextGenerator(args.seed)
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=api_url, limits=limits, timeout=60) as client:
+        if name != "ingest":
+            await _seed(client, gen, args.notes)
+        # Token ohne das Vorbefüllen zählen
+        await _reset_llm_stats(client, openai_url)
+        if name == "ingest":
+            report = await _ingest(client, gen, args)
+        elif name == "search":
+            report = await _search(client, gen, args)
+        else:
+            report = await _chat(openai_url, api_url, gen, args)
+            await _wait_summarize_drained(client)
+        report["llm"] = await _llm_stats(client, openai_url)
+        report["service"] = (await client.get("/stats")).json()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--workloads", default=",".join(WORKLOADS))
+    parser.add_argument(
+        "--requests", type=int, default=500, help="Requests bzw. Turns pro Workload"
+    )
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--notes", type=int, default=1000, help="vorab gespeicherte Notizen")
+    parser.add_argument("--batch-size", type=int, default=20, help="Notizen pro batch_upsert")
+    parser.add_argument(
+        "--repeat-ratio", type=float, default=0.3, help="Anteil wiederholter Queries"
+    )
+    parser.add_argument(
+        "--query-pool", type=int, default=20, help="Queries, aus denen Wiederholungen stammen"
+    )
+    parser.add_argument("--embed-latency-ms", type=float, default=20)
+    parser.add_argument("--chat-latency-ms", type=float, default=200)
+    parser.add_argument("--stream-chunk-ms", type=float, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--label", default="", help="frei wählbare Bezeichnung des Laufs")
+    parser.add_argument("--output", help="Bericht zusätzlich in diese Datei schreiben")
+    args = parser.parse_args()
+
+    workloads = [w.strip() for w in args.workloads.split(",") if w.strip()]
+    unknown = set(workloads) - set(WORKLOADS)
+    if unknown:
+        parser.error(f"unbekannte Workloads: {', '.join(sorted(unknown))}")
+
+    fake_env = {
+        "FAKE_EMBED_LATENCY_MS": str(args.embed_latency_ms),
+        "FAKE_CHAT_LATENCY_MS": str(args.chat_latency_ms),
+        "FAKE_STREAM_CHUNK_MS": str(args.stream_chunk_ms),
+    }
+    report: Dict[str, Any] = {
+        "label": args.label,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "config": vars(args),
+        "workloads": {},
+    }
+
+    with fake_openai(fake_env) as openai_url:
+        for name in workloads:
+            with memory_api(openai_url) as api_url:
+                report["workloads"][name] = asyncio.run(
+                    _run_workload(name, openai_url, api_url, args)
+                )
+                print(f"bench_e2e: {name} fertig", file=sys.stderr)
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
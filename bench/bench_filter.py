@@ -0,0 +1,121 @@
+"""
+Latenz gefilterter gegenüber ungefilterter Vektorsuche bei wachsender
+Collection-Größe.
+
+Standardmäßig gegen lokales In-Memory-Qdrant (dort haben Payload-Indizes
+keine Wirkung); aussagekräftige Werte liefert ein echter Server:
+
+    QDRANT_URL=http://localhost:6343 python bench_filter.py --sizes 10000 50000 200000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, List
+
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import Distance, PointStruct, VectorParams
+
+from common import MEMORY_API_DIR, latency_summary
+
+sys.path.insert(0, str(MEMORY_API_DIR))
+from filters import PAYLOAD_INDEXES, build_filter  # noqa: E402
+
+PROJECTS = [f"Projekt-{i}" for i in range(20)]
+KINDS = ["identity", "preference", "project", "event", "fact", "note", "task", "artifact"]
+TAGS = [f"tag-{i}" for i in range(50)]
+
+QUERIES: Dict[str, Dict[str, Any]] = {
+    "none": {},
+    "project": {"project": "Projekt-3"},
+    "project_kind": {"project": "Projekt-3", "kind": "event"},
+    "tags_any": {"tags": ["tag-1", "tag-2"]},
+    "unbaked_recent": {"baked": False, "created_at": {"gte": "2025-06-01T00:00:00Z"}},
+}
+
+
+def _random_vector(rng: random.Random, dim: int) -> List[float]:
+    return [rng.uniform(-1.0, 1.0) for _ in range(dim)]
+
+
+def _random_payload(rng: random.Random, i: int) -> Dict[str, Any]:
+    month = rng.randint(1, 12)
+    return {
+        "text": f"Notiz {i}",
+        "project": rng.choice(PROJECTS),
+        "kind": rng.choice(KINDS),
+        "tags": rng.sample(TAGS, 3),
+        "visibility": "private",
+        "baked": rng.random() < 0.8,
+        "created_at": f"2025-{month:02d}-{rng.randint(1, 28):02d}T12:00:00Z",
+        "date": f"2025-{month:02d}-{rng.randint(1, 28):02d}",
+    }
+
+
+def _fill(client: QdrantClient, name: str, start: int, stop: int, dim: int, rng: random.Random) -> None:
+    for offset in range(start, stop, 500):
+        points = [
+            PointStruct(id=i, vector=_random_vector(rng, dim), payload=_random_payload(rng, i))
+            for i in range(offset, min(stop, offset + 500))
+        ]
+        client.upsert(collection_name=name, points=points, wait=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    qdrant_url = os.getenv("QDRANT_URL", ":memory:")
+    client = (
+        QdrantClient(location=":memory:") if qdrant_url == ":memory:" else QdrantClient(url=qdrant_url)
+    )
+    name = "jar_el_bench_filter"
+    rng = random.Random(42)
+
+    if client.collection_exists(name):
+        client.delete_collection(name)
+    client.create_collection(
+        collection_name=name,
+        vectors_config=VectorParams(size=args.dim, distance=Distance.COSINE),
+    )
+    for field_name, schema in PAYLOAD_INDEXES.items():
+        client.create_payload_index(collection_name=name, field_name=field_name, field_schema=schema)
+
+    report: Dict[str, Any] = {"qdrant": qdrant_url, "config": vars(args), "sizes": {}}
+    filled = 0
+    try:
+        for size in sorted(args.sizes):
+            _fill(client, name, filled, size, args.dim, rng)
+            filled = size
+
+            results: Dict[str, Any] = {}
+            for label, spec in QUERIES.items():
+                query_filter = build_filter(spec)
+                latencies = []
+                for _ in range(args.queries):
+                    vec = _random_vector(rng, args.dim)
+                    start = time.perf_counter()
+                    client.search(
+                        collection_name=name,
+                        query_vector=vec,
+                        query_filter=query_filter,
+                        limit=args.top_k,
+                    )
+                    latencies.append(time.perf_counter() - start)
+                results[label] = latency_summary(latencies)
+            report["sizes"][str(size)] = results
+    finally:
+        client.delete_collection(name)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
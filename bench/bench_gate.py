@@ -0,0 +1,72 @@
+"""
+Bewertet die lokale Vorentscheidung (mcp/observe_gate.py) auf einem
+gelabelten Beispielsatz: Anteil eingesparter LLM-Klassifikator-Aufrufe,
+Fehlentscheidungen und Latenz des Gates.
+
+    python bench_gate.py --samples gate_samples.jsonl --llm-latency-ms 800
+
+Format der Beispiele (JSONL): {"text": "...", "label": "store|skip", "role": "user"}
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Any, Dict, List
+
+from common import BENCH_DIR, MCP_DIR, latency_summary
+
+sys.path.insert(0, str(MCP_DIR))
+from observe_gate import decide  # noqa: E402
+
+
+def _load(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--samples", default=str(BENCH_DIR / "gate_samples.jsonl"))
+    parser.add_argument(
+        "--llm-latency-ms",
+        type=float,
+        default=800.0,
+        help="angenommene Dauer eines Klassifikator-Aufrufs für die Zeitersparnis",
+    )
+    args = parser.parse_args()
+
+    samples = _load(args.samples)
+    actions = {"skip": 0, "store": 0, "llm": 0}
+    false_skip: List[str] = []
+    false_store: List[str] = []
+    latencies: List[float] = []
+
+    for sample in samples:
+        start = time.perf_counter()
+        decision = decide(sample["text"], sample.get("role", "user"))
+        latencies.append(time.perf_counter() - start)
+
+        actions[decision.action] += 1
+        if decision.action == "skip" and sample["label"] == "store":
+            false_skip.append(sample["text"])
+        elif decision.action == "store" and sample["label"] == "skip":
+            false_store.append(sample["text"])
+
+    avoided = actions["skip"] + actions["store"]
+    decided = max(1, avoided)
+    report = {
+        "samples": len(samples),
+        "decisions": actions,
+        "llm_avoided_ratio": round(avoided / max(1, len(samples)), 4),
+        "gate_accuracy": round((avoided - len(false_skip) - len(false_store)) / decided, 4),
+        "false_skip": false_skip,
+        "false_store": false_store,
+        "estimated_llm_seconds_saved": round(avoided * args.llm_latency_ms / 1000, 2),
+        "gate_latency": latency_summary(latencies),
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
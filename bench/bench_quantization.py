@@ -0,0 +1,161 @@
+"""
+Vergleicht Speicher-Konfigurationen der Memory-Collection: geschätzter
+RAM-Bedarf, recall@k (gegen exakte Suche) und Suchlatenz.
+
+Benötigt einen echten Qdrant-Server (lokales In-Memory-Qdrant kennt weder
+HNSW noch Quantisierung):
+
+    QDRANT_URL=http://localhost:6343 python bench_quantization.py --points 50000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import Distance, PointStruct, SearchParams
+
+from common import MEMORY_API_DIR, latency_summary
+
+sys.path.insert(0, str(MEMORY_API_DIR))
+from collection_config import estimated_ram_bytes, search_params, vectors_config  # noqa: E402
+
+CONFIGS: Dict[str, Dict[str, Any]] = {
+    "float32_ram": {},
+    "float32_on_disk": {"on_disk": True},
+    "scalar_int8": {"quantization": "scalar"},
+    "scalar_int8_on_disk": {"quantization": "scalar", "on_disk": True},
+    "binary": {"quantization": "binary"},
+    "binary_on_disk": {"quantization": "binary", "on_disk": True},
+}
+
+
+def _dataset(points: int, queries: int, dim: int, seed: int = 7) -> tuple:
+    # geclusterte Vektoren ähneln echten Embeddings eher als Gleichverteilung
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(64, dim))
+    labels = rng.integers(0, len(centers), size=points + queries)
+    data = centers[labels] + 0.35 * rng.normal(size=(points + queries, dim))
+    data /= np.linalg.norm(data, axis=1, keepdims=True)
+    data = data.astype(np.float32)
+    return data[:points], data[points:]
+
+
+def _wait_indexed(client: QdrantClient, name: str, timeout: float = 600) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if client.get_collection(name).status.value == "green":
+            return
+        time.sleep(0.5)
+
+
+def _bench_config(
+    client: QdrantClient,
+    name: str,
+    config: Dict[str, Any],
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    args: argparse.Namespace,
+) -> Dict[str, Any]:
+    quantization = config.get("quantization", "none")
+    on_disk = config.get("on_disk", False)
+
+    if client.collection_exists(name):
+        client.delete_collection(name)
+    client.create_collection(
+        collection_name=name,
+        vectors_config=vectors_config(
+            size=vectors.shape[1],
+            distance=Distance.COSINE,
+            on_disk=on_disk,
+            quantization=quantization,
+            hnsw_m=args.hnsw_m,
+            hnsw_ef_construct=args.ef_construct,
+        ),
+    )
+    for start in range(0, len(vectors), 1000):
+        batch = vectors[start:start + 1000]
+        client.upsert(
+            collection_name=name,
+            points=[
+                PointStruct(id=start + i, vector=vec.tolist()) for i, vec in enumerate(batch)
+            ],
+            wait=True,
+        )
+    _wait_indexed(client, name)
+
+    params = search_params(
+        hnsw_ef=args.search_ef, quantization=quantization, oversampling=args.oversampling
+    )
+    latencies: List[float] = []
+    recalls: List[float] = []
+    for query in queries:
+        qvec = query.tolist()
+        exact = client.search(
+            collection_name=name,
+            query_vector=qvec,
+            limit=args.top_k,
+            search_params=SearchParams(exact=True),
+        )
+        start = time.perf_counter()
+        approx = client.search(
+            collection_name=name, query_vector=qvec, limit=args.top_k, search_params=params
+        )
+        latencies.append(time.perf_counter() - start)
+        truth = {p.id for p in exact}
+        recalls.append(len(truth & {p.id for p in approx}) / max(1, len(truth)))
+
+    client.delete_collection(name)
+    return {
+        "estimated_ram_mb": round(
+            estimated_ram_bytes(
+                len(vectors),
+                vectors.shape[1],
+                on_disk=on_disk,
+                quantization=quantization,
+                hnsw_m=args.hnsw_m or 16,
+            )
+            / 2**20,
+            2,
+        ),
+        f"recall_at_{args.top_k}": round(float(np.mean(recalls)), 4),
+        **latency_summary(latencies),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--hnsw-m", type=int, default=None)
+    parser.add_argument("--ef-construct", type=int, default=None)
+    parser.add_argument("--search-ef", type=int, default=None)
+    parser.add_argument("--oversampling", type=float, default=2.0)
+    parser.add_argument("--configs", nargs="+", default=list(CONFIGS), choices=list(CONFIGS))
+    args = parser.parse_args()
+
+    qdrant_url = os.getenv("QDRANT_URL", "http://localhost:6343")
+    client = (
+        QdrantClient(location=":memory:")
+        if qdrant_url == ":memory:"
+        else QdrantClient(url=qdrant_url, timeout=300)
+    )
+    vectors, queries = _dataset(args.points, args.queries, args.dim)
+
+    report: Dict[str, Any] = {"qdrant": qdrant_url, "config": vars(args), "results": {}}
+    for label in args.configs:
+        report["results"][label] = _bench_config(
+            client, f"jar_el_bench_{label}", CONFIGS[label], vectors, queries, args
+        )
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Gemeinsame Hilfsfunktionen für die Offline-Benchmarks.
+"""
+
+import asyncio
+import math
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+import httpx
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_ROOT = BENCH_DIR.parent
+MEMORY_API_DIR = REPO_ROOT / "memory-api"
+MCP_DIR = REPO_ROOT / "mcp"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_healthy(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"Dienst unter {url} nicht erreichbar")
+
+
+@contextmanager
+def uvicorn_server(
+    app: str, cwd: Path, env: Optional[Dict[str, str]] = None, health_path: str = "/docs"
+) -> Iterator[str]:
+    """
+    Startet `uvicorn <app>` als Subprozess und liefert die Basis-URL.
+    BENCH_SERVER_PYTHON wählt einen anderen Interpreter für die Dienste, z.B.
+    wenn MCP-Client und Memory-API in getrennten Umgebungen installiert sind.
+    """
+    port = free_port()
+    proc_env = {**os.environ, **(env or {})}
+    python = os.getenv("BENCH_SERVER_PYTHON") or sys.executable
+    proc = subprocess.Popen(
+        [python, "-m", "uvicorn", app, "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=str(cwd),
+        env=proc_env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        wait_healthy(base_url + health_path)
+        yield base_url
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+@contextmanager
+def fake_openai(env: Optional[Dict[str, str]] = None) -> Iterator[str]:
+    """
+    Startet den Fake-OpenAI-Server und liefert dessen `/v1`-Basis-URL.
+    """
+    with uvicorn_server("fake_openai:app", BENCH_DIR, env) as base_url:
+        yield base_url + "/v1"
+
+
+@contextmanager
+def memory_api(openai_base_url: str, env: Optional[Dict[str, str]] = None) -> Iterator[str]:
+    """
+    Startet die Memory-API gegen den Fake-Server und In-Memory-Qdrant.
+    Die Summarize-Warteschlange liegt in einem temporären Verzeichnis.
+    """
+    with tempfile.TemporaryDirectory(prefix="jarel-bench-") as tmp:
+        api_env = {
+            "OPENAI_API_KEY": "bench",
+            "OPENAI_BASE_URL": openai_base_url,
+            "QDRANT_URL": ":memory:",
+            "QDRANT_VECTOR_SIZE": os.getenv("FAKE_EMBED_DIM", "1024"),
+            "SUMMARIZE_QUEUE_PATH": os.path.join(tmp, "summarize_queue.db"),
+            **(env or {}),
+        }
+        with uvicorn_server(
+            "main:app", MEMORY_API_DIR, api_env, health_path="/health"
+        ) as base_url:
+            yield base_url
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[idx]
+
+
+def latency_summary(latencies_s: List[float]) -> Dict[str, float]:
+    ms = [v * 1000 for v in latencies_s]
+    return {
+        "count": len(ms),
+        "mean_ms": round(sum(ms) / len(ms), 3) if ms else 0.0,
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+    }
+
+
+async def run_load(
+    request: Callable[[int], Awaitable[Any]], total: int, concurrency: int
+) -> Dict[str, Any]:
+    """
+    Führt `total` Requests mit `concurrency` parallelen Workern aus und misst
+    Durchsatz, Latenzen und Fehler.
+    """
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                await request(i)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "requests": total,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "req_per_s": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        **latency_summary(latencies),
+    }
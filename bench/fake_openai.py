@@ -0,0 +1,176 @@
+"""
+Lokaler OpenAI-kompatibler Stand-in für Benchmarks (offline).
+
+Liefert deterministische Embeddings (gleicher Text -> gleicher Vektor) und
+einfache Chat-Antworten mit konfigurierbarer Latenz, auf Wunsch gestreamt
+(`stream=true`). Klassifikator-Prompts des MCP-Servers (JSON-Objekt bzw.
+JSON-Liste) werden mit gültigem JSON beantwortet. GET /stats zählt Anfragen
+und Token seit dem letzten POST /stats/reset.
+
+    FAKE_EMBED_DIM=1024 FAKE_EMBED_LATENCY_MS=20 \
+        uvicorn fake_openai:app --port 9100
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import time
+from collections import Counter
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+EMBED_DIM = int(os.getenv("FAKE_EMBED_DIM", "1024"))
+EMBED_LATENCY_MS = float(os.getenv("FAKE_EMBED_LATENCY_MS", "20"))
+EMBED_PER_ITEM_MS = float(os.getenv("FAKE_EMBED_PER_ITEM_MS", "2"))
+CHAT_LATENCY_MS = float(os.getenv("FAKE_CHAT_LATENCY_MS", "200"))
+# Abstand zwischen gestreamten Chunks (ein Wort pro Chunk)
+STREAM_CHUNK_MS = float(os.getenv("FAKE_STREAM_CHUNK_MS", "5"))
+
+app = FastAPI(title="Fake OpenAI")
+
+usage_stats: Counter = Counter()
+
+
+class EmbeddingRequest(BaseModel):
+    model: str
+    input: Union[str, List[str]]
+
+
+class ChatRequest(BaseModel):
+    model: str
+    messages: List[Dict[str, Any]]
+    temperature: float = 1.0
+    stream: bool = False
+    stream_options: Optional[Dict[str, Any]] = None
+
+
+def fake_vector(text: str, dim: int = EMBED_DIM) -> List[float]:
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+    rng = random.Random(seed)
+    vec = [rng.gauss(0.0, 1.0) for _ in range(dim)]
+    norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+    return [v / norm for v in vec]
+
+
+def _count_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+@app.post("/v1/embeddings")
+async def embeddings(req: EmbeddingRequest) -> Dict[str, Any]:
+    inputs = [req.input] if isinstance(req.input, str) else req.input
+    await asyncio.sleep((EMBED_LATENCY_MS + EMBED_PER_ITEM_MS * len(inputs)) / 1000)
+    tokens = sum(_count_tokens(t) for t in inputs)
+    usage_stats["embedding_requests"] += 1
+    usage_stats["embedding_inputs"] += len(inputs)
+    usage_stats["embedding_tokens"] += tokens
+    return {
+        "object": "list",
+        "model": req.model,
+        "data": [
+            {"object": "embedding", "index": i, "embedding": fake_vector(t)}
+            for i, t in enumerate(inputs)
+        ],
+        "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+    }
+
+
+CLASSIFIER_ITEM = {"project": "Bench", "tags": ["bench"], "kind": "note", "should_store": True}
+
+
+def _answer(messages: List[Dict[str, Any]]) -> str:
+    system = " ".join(str(m.get("content", "")) for m in messages if m.get("role") == "system")
+    user = str(messages[-1].get("content", "")) if messages else ""
+    if "JSON-Liste" in system:
+        count = len(re.findall(r"^\[\d+\] ", user, flags=re.MULTILINE))
+        return json.dumps([{"index": i, **CLASSIFIER_ITEM} for i in range(count)])
+    if "JSON-Objekt" in system:
+        return json.dumps(CLASSIFIER_ITEM)
+    prompt = "\n".join(str(m.get("content", "")) for m in messages)
+    return "Zusammenfassung: " + prompt[-200:].replace("\n", " ")
+
+
+def _chunk(req: ChatRequest, created: int, delta: Dict[str, Any], finish: Optional[str]) -> str:
+    body = {
+        "id": f"chatcmpl-fake-{created}",
+        "object": "chat.completion.chunk",
+        "created": created,
+        "model": req.model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+    }
+    return f"data: {json.dumps(body)}\n\n"
+
+
+async def _stream(req: ChatRequest, answer: str, usage: Dict[str, int]) -> AsyncIterator[str]:
+    created = int(time.time())
+    words = answer.split(" ")
+    for i, word in enumerate(words):
+        if i:
+            await asyncio.sleep(STREAM_CHUNK_MS / 1000)
+        content = word if i == 0 else " " + word
+        delta = {"role": "assistant", "content": content} if i == 0 else {"content": content}
+        yield _chunk(req, created, delta, None)
+    yield _chunk(req, created, {}, "stop")
+    if (req.stream_options or {}).get("include_usage"):
+        body = {
+            "id": f"chatcmpl-fake-{created}",
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": req.model,
+            "choices": [],
+            "usage": usage,
+        }
+        yield f"data: {json.dumps(body)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(req: ChatRequest) -> Any:
+    await asyncio.sleep(CHAT_LATENCY_MS / 1000)
+    prompt = "\n".join(str(m.get("content", "")) for m in req.messages)
+    answer = _answer(req.messages)
+    prompt_tokens = _count_tokens(prompt)
+    completion_tokens = _count_tokens(answer)
+    usage = {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+    usage_stats["chat_requests"] += 1
+    usage_stats["chat_prompt_tokens"] += prompt_tokens
+    usage_stats["chat_completion_tokens"] += completion_tokens
+    if req.stream:
+        usage_stats["chat_streams"] += 1
+        return StreamingResponse(_stream(req, answer, usage), media_type="text/event-stream")
+    return {
+        "id": f"chatcmpl-fake-{time.time_ns()}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": req.model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": answer},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": usage,
+    }
+
+
+@app.get("/stats")
+async def stats() -> Dict[str, int]:
+    return dict(usage_stats)
+
+
+@app.post("/stats/reset")
+async def reset_stats() -> Dict[str, str]:
+    usage_stats.clear()
+    return {"status": "reset"}
@@ -0,0 +1,157 @@
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def estimate_tokens(text: str) -> int:
+    # grobe Schätzung (~4 Zeichen pro Token), ohne Tokenizer-Abhängigkeit
+    return len(text) // 4 + 1
+
+
+def _words(text: str) -> set:
+    return set(WORD_RE.findall(text.lower()))
+
+
+class ContextBuilder:
+    """
+    Baut die Nachrichten eines Chat-Turns innerhalb eines Token-Budgets:
+    jüngste Turns wörtlich, ältere als laufende Zusammenfassung (auf das
+    Summary-Budget gekürzt) und Memory-Treffer nach Score, soweit sie ins
+    Memory-Budget passen.
+    `reserved_tokens` deckt System-Prompt und die nächste Eingabe ab.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 6000,
+        memory_tokens: int = 1500,
+        summary_tokens: int = 600,
+        reserved_tokens: int = 1000,
+        min_recent_messages: int = 4,
+        dedup_overlap: float = 0.8,
+    ) -> None:
+        self.max_tokens = max_tokens
+        self.memory_tokens = memory_tokens
+        self.summary_tokens = summary_tokens
+        self.reserved_tokens = reserved_tokens
+        self.min_recent_messages = min_recent_messages
+        self.dedup_overlap = dedup_overlap
+        self.history: List[Tuple[str, str]] = []  # [(role, content), ...]
+        self.summary = ""
+        self._evicted: List[Tuple[str, str]] = []
+
+    def add_turn(self, user: str, assistant: str) -> None:
+        self.history.append(("user", user))
+        self.history.append(("assistant", assistant))
+        self._trim()
+
+    def _trim(self) -> None:
+        # jüngste Turns rückwärts einsammeln, solange sie ins Verlaufs-Budget passen
+        budget = self.max_tokens - self.reserved_tokens - self.memory_tokens - self.summary_tokens
+        keep = 0
+        for _, content in reversed(self.history):
+            cost = estimate_tokens(content)
+            if keep >= self.min_recent_messages and cost > budget:
+                break
+            budget -= cost
+            keep += 1
+        # nur ganze Turns (user + assistant) behalten
+        keep -= keep % 2
+        cut = len(self.history) - keep
+        if cut > 0:
+            self._evicted.extend(self.history[:cut])
+            self.history = self.history[cut:]
+
+    @property
+    def needs_fold(self) -> bool:
+        return bool(self._evicted)
+
+    def _in_history(self, text: str) -> bool:
+        words = _words(text)
+        if not words:
+            return True
+        contents = [self.summary] + [c for _, c in self.history]
+        return any(len(words & _words(c)) / len(words) >= self.dedup_overlap for c in contents)
+
+    def fit_summary(self, summary: str) -> str:
+        """
+        Kürzt die Zusammenfassung auf das Summary-Budget: ganze Sätze von
+        hinten (jüngster Stand zuerst), ein einzelner zu langer Satz wird
+        am Wortende abgeschnitten.
+        """
+        summary = summary.strip()
+        if estimate_tokens(summary) <= self.summary_tokens:
+            return summary
+        kept: List[str] = []
+        used = 0
+        for sentence in reversed([s for s in SENTENCE_RE.split(summary) if s.strip()]):
+            cost = estimate_tokens(sentence)
+            if used + cost > self.summary_tokens:
+                break
+            kept.insert(0, sentence.strip())
+            used += cost
+        if kept:
+            return " ".join(kept)
+        return summary[: max(self.summary_tokens - 1, 0) * 4].rsplit(" ", 1)[0]
+
+    def select_memory(self, hits: List[Dict[str, Any]]) -> List[str]:
+        """
+        Wählt Memory-Treffer absteigend nach Score, ohne Duplikate zum
+        Verlauf, bis das Memory-Budget erschöpft ist.
+        """
+        chosen: List[str] = []
+        used = 0
+        for hit in sorted(hits, key=lambda h: h.get("score") or 0.0, reverse=True):
+            text = (hit.get("text") or "").strip()
+            if not text or text in chosen or self._in_history(text):
+                continue
+            cost = estimate_tokens(text)
+            if used + cost > self.memory_tokens:
+                continue
+            chosen.append(text)
+            used += cost
+        return chosen
+
+    def build(
+        self, system_prompt: str, user_input: str, hits: List[Dict[str, Any]]
+    ) -> List[Dict[str, str]]:
+        messages = [{"role": "system", "content": system_prompt}]
+        memory = self.select_memory(hits)
+        if memory:
+            messages.append(
+                {
+                    "role": "system",
+                    "content": "Relevante Erinnerungen aus Jar-El:\n\n" + "\n\n".join(
+                        f"- {m}" for m in memory
+                    ),
+                }
+            )
+        summary = self.fit_summary(self.summary)
+        if summary:
+            messages.append(
+                {
+                    "role": "system",
+                    "content": f"Bisheriger Gesprächsverlauf (zusammengefasst):\n{summary}",
+                }
+            )
+        messages.extend({"role": role, "content": content} for role, content in self.history)
+        messages.append({"role": "user", "content": user_input})
+        return messages
+
+    async def fold(self, summarize: Callable[[str, str], Awaitable[str]]) -> None:
+        """
+        Faltet aus dem Fenster gefallene Turns in die laufende Zusammenfassung
+        ein. `summarize(previous_summary, transcript)` liefert die neue.
+        """
+        if not self._evicted:
+            return
+        evicted, self._evicted = self._evicted, []
+        transcript = "\n".join(f"{role}: {content}" for role, content in evicted)
+        try:
+            self.summary = self.fit_summary(await summarize(self.summary, transcript))
+        except Exception:
+            # beim nächsten Mal erneut versuchen
+            self._evicted = evicted + self._evicted
+            raise
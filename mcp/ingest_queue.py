@@ -0,0 +1,140 @@
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List
+
+
+class IngestQueue:
+    """
+    Dauerhafte Warteschlange beobachteter Nachrichten auf SQLite-Basis (WAL).
+    Einträge werden mit einem Lease geholt; nicht bestätigte Einträge werden
+    nach Ablauf des Leases erneut ausgeliefert (z.B. nach einem Absturz) und
+    nach `max_attempts` abgelaufenen oder fehlgeschlagenen Versuchen als
+    'failed' liegen gelassen.
+    """
+
+    def __init__(
+        self, path: str, lease_s: float = 300.0, max_attempts: int = 5, backoff_s: float = 5.0
+    ) -> None:
+        self.lease_s = lease_s
+        self.max_attempts = max_attempts
+        self.backoff_s = backoff_s
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS observations ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " text TEXT NOT NULL,"
+            " role TEXT NOT NULL,"
+            " channel TEXT NOT NULL,"
+            " created_at TEXT NOT NULL,"
+            " status TEXT NOT NULL DEFAULT 'pending',"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " available_at REAL NOT NULL DEFAULT 0,"
+            " error TEXT"
+            ")"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS observations_ready"
+            " ON observations (status, available_at)"
+        )
+
+    def enqueue(self, text: str, role: str, channel: str, created_at: str) -> int:
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO observations (text, role, channel, created_at) VALUES (?, ?, ?, ?)",
+                (text, role, channel, created_at),
+            )
+        self._wakeup.set()
+        return cur.lastrowid
+
+    def enqueue_many(self, texts: List[str], role: str, channel: str, created_at: str) -> int:
+        # ein Commit für alle Texte statt einem pro Nachricht
+        if not texts:
+            return 0
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO observations (text, role, channel, created_at) VALUES (?, ?, ?, ?)",
+                    [(text, role, channel, created_at) for text in texts],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        self._wakeup.set()
+        return len(texts)
+
+    def claim(self, limit: int) -> List[Dict[str, Any]]:
+        """
+        Holt bis zu `limit` fällige Einträge und markiert sie als in Arbeit.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # abgelaufene Leases zählen als Fehlversuch (Absturz mitten in der
+                # Verarbeitung), damit ein "Giftpaket" nicht endlos neu geholt wird
+                self._conn.execute(
+                    "UPDATE observations SET attempts = attempts + 1,"
+                    " status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END,"
+                    " error = COALESCE(error, 'Lease abgelaufen')"
+                    " WHERE status = 'processing' AND available_at <= ?",
+                    (self.max_attempts, now),
+                )
+                rows = self._conn.execute(
+                    "SELECT id, text, role, channel, created_at, attempts FROM observations"
+                    " WHERE status = 'pending' AND available_at <= ?"
+                    " ORDER BY id LIMIT ?",
+                    (now, limit),
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE observations SET status = 'processing', available_at = ? WHERE id = ?",
+                    [(now + self.lease_s, r[0]) for r in rows],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        keys = ("id", "text", "role", "channel", "created_at", "attempts")
+        return [dict(zip(keys, r)) for r in rows]
+
+    def ack(self, ids: List[int]) -> None:
+        with self._lock:
+            self._conn.executemany("DELETE FROM observations WHERE id = ?", [(i,) for i in ids])
+
+    def retry(self, entry_id: int, error: str) -> None:
+        """
+        Gibt einen fehlgeschlagenen Eintrag mit exponentiellem Backoff zurück;
+        nach `max_attempts` Versuchen bleibt er als 'failed' liegen.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT attempts FROM observations WHERE id = ?", (entry_id,)
+            ).fetchone()
+            if row is None:
+                return
+            attempts = row[0] + 1
+            status = "failed" if attempts >= self.max_attempts else "pending"
+            self._conn.execute(
+                "UPDATE observations SET status = ?, attempts = ?, available_at = ?, error = ?"
+                " WHERE id = ?",
+                (status, attempts, time.time() + self.backoff_s * 2 ** (attempts - 1), error, entry_id),
+            )
+
+    def wait(self, timeout: float) -> None:
+        self._wakeup.wait(timeout)
+        self._wakeup.clear()
+
+    def depth(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM observations GROUP BY status"
+            ).fetchall()
+        counts = {"pending": 0, "processing": 0, "failed": 0}
+        counts.update(dict(rows))
+        return counts
@@ -1,9 +1,14 @@
 import asyncio
+import json
 import os
+import threading
+from typing import Any, Dict, List, Optional, Set
 
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
-from openai import OpenAI
+from openai import AsyncOpenAI
+
+from context_builder import ContextBuilder
 
 
 # OpenAI-kompatibles Chat-LLM für die eigentliche Antwort
@@ -11,10 +16,117 @@ CHAT_API_KEY = os.getenv("CHAT_API_KEY", os.getenv("OPENAI_API_KEY"))
 CHAT_BASE_URL = os.getenv("CHAT_BASE_URL", os.getenv("OPENAI_BASE_URL"))
 CHAT_MODEL = os.getenv("CHAT_CHAT_MODEL", "gpt-oss-65k:latest")
 
+# Token-Budgets für den Prompt eines Turns (geschätzt, ~4 Zeichen pro Token)
+CONTEXT_MAX_TOKENS = int(os.getenv("CONTEXT_MAX_TOKENS", "6000"))
+CONTEXT_MEMORY_TOKENS = int(os.getenv("CONTEXT_MEMORY_TOKENS", "1500"))
+CONTEXT_SUMMARY_TOKENS = int(os.getenv("CONTEXT_SUMMARY_TOKENS", "600"))
+CONTEXT_RECENT_MESSAGES = int(os.getenv("CONTEXT_RECENT_MESSAGES", "4"))
+# Mindest-Score für Memory-Treffer (leer = kein Schwellwert)
+MEMORY_MIN_SCORE = float(os.getenv("MEMORY_MIN_SCORE")) if os.getenv("MEMORY_MIN_SCORE") else None
+MEMORY_MAX_TEXT_LEN = int(os.getenv("MEMORY_MAX_TEXT_LEN", "500"))
+
 if not CHAT_API_KEY or not CHAT_BASE_URL:
     raise RuntimeError("CHAT_API_KEY oder CHAT_BASE_URL fehlen")
 
-chat_client = OpenAI(api_key=CHAT_API_KEY, base_url=CHAT_BASE_URL)
+chat_client = AsyncOpenAI(api_key=CHAT_API_KEY, base_url=CHAT_BASE_URL)
+
+# laufende memory_observe-Aufrufe (fire-and-forget, Referenz gegen GC)
+observe_tasks: Set["asyncio.Task[Any]"] = set()
+
+
+def _report_observe(task: "asyncio.Task[Any]") -> None:
+    observe_tasks.discard(task)
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc is not None:
+        print(f"\n[Warnung] memory_observe fehlgeschlagen: {exc}")
+    elif getattr(task.result(), "isError", False):
+        print(f"\n[Warnung] memory_observe meldet Fehler: {task.result().content}")
+
+
+async def read_input(prompt: str) -> str:
+    """
+    Liest eine Zeile von stdin in einem Daemon-Thread, damit laufende
+    Hintergrund-Tasks weiterarbeiten und Strg-C das Programm nicht an einem
+    blockierten input() festhält (to_thread würde beim Beenden darauf warten).
+    """
+    loop = asyncio.get_running_loop()
+    future: "asyncio.Future[str]" = loop.create_future()
+
+    def deliver(result: Optional[str], exc: Optional[BaseException]) -> None:
+        if future.done():
+            return
+        if exc is not None:
+            future.set_exception(exc)
+        else:
+            future.set_result(result)
+
+    def reader() -> None:
+        try:
+            line = input(prompt)
+        except BaseException as exc:
+            loop.call_soon_threadsafe(deliver, None, exc)
+        else:
+            loop.call_soon_threadsafe(deliver, line, None)
+
+    threading.Thread(target=reader, name="chat-stdin", daemon=True).start()
+    return await future
+
+
+async def summarize_history(previous: str, transcript: str) -> str:
+    resp = await chat_client.chat.completions.create(
+        model=CHAT_MODEL,
+        messages=[
+            {
+                "role": "system",
+                "content": (
+                    "Fasse den bisherigen Gesprächsverlauf knapp zusammen "
+                    f"(höchstens ca. {CONTEXT_SUMMARY_TOKENS * 3} Zeichen). "
+                    "Behalte Fakten, Entscheidungen und offene Fragen."
+                ),
+            },
+            {
+                "role": "user",
+                "content": (
+                    f"Bisherige Zusammenfassung:\n{previous or '(noch keine)'}\n\n"
+                    f"Neue Gesprächsteile:\n{transcript}"
+                ),
+            },
+        ],
+        temperature=0.2,
+    )
+    return resp.choices[0].message.content or previous
+
+
+async def _fold_history(context: ContextBuilder) -> None:
+    try:
+        await context.fold(summarize_history)
+    except Exception as exc:
+        print(f"\n[Warnung] Verlauf konnte nicht zusammengefasst werden: {exc}")
+
+
+async def stream_reply(messages: List[Dict[str, str]]) -> str:
+    """
+    Ruft das Chat-LLM mit Streaming auf und gibt die Tokens direkt aus.
+    """
+    stream = await chat_client.chat.completions.create(
+        model=CHAT_MODEL,
+        messages=messages,
+        temperature=0.3,
+        stream=True,
+    )
+    parts: List[str] = []
+    print("Jar-Host: ", end="", flush=True)
+    async for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            parts.append(delta)
+            print(delta, end="", flush=True)
+    print("\n")
+    return "".join(parts)
 
 
 async def chat_loop():
@@ -34,11 +146,22 @@ async def chat_loop():
             print("Verfügbare Tools:", [t.name for t in tools_result.tools])
             print()
 
-            history = []  # [(role, content), ...]
+            context = ContextBuilder(
+                max_tokens=CONTEXT_MAX_TOKENS,
+                memory_tokens=CONTEXT_MEMORY_TOKENS,
+                summary_tokens=CONTEXT_SUMMARY_TOKENS,
+                min_recent_messages=CONTEXT_RECENT_MESSAGES,
+            )
+            fold_task: Optional["asyncio.Task[None]"] = None
 
             while True:
                 try:
-                    user_input = input("Du: ").strip()
+                    user_input = (await read_input("Du: ")).strip()
+                except asyncio.CancelledError:
+                    # Strg-C: asyncio.run bricht den Haupt-Task ab; sauber beenden
+                    asyncio.current_task().uncancel()
+                    print("\nBeende Chat.")
+                    break
                 except (EOFError, KeyboardInterrupt):
                     print("\nBeende Chat.")
                     break
@@ -46,21 +169,9 @@ async def chat_loop():
                 if not user_input:
                     continue
 
-                # 1) Relevante Erinnerungen holen
-                search_result = await session.call_tool(
-                    "memory_search",
-                    {
-                        "query": user_input,
-                        "top_k": 5,
-                    },
-                )
-                memory_context = ""
-                if search_result.content:
-                    memory_context = search_result.content[0].text
-
-                # 2) Aktuelle Nachricht im Hintergrund beobachten/speichern
-                try:
-                    _ = await session.call_tool(
+                # 1) Aktuelle Nachricht im Hintergrund beobachten/speichern (fire-and-forget)
+                observe = asyncio.create_task(
+                    session.call_tool(
                         "memory_observe",
                         {
                             "text": user_input,
@@ -68,8 +179,27 @@ async def chat_loop():
                             "channel": "chat",
                         },
                     )
+                )
+                observe_tasks.add(observe)
+                observe.add_done_callback(_report_observe)
+
+                # 2) Relevante Erinnerungen holen (parallel zu memory_observe)
+                hits: List[Dict[str, Any]] = []
+                try:
+                    search_result = await session.call_tool(
+                        "memory_search_structured",
+                        {
+                            "query": user_input,
+                            "top_k": 5,
+                            "fields": ["text"],
+                            "min_score": MEMORY_MIN_SCORE,
+                            "max_text_len": MEMORY_MAX_TEXT_LEN,
+                        },
+                    )
+                    if search_result.content:
+                        hits = json.loads(search_result.content[0].text).get("matches", [])
                 except Exception as exc:
-                    print(f"[Warnung] memory_observe fehlgeschlagen: {exc}")
+                    print(f"[Warnung] memory_search fehlgeschlagen: {exc}")
 
                 # 3) Chat-LLM mit Memory-Kontext aufrufen
                 system_prompt = (
@@ -78,38 +208,24 @@ async def chat_loop():
                     "aber erfinde keine Fakten dazu."
                 )
 
-                messages = [
-                    {"role": "system", "content": system_prompt},
-                ]
+                # Verlauf und Memory-Treffer im Token-Budget zusammenstellen
+                messages = context.build(system_prompt, user_input, hits)
 
-                if memory_context:
-                    messages.append(
-                        {
-                            "role": "system",
-                            "content": f"Relevante Erinnerungen aus Jar-El:\n\n{memory_context}",
-                        }
-                    )
-
-                # bisherige Unterhaltung anhängen
-                for role, content in history:
-                    messages.append({"role": role, "content": content})
-
-                # aktuelle User-Nachricht
-                messages.append({"role": "user", "content": user_input})
-
-                resp = chat_client.chat.completions.create(
-                    model=CHAT_MODEL,
-                    messages=messages,
-                    temperature=0.3,
-                )
+                assistant_reply = await stream_reply(messages)
 
-                assistant_reply = resp.choices[0].message.content
-                print(f"Jar-Host: {assistant_reply}\n")
+                # Verlauf aktualisieren; herausgefallene Turns im Hintergrund zusammenfassen
+                context.add_turn(user_input, assistant_reply)
+                if context.needs_fold and (fold_task is None or fold_task.done()):
+                    fold_task = asyncio.create_task(_fold_history(context))
 
-                # Verlauf aktualisieren
-                history.append(("user", user_input))
-                history.append(("assistant", assistant_reply))
+            # ausstehende Beobachtungen noch abschließen, bevor die Session endet
+            if observe_tasks:
+                await asyncio.wait(set(observe_tasks), timeout=10)
 
 
 if __name__ == "__main__":
-    asyncio.run(chat_loop())
+    try:
+        asyncio.run(chat_loop())
+    except KeyboardInterrupt:
+        # Strg-C während einer laufenden Antwort
+        print("\nBeende Chat.")
@@ -1,13 +1,24 @@
 # /jar-el/mcp/jar_el_memory_server.py
 
+import asyncio
 import json
 import os
-from typing import Any, Dict, List
+import threading
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
 
-import requests
 from dotenv import load_dotenv
 from openai import OpenAI
 from mcp.server.fastmcp import FastMCP
+from prometheus_client import start_http_server
+from starlette.requests import Request
+from starlette.responses import Response
+
+from ingest_queue import IngestQueue
+from memory_http import CircuitBreaker, MemoryApiError, MemoryHttp
+from observe_gate import GateDecision, decide, gate, gate_stats
+from telemetry import metrics_payload, record_usage, span, traced
 
 load_dotenv()
 
@@ -15,48 +26,86 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")
 CHAT_MODEL = os.getenv("OPENAI_CHAT_MODEL", "GPT-OSS20B")
 MEMORY_API_URL = os.getenv("MEMORY_API_URL", "http://localhost:8000")
+# lokale Vorentscheidung vor dem LLM-Klassifikator (siehe observe_gate.py)
+OBSERVE_GATE = os.getenv("OBSERVE_GATE", "true").lower() in ("1", "true", "yes")
+# memory_observe schreibt in eine dauerhafte Warteschlange und kehrt sofort zurück
+OBSERVE_QUEUE = os.getenv("OBSERVE_QUEUE", "true").lower() in ("1", "true", "yes")
+OBSERVE_QUEUE_PATH = os.getenv("OBSERVE_QUEUE_PATH", "observe_queue.db")
+OBSERVE_WORKERS = int(os.getenv("OBSERVE_WORKERS", "2"))
+OBSERVE_BATCH_SIZE = int(os.getenv("OBSERVE_BATCH_SIZE", "8"))
+# HTTP-Zugriff auf die Memory-API (Pool, Timeouts pro Endpunkt, Retries, Circuit Breaker)
+MEMORY_SEARCH_TIMEOUT = float(os.getenv("MEMORY_SEARCH_TIMEOUT", "5"))
+MEMORY_WRITE_TIMEOUT = float(os.getenv("MEMORY_WRITE_TIMEOUT", "10"))
+MEMORY_API_RETRIES = int(os.getenv("MEMORY_API_RETRIES", "2"))
+MEMORY_API_MAX_CONNECTIONS = int(os.getenv("MEMORY_API_MAX_CONNECTIONS", "32"))
+MEMORY_API_BREAKER_FAILURES = int(os.getenv("MEMORY_API_BREAKER_FAILURES", "5"))
+MEMORY_API_BREAKER_RESET = float(os.getenv("MEMORY_API_BREAKER_RESET", "30"))
+
+# /metrics beim STDIO-Transport auf eigenem Port (0 = aus); HTTP-Transport: /metrics
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
 
 if not OPENAI_API_KEY or not OPENAI_BASE_URL:
     raise RuntimeError("OPENAI_API_KEY oder OPENAI_BASE_URL fehlt")
 
 client_oa = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
 
-# FastMCP-Server initialisieren
-mcp = FastMCP("jar-el-memory")
+memory_http = MemoryHttp(
+    MEMORY_API_URL,
+    timeouts={
+        "/memory/search": MEMORY_SEARCH_TIMEOUT,
+        "/memory/summarize_and_store": MEMORY_WRITE_TIMEOUT,
+    },
+    retries=MEMORY_API_RETRIES,
+    max_connections=MEMORY_API_MAX_CONNECTIONS,
+    breaker=CircuitBreaker(MEMORY_API_BREAKER_FAILURES, MEMORY_API_BREAKER_RESET),
+)
+
+observe_queue = IngestQueue(OBSERVE_QUEUE_PATH) if OBSERVE_QUEUE else None
+_observe_workers: List[threading.Thread] = []
+_observe_workers_lock = threading.Lock()
 
 
-def _memory_post(path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+def start_observe_workers() -> None:
     """
-    Hilfsfunktion für HTTP-POSTs an die Memory-API.
+    Startet die Worker, die die Warteschlange abarbeiten. Idempotent, da die
+    Lifespan beim Streamable-HTTP-Transport pro Session läuft.
     """
-    url = f"{MEMORY_API_URL}{path}"
-    resp = requests.post(url, json=payload, timeout=30)
-    resp.raise_for_status()
-    return resp.json()
+    if observe_queue is None:
+        return
+    with _observe_workers_lock:
+        if _observe_workers:
+            return
+        for i in range(OBSERVE_WORKERS):
+            worker = threading.Thread(
+                target=_observe_worker, name=f"observe-worker-{i}", daemon=True
+            )
+            worker.start()
+            _observe_workers.append(worker)
 
 
-def classify_and_extract_metadata(text: str) -> Dict[str, Any]:
-    """
-    Nutzt dein Chat-Modell, um Projekt, Tags, kind, should_store
-    und optionale Zusatzfelder (Schema v2) zu bestimmen.
-    Gibt ein JSON-Objekt zurück.
-    """
-    system_prompt = (
-        "Du analysierst Benutzeraussagen und entscheidest, ob sie für ein "
-        "langfristiges persönliches Wissensgedächtnis (Jar-El) speicherwürdig sind. "
-        "Du gibst AUSSCHLIESSLICH ein JSON-Objekt oder 'null' zurück.\n\n"
-        "Speichern:\n"
-        "- Biografische Infos, Rollen, Projekte, Events, Pläne, Entscheidungen,\n"
-        "  Präferenzen, wichtige Fakten, Lehrinhalte.\n"
-        "Nicht speichern:\n"
-        "- Rückfragen des Assistenten, rein kurzfristige Organisatorik,\n"
-        "  Smalltalk ohne Relevanz, Meta-Kommentare über das Modell.\n"
-    )
+@asynccontextmanager
+async def lifespan(server: FastMCP) -> AsyncIterator[None]:
+    start_observe_workers()
+    yield
 
-    user_prompt = f"""
-Text:
-\"\"\"{text}\"\"\"
 
+# FastMCP-Server initialisieren
+mcp = FastMCP("jar-el-memory", lifespan=lifespan)
+
+
+CLASSIFIER_SYSTEM_PROMPT = (
+    "Du analysierst Benutzeraussagen und entscheidest, ob sie für ein "
+    "langfristiges persönliches Wissensgedächtnis (Jar-El) speicherwürdig sind. "
+    "Du gibst AUSSCHLIESSLICH ein JSON-Objekt oder 'null' zurück.\n\n"
+    "Speichern:\n"
+    "- Biografische Infos, Rollen, Projekte, Events, Pläne, Entscheidungen,\n"
+    "  Präferenzen, wichtige Fakten, Lehrinhalte.\n"
+    "Nicht speichern:\n"
+    "- Rückfragen des Assistenten, rein kurzfristige Organisatorik,\n"
+    "  Smalltalk ohne Relevanz, Meta-Kommentare über das Modell.\n"
+)
+
+CLASSIFIER_TASK = """
 Aufgabe:
 1. Erkenne, ob der Text langfristig relevant ist.
 2. Ermittele ein Projektlabel (z.B. "Jar-El", "KI-Literacy", "Erendria", "Allgemein").
@@ -67,7 +116,7 @@ Aufgabe:
 7. Schätze eine confidence zwischen 0 und 1.
 
 Format (JSON):
-{{
+{
   "project": "...",
   "tags": ["...", "..."],
   "kind": "identity|preference|project|event|fact|note|task|artifact",
@@ -87,7 +136,54 @@ Format (JSON):
   "file_path": null,
   "confidence": Zahl zwischen 0 und 1,
   "visibility": "private"
-}}
+}
+""".strip()
+
+# Felder des Schema v2, die ohne Angabe des Modells auf null stehen
+OPTIONAL_FIELDS = [
+    "event_name",
+    "date",
+    "end_date",
+    "location",
+    "people",
+    "orgs",
+    "topics",
+    "status",
+    "deadline",
+    "priority",
+    "artifact_type",
+    "file_name",
+    "file_path",
+]
+
+NOT_STORED = {"project": "Allgemein", "tags": [], "kind": "note", "should_store": False}
+
+
+def _with_defaults(data: Dict[str, Any]) -> Dict[str, Any]:
+    # Defaults für wichtige Felder setzen
+    data.setdefault("project", "Allgemein")
+    data.setdefault("tags", [])
+    data.setdefault("kind", "note")
+    data.setdefault("should_store", True)
+    for key in OPTIONAL_FIELDS:
+        data.setdefault(key, None)
+    data.setdefault("confidence", 0.9)
+    data.setdefault("visibility", "private")
+    return data
+
+
+@traced("classify_and_extract_metadata")
+def classify_and_extract_metadata(text: str) -> Dict[str, Any]:
+    """
+    Nutzt dein Chat-Modell, um Projekt, Tags, kind, should_store
+    und optionale Zusatzfelder (Schema v2) zu bestimmen.
+    Gibt ein JSON-Objekt zurück.
+    """
+    user_prompt = f"""
+Text:
+\"\"\"{text}\"\"\"
+
+{CLASSIFIER_TASK}
 
 Wenn der Inhalt NICHT speicherwürdig ist, gib exakt:
 null
@@ -97,22 +193,18 @@ null
     resp = client_oa.chat.completions.create(
         model=CHAT_MODEL,
         messages=[
-            {"role": "system", "content": system_prompt},
+            {"role": "system", "content": CLASSIFIER_SYSTEM_PROMPT},
             {"role": "user", "content": user_prompt},
         ],
         temperature=0.1,
     )
+    record_usage("classify_and_extract_metadata", CHAT_MODEL, resp.usage)
 
     content = resp.choices[0].message.content.strip()
 
     if content == "null":
         # explizit nichts speichern
-        return {
-            "project": "Allgemein",
-            "tags": [],
-            "kind": "note",
-            "should_store": False,
-        }
+        return dict(NOT_STORED)
 
     try:
         data = json.loads(content)
@@ -125,38 +217,105 @@ null
             "should_store": True,
         }
 
-    # Defaults für wichtige Felder setzen
-    data.setdefault("project", "Allgemein")
-    data.setdefault("tags", [])
-    data.setdefault("kind", "note")
-    data.setdefault("should_store", True)
-    data.setdefault("event_name", None)
-    data.setdefault("date", None)
-    data.setdefault("end_date", None)
-    data.setdefault("location", None)
-    data.setdefault("people", None)
-    data.setdefault("orgs", None)
-    data.setdefault("topics", None)
-    data.setdefault("status", None)
-    data.setdefault("deadline", None)
-    data.setdefault("priority", None)
-    data.setdefault("artifact_type", None)
-    data.setdefault("file_name", None)
-    data.setdefault("file_path", None)
-    data.setdefault("confidence", 0.9)
-    data.setdefault("visibility", "private")
+    return _with_defaults(data)
 
-    return data
+
+def _parse_batch_results(content: str, count: int) -> Dict[int, Dict[str, Any]]:
+    """
+    Liest die JSON-Liste der Batch-Klassifikation und gibt nur die gültigen
+    Einträge zurück (Index -> Metadaten).
+    """
+    start, end = content.find("["), content.rfind("]")
+    try:
+        items = json.loads(content[start:end + 1]) if start >= 0 else None
+    except json.JSONDecodeError:
+        items = None
+    if not isinstance(items, list):
+        return {}
+
+    results: Dict[int, Dict[str, Any]] = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        index = item.pop("index", None)
+        if not isinstance(index, int) or not 0 <= index < count or index in results:
+            continue
+        if not isinstance(item.get("should_store"), bool):
+            continue
+        if not isinstance(item.get("tags", []), list):
+            continue
+        results[index] = dict(NOT_STORED) if not item["should_store"] else _with_defaults(item)
+    return results
+
+
+@traced("classify_batch")
+def _classify_batch_once(texts: List[str]) -> Dict[int, Dict[str, Any]]:
+    listing = "\n".join(f"[{i}] {json.dumps(t, ensure_ascii=False)}" for i, t in enumerate(texts))
+    user_prompt = f"""
+Texte (nummeriert):
+{listing}
+
+Bearbeite JEDEN Text einzeln.
+{CLASSIFIER_TASK}
+
+Gib eine JSON-Liste mit genau einem Objekt pro Text zurück. Jedes Objekt hat
+zusätzlich das Feld "index" mit der Nummer des Textes. Für nicht speicherwürdige
+Texte genügt {{"index": n, "should_store": false}}.
+""".strip()
+
+    resp = client_oa.chat.completions.create(
+        model=CHAT_MODEL,
+        messages=[
+            {
+                "role": "system",
+                "content": CLASSIFIER_SYSTEM_PROMPT.replace(
+                    "ein JSON-Objekt oder 'null'", "eine JSON-Liste"
+                ),
+            },
+            {"role": "user", "content": user_prompt},
+        ],
+        temperature=0.1,
+    )
+    record_usage("classify_batch", CHAT_MODEL, resp.usage)
+    return _parse_batch_results(resp.choices[0].message.content or "", len(texts))
+
+
+def classify_batch(texts: List[str]) -> List[Dict[str, Any]]:
+    """
+    Klassifiziert mehrere Texte mit einem LLM-Aufruf (Schema-Prompt nur einmal).
+    Ungültige oder fehlende Einträge werden einmal gesammelt wiederholt und
+    danach einzeln klassifiziert.
+    """
+    if not texts:
+        return []
+    if len(texts) == 1:
+        return [classify_and_extract_metadata(texts[0])]
+
+    results = _classify_batch_once(texts)
+    missing = [i for i in range(len(texts)) if i not in results]
+    if 1 < len(missing) < len(texts):
+        retried = _classify_batch_once([texts[i] for i in missing])
+        for pos, i in enumerate(missing):
+            if pos in retried:
+                results[i] = retried[pos]
+    for i in range(len(texts)):
+        if i not in results:
+            results[i] = classify_and_extract_metadata(texts[i])
+    return [results[i] for i in range(len(texts))]
 
 
 @mcp.tool()
-def memory_search(query: str, top_k: int = 5) -> str:
+@traced("tool.memory_search")
+async def memory_search(query: str, top_k: int = 5) -> str:
     """
     Semantische Suche im Jar-El Memory.
     Gibt ein lesbares Text-Listing der Treffer zurück.
     """
     payload = {"query": query, "top_k": top_k}
-    result = _memory_post("/memory/search", payload)
+    try:
+        result = await memory_http.post("/memory/search", payload, idempotent=True)
+    except MemoryApiError as exc:
+        return f"Memory-Suche nicht verfügbar: {exc}"
 
     text_parts: List[str] = []
     for match in result.get("matches", []):
@@ -172,24 +331,112 @@ def memory_search(query: str, top_k: int = 5) -> str:
     return "\n\n---\n\n".join(text_parts)
 
 
+DEFAULT_SEARCH_FIELDS = ["text", "project", "kind", "tags", "created_at"]
+
+
+def _shorten(text: str, max_len: int) -> str:
+    if max_len <= 0 or len(text) <= max_len:
+        return text
+    return text[: max_len - 1].rstrip() + "…"
+
+
+def _render_compact(matches: List[Dict[str, Any]]) -> str:
+    lines = []
+    for m in matches:
+        label = "/".join(str(m[k]) for k in ("project", "kind") if m.get(k))
+        prefix = f"[{m['score']:.2f}]" + (f" ({label})" if label else "")
+        lines.append(f"- {prefix} {m.get('text', '')}")
+    return "\n".join(lines)
+
+
 @mcp.tool()
-def memory_observe(text: str, role: str = "user", channel: str = "chat") -> str:
+@traced("tool.memory_search_structured")
+async def memory_search_structured(
+    query: str,
+    top_k: int = 5,
+    fields: Optional[List[str]] = None,
+    min_score: Optional[float] = None,
+    max_text_len: int = 500,
+    compact: bool = False,
+    filter: Optional[Dict[str, Any]] = None,
+    mode: str = "vector",
+) -> str:
     """
-    Beobachtet eine Chat-Nachricht und speichert sie ggf. automatisch im Memory.
-    Sollte vom Host nach jeder relevanten User-Nachricht im Hintergrund
-    aufgerufen werden.
+    Suche im Jar-El Memory mit strukturiertem Ergebnis.
+    Gibt JSON {"matches": [{"id", "score", <fields>}]} zurück; mit compact=true
+    stattdessen eine knappe Zeile pro Treffer für Prompts. `fields` wählt die
+    Payload-Felder (Standard: text, project, kind, tags, created_at),
+    `min_score` (0..1) verwirft schwächere Treffer; die Memory-API liefert in
+    jedem mode einen auf 0..1 normierten score. `max_text_len` kürzt den Text,
+    `filter` und `mode` ("vector"/"hybrid") wie in /memory/search.
     """
-    from datetime import datetime
-
-    text_clean = text.strip()
-    if not text_clean:
-        return "Leerer Text, nichts zu speichern."
+    payload: Dict[str, Any] = {"query": query, "top_k": top_k, "mode": mode}
+    if filter:
+        payload["filter"] = filter
+    try:
+        result = await memory_http.post("/memory/search", payload, idempotent=True)
+    except MemoryApiError as exc:
+        return json.dumps({"matches": [], "error": str(exc)}, ensure_ascii=False)
 
-    meta = classify_and_extract_metadata(text_clean)
+    selected = fields or DEFAULT_SEARCH_FIELDS
+    matches: List[Dict[str, Any]] = []
+    for match in result.get("matches", []):
+        score = match.get("score") or 0.0
+        if min_score is not None and score < min_score:
+            continue
+        data = match.get("payload") or {}
+        item: Dict[str, Any] = {"id": match.get("id"), "score": round(score, 4)}
+        for key in selected:
+            if data.get(key) is not None:
+                item[key] = data[key]
+        if isinstance(item.get("text"), str):
+            item["text"] = _shorten(item["text"], max_text_len)
+        matches.append(item)
+
+    if compact:
+        return _render_compact(matches) or "Keine Treffer im Memory."
+    return json.dumps({"matches": matches}, ensure_ascii=False)
+
+
+def _gate_metadata(decision: Optional[GateDecision]) -> Optional[Dict[str, Any]]:
+    if decision is not None and decision.action == "store":
+        # eindeutiger Speicherwunsch: ohne LLM, mit Standard-Metadaten
+        return {"kind": decision.kind, "tags": [], "confidence": 0.7}
+    return None
+
+
+def classify_observations(texts: List[str], roles: List[str]) -> List[Dict[str, Any]]:
+    """
+    Metadaten für mehrere Nachrichten: eindeutige Fälle über das Gate,
+    alle übrigen gemeinsam über den Batch-Klassifikator.
+    """
+    metas: List[Optional[Dict[str, Any]]] = [
+        _gate_metadata(decide(t, r)) if OBSERVE_GATE else None for t, r in zip(texts, roles)
+    ]
+    pending = [i for i, m in enumerate(metas) if m is None]
+    for start in range(0, len(pending), OBSERVE_BATCH_SIZE):
+        chunk = pending[start:start + OBSERVE_BATCH_SIZE]
+        for i, meta in zip(chunk, classify_batch([texts[i] for i in chunk])):
+            metas[i] = meta
+    return metas
+
+
+def store_observation(
+    text: str,
+    role: str,
+    channel: str,
+    created_at: str,
+    meta: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    Legt eine beobachtete Nachricht mit ihren Metadaten über
+    /memory/summarize_and_store im Memory ab (ohne `meta` wird klassifiziert).
+    """
+    if meta is None:
+        meta = classify_and_extract_metadata(text)
     if not meta.get("should_store", True):
         return "Nicht speicherwürdig, übersprungen."
 
-    created_at = datetime.utcnow().isoformat() + "Z"
     source_host = os.getenv("MEMORY_SOURCE_HOST", "OpenWebUI")
 
     # Basis-Metadaten
@@ -206,32 +453,17 @@ def memory_observe(text: str, role: str = "user", channel: str = "chat") -> str:
     }
 
     # Optionale Felder aus Schema v2 übernehmen, falls gesetzt
-    optional_keys = [
-        "event_name",
-        "date",
-        "end_date",
-        "location",
-        "people",
-        "orgs",
-        "topics",
-        "status",
-        "deadline",
-        "priority",
-        "artifact_type",
-        "file_name",
-        "file_path",
-    ]
-    for key in optional_keys:
+    for key in OPTIONAL_FIELDS:
         value = meta.get(key)
         if value is not None:
             metadata[key] = value
 
     summarize_payload = {
-        "texts": [text_clean],
+        "texts": [text],
         "metadata": metadata,
     }
 
-    _memory_post("/memory/summarize_and_store", summarize_payload)
+    memory_http.post_sync("/memory/summarize_and_store", summarize_payload)
 
     return (
         "Im Memory gespeichert "
@@ -240,7 +472,135 @@ def memory_observe(text: str, role: str = "user", channel: str = "chat") -> str:
     )
 
 
+def _observe_worker() -> None:
+    while True:
+        entries = observe_queue.claim(OBSERVE_BATCH_SIZE)
+        if not entries:
+            observe_queue.wait(timeout=5.0)
+            continue
+        # ein Trace pro Batch, weitergereicht an die Memory-API
+        with span("observe_batch", entries=len(entries)):
+            _process_observe_batch(entries)
+
+
+def _process_observe_batch(entries: List[Dict[str, Any]]) -> None:
+    try:
+        metas = classify_observations([e["text"] for e in entries], [e["role"] for e in entries])
+    except Exception as exc:
+        print(f"Observe-Queue: Klassifikation fehlgeschlagen: {exc}")
+        for entry in entries:
+            observe_queue.retry(entry["id"], str(exc))
+        return
+    for entry, meta in zip(entries, metas):
+        try:
+            store_observation(
+                entry["text"], entry["role"], entry["channel"], entry["created_at"], meta
+            )
+        except Exception as exc:
+            print(f"Observe-Queue: Eintrag {entry['id']} fehlgeschlagen: {exc}")
+            observe_queue.retry(entry["id"], str(exc))
+        else:
+            observe_queue.ack([entry["id"]])
+
+
+@mcp.tool()
+@traced("tool.memory_observe")
+async def memory_observe(text: str, role: str = "user", channel: str = "chat") -> str:
+    """
+    Beobachtet eine Chat-Nachricht und speichert sie ggf. automatisch im Memory.
+    Sollte vom Host nach jeder relevanten User-Nachricht im Hintergrund
+    aufgerufen werden. Klassifikation und Speichern laufen asynchron über
+    die Warteschlange.
+    """
+    text_clean = text.strip()
+    if not text_clean:
+        return "Leerer Text, nichts zu speichern."
+
+    decision = gate(text_clean, role) if OBSERVE_GATE else None
+    if decision is not None and decision.action == "skip":
+        return f"Nicht speicherwürdig ({decision.reason}), übersprungen."
+
+    created_at = datetime.utcnow().isoformat() + "Z"
+    if observe_queue is None:
+        return await asyncio.to_thread(
+            store_observation, text_clean, role, channel, created_at, _gate_metadata(decision)
+        )
+
+    start_observe_workers()
+    # SQLite-Commit und Queue-Sperre der Worker nicht im Event-Loop abwarten
+    entry_id = await asyncio.to_thread(
+        observe_queue.enqueue, text_clean, role, channel, created_at
+    )
+    return f"Zur Speicherung vorgemerkt (Warteschlange, Eintrag {entry_id})."
+
+
+@mcp.tool()
+@traced("tool.memory_observe_batch")
+async def memory_observe_batch(texts: List[str], role: str = "user", channel: str = "chat") -> str:
+    """
+    Beobachtet mehrere Nachrichten auf einmal (z.B. Import oder Replay eines
+    Gesprächs). Die Klassifikation erfolgt gebündelt mit einem LLM-Aufruf
+    pro Batch.
+    """
+    created_at = datetime.utcnow().isoformat() + "Z"
+    accepted: List[str] = []
+    skipped = 0
+    for text in texts:
+        text_clean = text.strip()
+        decision = gate(text_clean, role) if OBSERVE_GATE and text_clean else None
+        if not text_clean or (decision is not None and decision.action == "skip"):
+            skipped += 1
+            continue
+        accepted.append(text_clean)
+
+    if observe_queue is not None:
+        start_observe_workers()
+        await asyncio.to_thread(observe_queue.enqueue_many, accepted, role, channel, created_at)
+        return (
+            f"{len(accepted)} Nachrichten zur Speicherung vorgemerkt, "
+            f"{skipped} übersprungen."
+        )
+
+    def classify_and_store() -> int:
+        stored = 0
+        metas = classify_observations(accepted, [role] * len(accepted))
+        for text_clean, meta in zip(accepted, metas):
+            if meta.get("should_store", True):
+                store_observation(text_clean, role, channel, created_at, meta)
+                stored += 1
+        return stored
+
+    stored = await asyncio.to_thread(classify_and_store)
+    return f"{stored} Nachrichten gespeichert, {len(texts) - stored} übersprungen."
+
+
+@mcp.tool()
+@traced("tool.memory_status")
+async def memory_status() -> str:
+    """
+    Zähler des Memory-Servers als JSON, u.a. wie viele Klassifikator-Aufrufe
+    die lokale Vorentscheidung eingespart hat.
+    """
+    status: Dict[str, Any] = {
+        "observe_gate": {"enabled": OBSERVE_GATE, **gate_stats.snapshot()},
+        "observe_queue": {"enabled": observe_queue is not None},
+        "memory_http": memory_http.snapshot(),
+    }
+    if observe_queue is not None:
+        depth = await asyncio.to_thread(observe_queue.depth)
+        status["observe_queue"].update({"workers": len(_observe_workers), **depth})
+    return json.dumps(status)
+
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics(request: Request) -> Response:
+    body, content_type = metrics_payload()
+    return Response(content=body, media_type=content_type)
+
+
 def main() -> None:
+    if METRICS_PORT:
+        start_http_server(METRICS_PORT)
     # MCP-Server über STDIO laufen lassen
     mcp.run(transport="stdio")
 
@@ -0,0 +1,218 @@
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+
+from telemetry import span, trace_headers
+
+# Statuscodes, bei denen ein erneuter Versuch sinnvoll ist
+RETRY_STATUS = {429, 502, 503, 504}
+
+
+class MemoryApiError(RuntimeError):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Öffnet nach `failure_threshold` aufeinanderfolgenden Fehlern und lässt
+    dann `reset_after` Sekunden lang keine Anfragen durch. Danach darf eine
+    Probeanfrage passieren (halb offen).
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_after: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_after:
+                return "half-open"
+            return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_after or self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def record_abort(self) -> None:
+        # Anfrage ohne Ergebnis abgebrochen (z. B. CancelledError): eine laufende
+        # Probe gilt als fehlgeschlagen, sonst bliebe der Breaker für immer halb offen
+        with self._lock:
+            if self._probing:
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+
+class MemoryHttp:
+    """
+    HTTP-Zugriff auf die Memory-API mit Keep-Alive-Pool, Timeouts pro
+    Endpunkt, Wiederholungen mit Jitter und Circuit Breaker. `post` für
+    Tools im Event-Loop, `post_sync` für die Worker-Threads. Die Trace-ID des
+    laufenden Spans geht als TRACE_HEADER an die Memory-API.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeouts: Dict[str, float],
+        default_timeout: float = 10.0,
+        retries: int = 2,
+        backoff: float = 0.2,
+        max_connections: int = 32,
+        breaker: Optional[CircuitBreaker] = None,
+    ) -> None:
+        self.base_url = base_url
+        self.timeouts = timeouts
+        self.default_timeout = default_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self._limits = httpx.Limits(
+            max_connections=max_connections, max_keepalive_connections=max_connections
+        )
+        self._async: Optional[httpx.AsyncClient] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sync = httpx.Client(base_url=base_url, limits=self._limits)
+        self.stats = {"requests": 0, "retries": 0, "failures": 0, "rejected": 0}
+
+    def _timeout(self, path: str) -> httpx.Timeout:
+        total = self.timeouts.get(path, self.default_timeout)
+        return httpx.Timeout(total, connect=min(total, 3.0))
+
+    def _delay(self, attempt: int) -> float:
+        # "full jitter": zufällig zwischen 0 und dem exponentiellen Backoff
+        return random.uniform(0, self.backoff * 2 ** attempt)
+
+    @staticmethod
+    def _retryable(exc: Exception, idempotent: bool) -> bool:
+        if isinstance(exc, httpx.HTTPStatusError):
+            return exc.response.status_code in RETRY_STATUS
+        if isinstance(exc, httpx.ConnectError):
+            # Anfrage hat den Server nicht erreicht -> auch Schreibzugriffe wiederholbar
+            return True
+        return idempotent and isinstance(exc, httpx.TransportError)
+
+    async def _close_async(self) -> None:
+        # Client des vorherigen Event-Loops schließen, damit seine Verbindungen nicht offen bleiben
+        old, old_loop = self._async, self._async_loop
+        self._async = self._async_loop = None
+        if old is None:
+            return
+        if old_loop is not None and old_loop.is_running():
+            asyncio.run_coroutine_threadsafe(old.aclose(), old_loop)
+            return
+        try:
+            await old.aclose()
+        except RuntimeError:
+            # Loop bereits geschlossen: die Sockets sind dort nicht mehr erreichbar
+            pass
+
+    def _check_breaker(self, path: str) -> None:
+        if not self.breaker.allow():
+            self.stats["rejected"] += 1
+            raise MemoryApiError(f"Memory-API vorübergehend gesperrt (Circuit Breaker), {path}")
+
+    def _record(self, exc: Optional[Exception]) -> None:
+        # 4xx sind Fehler des Aufrufers bzw. Gegendruck, kein Zeichen einer gestörten API
+        if exc is None or (
+            isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code < 500
+        ):
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+            self.stats["failures"] += 1
+
+    async def post(
+        self, path: str, payload: Dict[str, Any], idempotent: bool = False
+    ) -> Dict[str, Any]:
+        # der Async-Client ist an den Event-Loop gebunden, in dem er entstanden ist
+        loop = asyncio.get_running_loop()
+        if self._async is None or self._async_loop is not loop:
+            await self._close_async()
+            self._async = httpx.AsyncClient(base_url=self.base_url, limits=self._limits)
+            self._async_loop = loop
+        with span(f"memory_api {path}") as attrs:
+            headers = trace_headers()
+            attempt = 0
+            while True:
+                self._check_breaker(path)
+                self.stats["requests"] += 1
+                attrs["attempts"] = attempt + 1
+                try:
+                    resp = await self._async.post(
+                        path, json=payload, headers=headers, timeout=self._timeout(path)
+                    )
+                    resp.raise_for_status()
+                except BaseException as exc:
+                    if not isinstance(exc, httpx.HTTPError):
+                        self.breaker.record_abort()
+                        raise
+                    self._record(exc)
+                    if attempt == self.retries or not self._retryable(exc, idempotent):
+                        raise MemoryApiError(f"{path}: {exc}") from exc
+                    self.stats["retries"] += 1
+                    await asyncio.sleep(self._delay(attempt))
+                    attempt += 1
+                else:
+                    self._record(None)
+                    return resp.json()
+
+    def post_sync(
+        self, path: str, payload: Dict[str, Any], idempotent: bool = False
+    ) -> Dict[str, Any]:
+        with span(f"memory_api {path}") as attrs:
+            headers = trace_headers()
+            attempt = 0
+            while True:
+                self._check_breaker(path)
+                self.stats["requests"] += 1
+                attrs["attempts"] = attempt + 1
+                try:
+                    resp = self._sync.post(
+                        path, json=payload, headers=headers, timeout=self._timeout(path)
+                    )
+                    resp.raise_for_status()
+                except BaseException as exc:
+                    if not isinstance(exc, httpx.HTTPError):
+                        self.breaker.record_abort()
+                        raise
+                    self._record(exc)
+                    if attempt == self.retries or not self._retryable(exc, idempotent):
+                        raise MemoryApiError(f"{path}: {exc}") from exc
+                    self.stats["retries"] += 1
+                    time.sleep(self._delay(attempt))
+                    attempt += 1
+                else:
+                    self._record(None)
+                    return resp.json()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"breaker": self.breaker.state, **self.stats}
@@ -0,0 +1,100 @@
+import re
+import threading
+from typing import Any, Dict, NamedTuple, Optional
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Floskeln, die allein nie speicherwürdig sind
+SMALL_TALK = {
+    "ok", "okay", "oki", "jo", "ja", "jap", "jep", "nein", "nee", "nö", "yes", "no", "yep",
+    "nope", "danke", "dankeschön", "vielen", "dank", "thx", "thanks", "thank", "you", "ty",
+    "super", "cool", "klasse", "prima", "perfekt", "top", "genau", "stimmt", "alles", "klar",
+    "gut", "sehr", "passt", "nice", "great", "hallo", "hi", "hey", "moin", "servus", "tschüss",
+    "ciao", "bye", "bis", "später", "dann", "gerne", "gern", "bitte", "hm", "hmm", "aha",
+    "achso", "ach", "so", "lol", "haha", "weiter", "mach", "mal", "sure", "fine", "got", "it",
+    "verstanden", "alright", "good", "morning", "guten", "morgen", "abend", "tag", "na",
+}
+
+# Ich-Bezug: ohne ihn ist eine kurze Frage eine reine Rückfrage
+FIRST_PERSON = {
+    "ich", "mein", "meine", "meinen", "meinem", "meiner", "mir", "mich", "wir", "unser",
+    "unsere", "i", "my", "me", "we", "our",
+}
+
+# Eindeutige Speicher-Signale -> direkt speichern, mit grob bestimmtem kind
+STORE_PATTERNS = (
+    # nur an das Memory gerichtete Aufforderungen, nicht "Speicherplatz", "als PDF speichern" usw.
+    (re.compile(r"\b(merk(e)? dir|notier(e)? (dir|mir|bitte)|speicher(e)? (dir|bitte)|"
+                r"remember that|note that)\b", re.I),
+     "note"),
+    (re.compile(r"\b(ich heiße|mein name ist|ich bin \d+ jahre|my name is)\b", re.I), "identity"),
+    (re.compile(r"\b(ich arbeite (als|bei|an)|ich bin (von beruf|lehrer|entwickler)|"
+                r"i work (as|at|on))\b", re.I), "identity"),
+    # "ich mag"/"i like" nur mit Gegenstand der Vorliebe, nicht als Kommentar ("ich mag es nicht so")
+    (re.compile(r"\b(ich mag (lieber|am liebsten|keine?n?) \w+|ich bevorzuge|"
+                r"ich hasse es,? wenn|ich möchte immer|bitte immer|i prefer|"
+                r"i (like|hate) (it when|to))\b", re.I),
+     "preference"),
+)
+
+MIN_STORE_WORDS = 4
+
+
+class GateDecision(NamedTuple):
+    action: str  # "skip", "store" oder "llm"
+    reason: str
+    kind: Optional[str] = None
+
+
+class GateStats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.counts = {"calls": 0, "skip": 0, "store": 0, "llm": 0}
+
+    def record(self, decision: GateDecision) -> None:
+        with self._lock:
+            self.counts["calls"] += 1
+            self.counts[decision.action] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self.counts)
+        avoided = counts["skip"] + counts["store"]
+        counts["llm_avoided_ratio"] = round(avoided / counts["calls"], 4) if counts["calls"] else 0.0
+        return counts
+
+
+gate_stats = GateStats()
+
+
+def decide(text: str, role: str = "user") -> GateDecision:
+    """
+    Lokale Vorentscheidung vor dem LLM-Klassifikator: eindeutiger Smalltalk
+    wird übersprungen, eindeutige Speicherwünsche direkt gespeichert, alles
+    andere geht an das LLM.
+    """
+    words = [w.lower() for w in WORD_RE.findall(text)]
+    if not words:
+        return GateDecision("skip", "leer")
+    if all(w in SMALL_TALK for w in words) and len(words) <= 6:
+        return GateDecision("skip", "smalltalk")
+
+    stripped = text.strip()
+    is_question = stripped.endswith("?")
+    if is_question and len(words) <= 8 and not FIRST_PERSON.intersection(words):
+        return GateDecision("skip", "rückfrage")
+    if role == "assistant" and is_question:
+        return GateDecision("skip", "rückfrage-assistent")
+
+    if role == "user" and not is_question and len(words) >= MIN_STORE_WORDS:
+        for pattern, kind in STORE_PATTERNS:
+            if pattern.search(stripped):
+                return GateDecision("store", f"muster:{kind}", kind)
+
+    return GateDecision("llm", "unsicher")
+
+
+def gate(text: str, role: str = "user") -> GateDecision:
+    decision = decide(text, role)
+    gate_stats.record(decision)
+    return decision
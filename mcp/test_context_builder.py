@@ -0,0 +1,53 @@
+"""
+Tests der Token-Budgets im Chat-Kontext (context_builder.py):
+
+    python -m pytest test_context_builder.py   bzw.   python test_context_builder.py
+"""
+
+import asyncio
+
+from context_builder import ContextBuilder, estimate_tokens
+
+SUMMARY_HEADER = "Bisheriger Gesprächsverlauf (zusammengefasst):\n"
+
+
+def _summary_message(messages):
+    for message in messages:
+        if message["content"].startswith(SUMMARY_HEADER):
+            return message["content"][len(SUMMARY_HEADER):]
+    return ""
+
+
+def test_summary_alone_exceeding_budget_is_cut() -> None:
+    context = ContextBuilder(max_tokens=400, memory_tokens=50, summary_tokens=40,
+                             reserved_tokens=50, min_recent_messages=2)
+    for i in range(6):
+        context.add_turn(f"Frage {i} " + "wort " * 40, f"Antwort {i} " + "wort " * 40)
+    assert context.needs_fold
+
+    sentences = [f"Im Teil {i} ging es um das Thema Nummer {i} und seine Details." for i in range(30)]
+
+    async def summarize(previous, transcript):
+        return " ".join(sentences)
+
+    asyncio.run(context.fold(summarize))
+    assert estimate_tokens(context.summary) <= context.summary_tokens
+    # jüngster Stand bleibt erhalten
+    assert context.summary.endswith(sentences[-1])
+
+    # auch eine von außen gesetzte, zu lange Zusammenfassung wird im Prompt gekürzt
+    context.summary = "x" * 2000
+    summary = _summary_message(context.build("system", "Hallo", []))
+    assert summary and estimate_tokens(summary) <= context.summary_tokens
+
+
+def test_short_summary_is_kept() -> None:
+    context = ContextBuilder(summary_tokens=100)
+    context.summary = "Wir haben über Qdrant gesprochen."
+    assert _summary_message(context.build("system", "Hallo", [])) == context.summary
+
+
+if __name__ == "__main__":
+    test_summary_alone_exceeding_budget_is_cut()
+    test_short_summary_is_kept()
+    print("ok")
@@ -0,0 +1,32 @@
+"""
+Tests der dauerhaften Observe-Warteschlange (ingest_queue.py):
+
+    python -m pytest test_ingest_queue.py   bzw.   python test_ingest_queue.py
+"""
+
+import os
+import tempfile
+
+from ingest_queue import IngestQueue
+
+
+def test_expired_lease_counts_as_attempt() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = IngestQueue(os.path.join(tmp, "queue.db"), lease_s=0, max_attempts=3)
+        queue.enqueue("Merk dir, dass der Build kaputt ist.", "user", "test", "2026-01-01")
+
+        attempts = []
+        for _ in range(5):
+            claimed = queue.claim(10)
+            if not claimed:
+                break
+            attempts.append(claimed[0]["attempts"])
+
+        # Lease läuft sofort ab: Versuche 0, 1, 2, danach dead-letter
+        assert attempts == [0, 1, 2]
+        assert queue.depth() == {"pending": 0, "processing": 0, "failed": 1}
+
+
+if __name__ == "__main__":
+    test_expired_lease_counts_as_attempt()
+    print("ok")
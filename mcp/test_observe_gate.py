@@ -0,0 +1,41 @@
+"""
+Tests der lokalen Vorentscheidung in memory_observe (observe_gate.py):
+
+    python -m pytest test_observe_gate.py   bzw.   python test_observe_gate.py
+"""
+
+from observe_gate import decide
+
+# dürfen nie ohne LLM gespeichert werden ("speicher"/"notier"/"ich mag" ohne Speicherwunsch)
+NOT_STORED = [
+    "Der Speicherplatz auf dem Laptop reicht nicht aus.",
+    "Die Notierung der Aktie ist gefallen heute stark.",
+    "Kannst du das bitte speichern als PDF.",
+    "Ich mag es nicht so.",
+    "Ich habe die Datei gespeichert, aber sie ist leer.",
+    "Ich mag es irgendwie nicht, wie das aussieht.",
+]
+
+STORED = [
+    "Merk dir, dass mein Zug um 7 Uhr fährt.",
+    "Speichere bitte, dass mein Zahnarzttermin am Freitag ist.",
+    "Notier dir, dass der Server jetzt auf Port 8443 läuft.",
+    "Ich mag lieber Tabellen als lange Fließtexte.",
+    "Remember that I use vim keybindings everywhere.",
+]
+
+
+def test_false_positives_are_not_stored() -> None:
+    for text in NOT_STORED:
+        assert decide(text).action != "store", text
+
+
+def test_imperative_memory_requests_are_stored() -> None:
+    for text in STORED:
+        assert decide(text).action == "store", text
+
+
+if __name__ == "__main__":
+    test_false_positives_are_not_stored()
+    test_imperative_memory_requests_are_stored()
+    print("ok")
@@ -0,0 +1,97 @@
+from typing import Optional
+
+from qdrant_client.http.models import (
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    Distance,
+    HnswConfigDiff,
+    QuantizationConfig,
+    QuantizationSearchParams,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
+    VectorParams,
+)
+
+QUANTIZATION_MODES = ("none", "scalar", "binary")
+
+
+def quantization_config(mode: str, always_ram: bool = True) -> Optional[QuantizationConfig]:
+    """
+    "scalar" = int8 (4x kleiner), "binary" = 1 Bit pro Dimension (32x kleiner,
+    sinnvoll ab ca. 1024 Dimensionen), "none" = unquantisiert.
+    """
+    if mode == "scalar":
+        return ScalarQuantization(
+            scalar=ScalarQuantizationConfig(
+                type=ScalarType.INT8, quantile=0.99, always_ram=always_ram
+            )
+        )
+    if mode == "binary":
+        return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=always_ram))
+    if mode == "none":
+        return None
+    raise ValueError(f"Unbekannte Quantisierung: {mode} (erlaubt: {', '.join(QUANTIZATION_MODES)})")
+
+
+def vectors_config(
+    size: int,
+    distance: Distance,
+    on_disk: bool = False,
+    quantization: str = "none",
+    quantization_always_ram: bool = True,
+    hnsw_m: Optional[int] = None,
+    hnsw_ef_construct: Optional[int] = None,
+    hnsw_on_disk: Optional[bool] = None,
+) -> VectorParams:
+    hnsw = None
+    if hnsw_m is not None or hnsw_ef_construct is not None or hnsw_on_disk is not None:
+        hnsw = HnswConfigDiff(m=hnsw_m, ef_construct=hnsw_ef_construct, on_disk=hnsw_on_disk)
+    return VectorParams(
+        size=size,
+        distance=distance,
+        on_disk=on_disk or None,
+        hnsw_config=hnsw,
+        quantization_config=quantization_config(quantization, quantization_always_ram),
+    )
+
+
+def search_params(
+    hnsw_ef: Optional[int] = None,
+    quantization: str = "none",
+    rescore: bool = True,
+    oversampling: Optional[float] = None,
+) -> Optional[SearchParams]:
+    """
+    Suchparameter passend zur Collection: bei Quantisierung wird mit
+    `oversampling`-fach mehr Kandidaten gesucht und mit den Originalvektoren
+    neu bewertet (rescore).
+    """
+    quant = None
+    if quantization != "none":
+        quant = QuantizationSearchParams(rescore=rescore, oversampling=oversampling)
+    if hnsw_ef is None and quant is None:
+        return None
+    return SearchParams(hnsw_ef=hnsw_ef, quantization=quant)
+
+
+def estimated_ram_bytes(
+    points: int,
+    size: int,
+    on_disk: bool = False,
+    quantization: str = "none",
+    quantization_always_ram: bool = True,
+    hnsw_m: int = 16,
+) -> int:
+    """
+    Grobe Schätzung des RAM-Bedarfs: Originalvektoren (falls nicht on_disk),
+    quantisierte Vektoren (falls always_ram) und HNSW-Graph (Level 0).
+    """
+    total = 0
+    if not on_disk:
+        total += points * size * 4
+    if quantization != "none" and quantization_always_ram:
+        total += points * (size if quantization == "scalar" else (size + 7) // 8)
+    total += points * hnsw_m * 2 * 4
+    return total
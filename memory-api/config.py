@@ -0,0 +1,137 @@
+"""
+Konfiguration der Memory-API aus der Umgebung (.env im Repo-Root).
+
+Ohne Seiteneffekte importierbar: hier entstehen keine Clients, Caches oder
+Warteschlangen. main.py baut sie erst beim Start der API auf; die CLIs
+(migrate_collection.py, reembed.py, snapshot.py) lesen nur diese Werte.
+"""
+
+import os
+from pathlib import Path
+from typing import Optional
+
+from dotenv import load_dotenv
+from qdrant_client.http.models import Distance
+
+from collection_config import search_params, vectors_config
+
+# Lade .env aus Repo-Root (../.env relativ zu memory-api/config.py)
+ENV_PATH = (Path(__file__).resolve().parent.parent / ".env")
+load_dotenv(dotenv_path=ENV_PATH, override=False)
+
+# OpenAI-kompatibler Dienst (geprüft erst dort, wo ein Client entsteht)
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")
+
+EMBED_MODEL = os.getenv(
+    "OPENAI_EMBED_MODEL", "jeffh/intfloat-multilingual-e5-large:q8_0"
+)
+CHAT_MODEL = os.getenv("OPENAI_CHAT_MODEL", "GPT-OSS20B")
+
+# Async-Modus: AsyncOpenAI/AsyncQdrantClient statt blockierender Clients im Threadpool
+MEMORY_API_ASYNC = os.getenv("MEMORY_API_ASYNC", "false").lower() in ("1", "true", "yes")
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "16"))
+CHAT_CONCURRENCY = int(os.getenv("CHAT_CONCURRENCY", "4"))
+QDRANT_CONCURRENCY = int(os.getenv("QDRANT_CONCURRENCY", "32"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "64"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "32"))
+
+# Micro-Batching paralleler Embedding-Anfragen (Fenster 0 = aus)
+EMBED_BATCH_WINDOW_MS = float(os.getenv("EMBED_BATCH_WINDOW_MS", "5"))
+EMBED_BATCH_MAX = int(os.getenv("EMBED_BATCH_MAX", "64"))
+
+# Bulk-Import (NDJSON): Chunk-Größe und max. Chunks pro Pipeline-Stufe
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "64"))
+BULK_MAX_IN_FLIGHT = int(os.getenv("BULK_MAX_IN_FLIGHT", "2"))
+BULK_JOBS_KEEP = 100
+
+# Hybride Suche: BM25-Index im Prozess + Vektorsuche, fusioniert per RRF
+LEXICAL_REBUILD_INTERVAL = int(os.getenv("LEXICAL_REBUILD_INTERVAL", "900"))
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "20"))
+HYBRID_SKIP_MAX_TERMS = int(os.getenv("HYBRID_SKIP_MAX_TERMS", "4"))
+HYBRID_SKIP_MARGIN = float(os.getenv("HYBRID_SKIP_MARGIN", "1.5"))
+RRF_K = int(os.getenv("RRF_K", "60"))
+
+# Job-Warteschlange für summarize_and_store (SQLite, übersteht Neustarts)
+SUMMARIZE_QUEUE_PATH = os.getenv("SUMMARIZE_QUEUE_PATH", "summarize_queue.db")
+SUMMARIZE_WORKERS = int(os.getenv("SUMMARIZE_WORKERS", "2"))
+SUMMARIZE_QUEUE_MAX = int(os.getenv("SUMMARIZE_QUEUE_MAX", "1000"))
+SUMMARIZE_GROUP_WINDOW = float(os.getenv("SUMMARIZE_GROUP_WINDOW", "2"))
+SUMMARIZE_GROUP_MAX_TEXTS = int(os.getenv("SUMMARIZE_GROUP_MAX_TEXTS", "20"))
+
+# Webhook des Self-Bakers für neue ungebackene Einträge (leer = aus)
+BAKER_WEBHOOK_URL = os.getenv("BAKER_WEBHOOK_URL", "")
+
+# Embedding-Cache (LRU im Prozess, optional SQLite auf der Platte)
+EMBED_CACHE_SIZE = int(os.getenv("EMBED_CACHE_SIZE", "10000"))
+EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH") or None
+
+# Cache für Suchergebnisse (TTL + LRU, invalidiert über die Collection-Generation)
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "1000"))
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "60"))
+
+# Qdrant-Konfiguration
+QDRANT_URL = os.getenv("QDRANT_URL", "http://qdrant:6333")
+QDRANT_COLLECTION = os.getenv("QDRANT_COLLECTION", "jar_el_memory")
+VECTOR_SIZE = int(os.getenv("QDRANT_VECTOR_SIZE", "1024"))
+DISTANCE = os.getenv("QDRANT_DISTANCE", "cosine").lower()
+
+# Register der Embedding-Modelle je Collection (collection_meta.py); nach einem
+# Alias-Wechsel durch reembed.py gilt das dort eingetragene Modell. Neu gelesen
+# alle EMBED_CONFIG_REFRESH Sekunden (0 = nur beim Start) und per
+# POST /memory/embedding/reload
+QDRANT_META_COLLECTION = os.getenv("QDRANT_META_COLLECTION", "jar_el_memory_meta")
+EMBED_CONFIG_REFRESH = float(os.getenv("EMBED_CONFIG_REFRESH", "60"))
+
+if DISTANCE == "cosine":
+    DISTANCE_ENUM = Distance.COSINE
+elif DISTANCE == "euclid":
+    DISTANCE_ENUM = Distance.EUCLID
+else:
+    DISTANCE_ENUM = Distance.COSINE
+
+# Duplikaterkennung beim Schreiben: bei cosine die Mindest-Ähnlichkeit, bei
+# euclid die maximale Distanz, ab der zusammengeführt wird
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() in ("1", "true", "yes")
+DEDUP_THRESHOLD = float(
+    os.getenv("DEDUP_THRESHOLD", "0.3" if DISTANCE_ENUM == Distance.EUCLID else "0.95")
+)
+
+
+def _optional_int(name: str) -> Optional[int]:
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
+# Speicher-Layout neuer Collections (bestehende: migrate_collection.py)
+QDRANT_ON_DISK = os.getenv("QDRANT_ON_DISK", "false").lower() in ("1", "true", "yes")
+QDRANT_QUANTIZATION = os.getenv("QDRANT_QUANTIZATION", "none").lower()
+QDRANT_QUANTIZATION_ALWAYS_RAM = (
+    os.getenv("QDRANT_QUANTIZATION_ALWAYS_RAM", "true").lower() in ("1", "true", "yes")
+)
+QDRANT_HNSW_M = _optional_int("QDRANT_HNSW_M")
+QDRANT_HNSW_EF_CONSTRUCT = _optional_int("QDRANT_HNSW_EF_CONSTRUCT")
+_hnsw_on_disk = os.getenv("QDRANT_HNSW_ON_DISK")
+QDRANT_HNSW_ON_DISK = _hnsw_on_disk.lower() in ("1", "true", "yes") if _hnsw_on_disk else None
+
+# Suchzeit-Parameter
+QDRANT_SEARCH_EF = _optional_int("QDRANT_SEARCH_EF")
+QDRANT_RESCORE = os.getenv("QDRANT_RESCORE", "true").lower() in ("1", "true", "yes")
+QDRANT_OVERSAMPLING = float(os.getenv("QDRANT_OVERSAMPLING", "2.0"))
+
+COLLECTION_VECTORS = vectors_config(
+    size=VECTOR_SIZE,
+    distance=DISTANCE_ENUM,
+    on_disk=QDRANT_ON_DISK,
+    quantization=QDRANT_QUANTIZATION,
+    quantization_always_ram=QDRANT_QUANTIZATION_ALWAYS_RAM,
+    hnsw_m=QDRANT_HNSW_M,
+    hnsw_ef_construct=QDRANT_HNSW_EF_CONSTRUCT,
+    hnsw_on_disk=QDRANT_HNSW_ON_DISK,
+)
+SEARCH_PARAMS = search_params(
+    hnsw_ef=QDRANT_SEARCH_EF,
+    quantization=QDRANT_QUANTIZATION,
+    rescore=QDRANT_RESCORE,
+    oversampling=QDRANT_OVERSAMPLING,
+)
@@ -0,0 +1,49 @@
+import hashlib
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from lexical_index import tokenize
+
+# Felder, die beim Zusammenführen nie aus dem neuen Eintrag übernommen werden
+KEEP_EXISTING = ("text", "content_hash", "created_at", "baked")
+
+
+def content_hash(text: str) -> str:
+    """
+    Hash über die normalisierte Token-Folge: Groß-/Kleinschreibung,
+    Satzzeichen und Whitespace spielen keine Rolle.
+    """
+    return hashlib.sha256(" ".join(tokenize(text)).encode("utf-8")).hexdigest()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def merge_payload(existing: Dict[str, Any], incoming: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Liefert die Payload-Felder, die am bestehenden Punkt gesetzt werden, wenn
+    `incoming` als Duplikat erkannt wurde: Zähler und Zeitstempel, vereinigte
+    Tags und bisher fehlende Felder.
+    """
+    seen = [s for s in (existing.get("last_seen") or existing.get("created_at"),
+                        incoming.get("created_at") or _now()) if s]
+    merged: Dict[str, Any] = {
+        "seen_count": int(existing.get("seen_count", 1)) + int(incoming.get("seen_count", 1)),
+        "last_seen": max(seen),
+    }
+
+    tags: List[Any] = list(existing.get("tags") or [])
+    new_tags = [t for t in incoming.get("tags") or [] if t not in tags]
+    if new_tags:
+        merged["tags"] = tags + new_tags
+
+    if "confidence" in incoming and "confidence" in existing:
+        merged["confidence"] = max(existing["confidence"], incoming["confidence"])
+
+    for key, value in incoming.items():
+        if key in KEEP_EXISTING or key in merged or value is None:
+            continue
+        if existing.get(key) is None:
+            merged[key] = value
+    return merged
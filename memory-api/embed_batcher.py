@@ -0,0 +1,96 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+HISTOGRAM_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class EmbeddingBatcher:
+    """
+    Sammelt Embedding-Anfragen, die innerhalb eines kurzen Zeitfensters
+    eintreffen, zu einem gemeinsamen Batch-Aufruf und verteilt die Vektoren
+    anschließend wieder an die einzelnen Aufrufer.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], Awaitable[List[List[float]]]],
+        window_ms: float = 5.0,
+        max_batch: int = 64,
+    ) -> None:
+        self._embed_fn = embed_fn
+        self.window_s = window_ms / 1000
+        self.max_batch = max(1, max_batch)
+        self._pending: List[Tuple[str, "asyncio.Future[List[float]]"]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set["asyncio.Task[None]"] = set()
+        self.batches = 0
+        self.texts = 0
+        self.histogram: Dict[int, int] = {b: 0 for b in HISTOGRAM_BUCKETS}
+        self.histogram_overflow = 0
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        if self.window_s <= 0:
+            self._record(len(texts))
+            return await self._embed_fn(texts)
+
+        loop = asyncio.get_running_loop()
+        futures = []
+        for text in texts:
+            fut: "asyncio.Future[List[float]]" = loop.create_future()
+            self._pending.append((text, fut))
+            futures.append(fut)
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_s, self._flush)
+
+        return list(await asyncio.gather(*futures))
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        pending, self._pending = self._pending, []
+        for start in range(0, len(pending), self.max_batch):
+            task = asyncio.ensure_future(self._run(pending[start:start + self.max_batch]))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, "asyncio.Future[List[float]]"]]) -> None:
+        self._record(len(batch))
+        try:
+            vectors = await self._embed_fn([text for text, _ in batch])
+        except Exception as exc:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(exc)
+            return
+
+        for (_, fut), vec in zip(batch, vectors):
+            if not fut.done():
+                fut.set_result(vec)
+
+    def _record(self, size: int) -> None:
+        self.batches += 1
+        self.texts += size
+        for bucket in HISTOGRAM_BUCKETS:
+            if size <= bucket:
+                self.histogram[bucket] += 1
+                return
+        self.histogram_overflow += 1
+
+    def stats(self) -> Dict[str, Any]:
+        histogram = {f"le_{b}": n for b, n in self.histogram.items()}
+        histogram["overflow"] = self.histogram_overflow
+        return {
+            "window_ms": self.window_s * 1000,
+            "max_batch": self.max_batch,
+            "batches": self.batches,
+            "texts": self.texts,
+            "mean_batch_size": (self.texts / self.batches) if self.batches else 0.0,
+            "batch_size_histogram": histogram,
+        }
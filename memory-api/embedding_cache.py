@@ -0,0 +1,138 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import unicodedata
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalisiert Text für den Cache-Schlüssel (Unicode NFC, Whitespace
+    zusammengefasst). Groß-/Kleinschreibung bleibt erhalten, da sie das
+    Embedding beeinflusst.
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def cache_key(model: str, text: str) -> str:
+    digest = hashlib.sha256()
+    digest.update(model.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(normalize_text(text).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class _DiskTier:
+    """
+    Persistente Stufe auf SQLite-Basis. Vektoren liegen als float32-Blob vor.
+    """
+
+    def __init__(self, path: str) -> None:
+        # Verzeichnis anlegen, falls es (z.B. als frisches Volume) noch fehlt
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY,"
+            " vector BLOB NOT NULL"
+            ")"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[List[float]]:
+        row = self._conn.execute(
+            "SELECT vector FROM embeddings WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        vec = array("f")
+        vec.frombytes(row[0])
+        return vec.tolist()
+
+    def put_many(self, entries: List[Tuple[str, List[float]]]) -> None:
+        if not entries:
+            return
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+            [(key, array("f", vec).tobytes()) for key, vec in entries],
+        )
+        self._conn.commit()
+
+
+class EmbeddingCache:
+    """
+    Inhaltsadressierter Embedding-Cache: begrenzter LRU im Prozess plus
+    optionale SQLite-Stufe auf der Platte. Schlüssel ist (Modell, Hash des
+    normalisierten Texts).
+    """
+
+    def __init__(self, max_items: int = 10000, disk_path: Optional[str] = None) -> None:
+        self.max_items = max_items
+        self._lru: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = _DiskTier(disk_path) if disk_path else None
+        # SQLite-Zugriffe blockieren; Aufrufer in einer Event-Loop lagern sie dann aus
+        self.blocking = self._disk is not None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _remember(self, key: str, vec: List[float]) -> None:
+        if self.max_items <= 0:
+            return
+        self._lru[key] = vec
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_items:
+            self._lru.popitem(last=False)
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            vec = self._lru.get(key)
+            if vec is not None:
+                self._lru.move_to_end(key)
+                self.memory_hits += 1
+                return vec
+
+            if self._disk is not None:
+                vec = self._disk.get(key)
+                if vec is not None:
+                    self._remember(key, vec)
+                    self.disk_hits += 1
+                    return vec
+
+            self.misses += 1
+            return None
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        found: Dict[str, List[float]] = {}
+        for key in keys:
+            vec = self.get(key)
+            if vec is not None:
+                found[key] = vec
+        return found
+
+    def put_many(self, entries: List[Tuple[str, List[float]]]) -> None:
+        with self._lock:
+            for key, vec in entries:
+                self._remember(key, vec)
+            if self._disk is not None:
+                self._disk.put_many(entries)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            total = hits + self.misses
+            return {
+                "size": len(self._lru),
+                "max_items": self.max_items,
+                "disk_enabled": self._disk is not None,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (hits / total) if total else 0.0,
+            }
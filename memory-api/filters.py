@@ -0,0 +1,81 @@
+from typing import Any, Dict, List, Optional
+
+from qdrant_client.http.models import (
+    DatetimeRange,
+    FieldCondition,
+    Filter,
+    MatchAny,
+    MatchValue,
+    PayloadSchemaType,
+)
+
+# Payload-Felder, nach denen gefiltert werden kann, und ihr Index-Typ
+PAYLOAD_INDEXES: Dict[str, PayloadSchemaType] = {
+    "project": PayloadSchemaType.KEYWORD,
+    "kind": PayloadSchemaType.KEYWORD,
+    "tags": PayloadSchemaType.KEYWORD,
+    "visibility": PayloadSchemaType.KEYWORD,
+    "baked": PayloadSchemaType.BOOL,
+    "created_at": PayloadSchemaType.DATETIME,
+    "date": PayloadSchemaType.DATETIME,
+    "content_hash": PayloadSchemaType.KEYWORD,
+}
+
+KEYWORD_FIELDS = ("project", "kind", "tags", "visibility")
+RANGE_FIELDS = ("created_at", "date")
+RANGE_OPS = ("gt", "gte", "lt", "lte")
+
+
+def _keyword_condition(key: str, value: Any) -> FieldCondition:
+    if isinstance(value, list):
+        if not value or not all(isinstance(v, str) for v in value):
+            raise ValueError(f"Filter '{key}' erwartet einen String oder eine Liste von Strings")
+        return FieldCondition(key=key, match=MatchAny(any=value))
+    if not isinstance(value, str):
+        raise ValueError(f"Filter '{key}' erwartet einen String oder eine Liste von Strings")
+    return FieldCondition(key=key, match=MatchValue(value=value))
+
+
+def _range_condition(key: str, value: Any) -> FieldCondition:
+    if not isinstance(value, dict) or not value:
+        raise ValueError(f"Filter '{key}' erwartet ein Objekt mit gt/gte/lt/lte")
+    unknown = set(value) - set(RANGE_OPS)
+    if unknown:
+        raise ValueError(f"Unbekannte Operatoren für '{key}': {sorted(unknown)}")
+    return FieldCondition(key=key, range=DatetimeRange(**value))
+
+
+def build_filter(spec: Optional[Dict[str, Any]]) -> Optional[Filter]:
+    """
+    Übersetzt den `filter` eines QueryRequest in einen Qdrant-Filter.
+
+    Beispiel:
+        {
+            "project": "Jar-El",              # oder ["Jar-El", "Erendria"]
+            "kind": ["event", "fact"],
+            "tags": ["KI"],                    # mindestens einer der Tags
+            "visibility": "private",
+            "baked": false,
+            "created_at": {"gte": "2025-01-01T00:00:00Z"},
+            "date": {"gte": "2025-03-01", "lt": "2025-04-01"}
+        }
+
+    Unbekannte Felder oder falsche Typen lösen einen ValueError aus.
+    """
+    if not spec:
+        return None
+
+    must: List[FieldCondition] = []
+    for key, value in spec.items():
+        if key in KEYWORD_FIELDS:
+            must.append(_keyword_condition(key, value))
+        elif key == "baked":
+            if not isinstance(value, bool):
+                raise ValueError("Filter 'baked' erwartet true oder false")
+            must.append(FieldCondition(key=key, match=MatchValue(value=value)))
+        elif key in RANGE_FIELDS:
+            must.append(_range_condition(key, value))
+        else:
+            raise ValueError(f"Unbekanntes Filterfeld: {key}")
+
+    return Filter(must=must)
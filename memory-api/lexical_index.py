@@ -0,0 +1,158 @@
+import math
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Entitätsfelder aus classify_and_extract_metadata, die zusätzlich zum Text
+# indexiert und doppelt gewichtet werden
+ENTITY_FIELDS = ("event_name", "people", "orgs", "location", "topics", "tags", "project")
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_RE.findall(text.lower()) if len(t) > 1 or t.isdigit()]
+
+
+def document_terms(payload: Dict[str, Any]) -> List[str]:
+    terms = tokenize(str(payload.get("text") or ""))
+    for field in ENTITY_FIELDS:
+        value = payload.get(field)
+        if not value:
+            continue
+        values = value if isinstance(value, list) else [value]
+        for v in values:
+            terms.extend(tokenize(str(v)) * 2)
+    return terms
+
+
+class LexicalHit(NamedTuple):
+    id: Any
+    score: float
+    coverage: float  # Anteil der Query-Terme, die im Dokument vorkommen
+
+
+class LexicalIndex:
+    """
+    Einfacher BM25-Index im Prozess über Payload-Text und Entitätsfelder.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[Any, int]] = {}
+        self._doc_terms: Dict[Any, Counter] = {}
+        self._doc_len: Dict[Any, int] = {}
+        self._total_len = 0
+        self._lock = threading.Lock()
+        self._replay: Optional[List[Tuple[Any, Dict[str, Any]]]] = None
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._doc_len)
+
+    def _remove(self, doc_id: Any) -> None:
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self._postings[term]
+        self._total_len -= self._doc_len.pop(doc_id)
+
+    def _add(self, doc_id: Any, payload: Dict[str, Any]) -> None:
+        self._remove(doc_id)
+        terms = Counter(document_terms(payload))
+        if not terms:
+            return
+        self._doc_terms[doc_id] = terms
+        length = sum(terms.values())
+        self._doc_len[doc_id] = length
+        self._total_len += length
+        for term, tf in terms.items():
+            self._postings.setdefault(term, {})[doc_id] = tf
+
+    def add(self, doc_id: Any, payload: Dict[str, Any]) -> None:
+        self.add_many([(doc_id, payload)])
+
+    def add_many(self, docs: Iterable[Tuple[Any, Dict[str, Any]]]) -> None:
+        with self._lock:
+            for doc_id, payload in docs:
+                self._add(doc_id, payload)
+                if self._replay is not None:
+                    self._replay.append((doc_id, payload))
+
+    def begin_rebuild(self) -> None:
+        """
+        Merkt sich ab jetzt alle Änderungen, damit sie nach `replace` erhalten bleiben.
+        """
+        with self._lock:
+            self._replay = []
+
+    def replace(self, docs: Iterable[Tuple[Any, Dict[str, Any]]]) -> None:
+        """
+        Ersetzt den Index durch einen Neuaufbau aus (id, payload)-Paaren.
+        """
+        fresh = LexicalIndex(self.k1, self.b)
+        fresh.add_many(docs)
+        with self._lock:
+            for doc_id, payload in self._replay or []:
+                fresh._add(doc_id, payload)
+            self._postings = fresh._postings
+            self._doc_terms = fresh._doc_terms
+            self._doc_len = fresh._doc_len
+            self._total_len = fresh._total_len
+            self._replay = None
+            self.ready = True
+
+    def search(self, query: str, limit: int) -> List[LexicalHit]:
+        query_terms: Set[str] = set(tokenize(query))
+        if not query_terms:
+            return []
+
+        with self._lock:
+            n_docs = len(self._doc_len)
+            if not n_docs:
+                return []
+            avg_len = self._total_len / n_docs
+            scores: Dict[Any, float] = {}
+            matched: Dict[Any, int] = {}
+            for term in query_terms:
+                posting = self._postings.get(term)
+                if not posting:
+                    continue
+                idf = math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+                for doc_id, tf in posting.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_len[doc_id] / avg_len)
+                    weight = idf * tf * (self.k1 + 1) / (tf + norm)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + weight
+                    matched[doc_id] = matched.get(doc_id, 0) + 1
+
+        ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:limit]
+        return [
+            LexicalHit(doc_id, score, matched[doc_id] / len(query_terms))
+            for doc_id, score in ranked
+        ]
+
+
+def reciprocal_rank_fusion(rankings: List[List[Any]], k: int = 60) -> List[tuple]:
+    """
+    Verschmilzt mehrere Rankings (Listen von IDs, bestes zuerst) per RRF.
+    Gibt (id, score)-Paare absteigend sortiert zurück.
+    """
+    fused: Dict[Any, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda kv: kv[1], reverse=True)
+
+
+def rrf_normalize(score: float, lists: int, k: int = 60) -> float:
+    """
+    Skaliert einen RRF-Score auf 0..1: 1.0 = Rang 1 in allen `lists` Rankings.
+    """
+    return score * (k + 1) / lists
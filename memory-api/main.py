@@ -1,49 +1,136 @@
-import os
+import asyncio
+import json
 import uuid
-from pathlib import Path
-from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Callable, Dict, List, Literal, Optional, Set, Tuple
 
-from dotenv import load_dotenv
-from fastapi import BackgroundTasks, FastAPI, HTTPException
-from openai import OpenAI
-from pydantic import BaseModel, Field
-from qdrant_client import QdrantClient
-from qdrant_client.http.models import Distance, VectorParams, PointStruct
-
-# Lade .env aus Repo-Root (../.env relativ zu memory-api/main.py)
-ENV_PATH = (Path(__file__).resolve().parent.parent / ".env")
-load_dotenv(dotenv_path=ENV_PATH, override=False)
+import httpx
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, OpenAI
+from prometheus_client import Gauge
+from pydantic import BaseModel, Field, ValidationError
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.http.models import (
+    Distance,
+    FieldCondition,
+    Filter,
+    HasIdCondition,
+    MatchAny,
+    MatchValue,
+    PointStruct,
+)
 
-# OpenAI-kompatibler Client
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")
+from collection_meta import meta_id, parse_meta, physical_collection
+from config import (
+    BAKER_WEBHOOK_URL,
+    BULK_CHUNK_SIZE,
+    BULK_JOBS_KEEP,
+    BULK_MAX_IN_FLIGHT,
+    CHAT_CONCURRENCY,
+    CHAT_MODEL,
+    COLLECTION_VECTORS,
+    DEDUP_ENABLED,
+    DEDUP_THRESHOLD,
+    DISTANCE_ENUM,
+    EMBED_BATCH_MAX,
+    EMBED_BATCH_WINDOW_MS,
+    EMBED_CACHE_PATH,
+    EMBED_CACHE_SIZE,
+    EMBED_CONCURRENCY,
+    EMBED_CONFIG_REFRESH,
+    EMBED_MODEL,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE,
+    HYBRID_CANDIDATES,
+    HYBRID_SKIP_MARGIN,
+    HYBRID_SKIP_MAX_TERMS,
+    LEXICAL_REBUILD_INTERVAL,
+    MEMORY_API_ASYNC,
+    OPENAI_API_KEY,
+    OPENAI_BASE_URL,
+    QDRANT_COLLECTION,
+    QDRANT_CONCURRENCY,
+    QDRANT_META_COLLECTION,
+    QDRANT_URL,
+    RRF_K,
+    SEARCH_CACHE_SIZE,
+    SEARCH_CACHE_TTL,
+    SEARCH_PARAMS,
+    SUMMARIZE_GROUP_MAX_TEXTS,
+    SUMMARIZE_GROUP_WINDOW,
+    SUMMARIZE_QUEUE_MAX,
+    SUMMARIZE_QUEUE_PATH,
+    SUMMARIZE_WORKERS,
+    VECTOR_SIZE,
+)
+from dedup import content_hash, merge_payload
+from embed_batcher import EmbeddingBatcher
+from embedding_cache import EmbeddingCache, cache_key
+from filters import PAYLOAD_INDEXES, build_filter
+from lexical_index import (
+    LexicalHit,
+    LexicalIndex,
+    reciprocal_rank_fusion,
+    rrf_normalize,
+    tokenize,
+)
+from search_cache import SearchCache, search_key
+from summarize_queue import SummarizeQueue, merge_metadata
+from telemetry import TraceMiddleware, metrics_payload, record_usage, span, traced
 
+# Konfiguration: config.py; hier die Laufzeit-Objekte des Dienstes
 if not OPENAI_API_KEY or not OPENAI_BASE_URL:
     raise RuntimeError("OPENAI_API_KEY oder OPENAI_BASE_URL fehlt")
 
-EMBED_MODEL = os.getenv(
-    "OPENAI_EMBED_MODEL", "jeffh/intfloat-multilingual-e5-large:q8_0"
+# Cache für Suchergebnisse (TTL + LRU, invalidiert über die Collection-Generation)
+search_cache = SearchCache(max_items=SEARCH_CACHE_SIZE, ttl_s=SEARCH_CACHE_TTL)
+
+http_limits = httpx.Limits(
+    max_connections=HTTP_MAX_CONNECTIONS,
+    max_keepalive_connections=HTTP_MAX_KEEPALIVE,
 )
-CHAT_MODEL = os.getenv("OPENAI_CHAT_MODEL", "GPT-OSS20B")
 
-client_oa = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
+embed_limit = asyncio.Semaphore(EMBED_CONCURRENCY)
+chat_limit = asyncio.Semaphore(CHAT_CONCURRENCY)
+# der lokale In-Memory-Qdrant ist nicht threadsicher -> im Threadpool nur ein Aufruf zugleich
+qdrant_limit = asyncio.Semaphore(
+    1 if QDRANT_URL == ":memory:" and not MEMORY_API_ASYNC else QDRANT_CONCURRENCY
+)
 
-# Qdrant-Konfiguration
-QDRANT_URL = os.getenv("QDRANT_URL", "http://qdrant:6333")
-QDRANT_COLLECTION = os.getenv("QDRANT_COLLECTION", "jar_el_memory")
-VECTOR_SIZE = int(os.getenv("QDRANT_VECTOR_SIZE", "1024"))
-DISTANCE = os.getenv("QDRANT_DISTANCE", "cosine").lower()
+lexical_index = LexicalIndex()
 
-if DISTANCE == "cosine":
-    DISTANCE_ENUM = Distance.COSINE
-elif DISTANCE == "euclid":
-    DISTANCE_ENUM = Distance.EUCLID
-else:
-    DISTANCE_ENUM = Distance.COSINE
+# aktives Embedding-Modell der Collection hinter QDRANT_COLLECTION
+embedding: Dict[str, Any] = {
+    "model": EMBED_MODEL,
+    "vector_size": VECTOR_SIZE,
+    "collection": QDRANT_COLLECTION,
+}
 
-client_qd = QdrantClient(url=QDRANT_URL)
+# Langlebige Hintergrund-Tasks des Dienstes (werden beim Shutdown abgebrochen)
+service_tasks: List["asyncio.Task[None]"] = []
+
+summarize_wakeup = asyncio.Event()
+summarize_stats = {"groups": 0, "jobs": 0, "failed_groups": 0, "rejected": 0}
+summarize_pending_gauge = Gauge(
+    "jarel_summarize_queue_pending", "Wartende summarize_and_store-Jobs"
+)
+
+dedup_stats = {"checked": 0, "exact": 0, "similar": 0, "inserted": 0}
+
+# Clients, Embedding-Cache und Job-Warteschlange entstehen erst in on_startup
+# (init_service): ein Import von main öffnet so weder Verbindungen noch
+# SQLite-Dateien und setzt keine laufenden Jobs einer anderen Instanz zurück
+client_oa: Any = None
+client_qd: Any = None
+embed_cache: Any = None
+summarize_queue: Any = None
+webhook_client: Any = None
+_baker_pending = 0
+_baker_sender: Optional["asyncio.Task[None]"] = None
 
 app = FastAPI(title="Jar-El Memory API", version="0.2.0")
+app.add_middleware(TraceMiddleware)
 
 
 class MemoryItem(BaseModel):
@@ -56,6 +143,7 @@ class QueryRequest(BaseModel):
     query: str
     top_k: int = 5
     filter: Optional[Dict[str, Any]] = None
+    mode: Literal["vector", "hybrid"] = "vector"
 
 
 class SummarizeRequest(BaseModel):
@@ -63,26 +151,157 @@ class SummarizeRequest(BaseModel):
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
 
-def ensure_collection() -> None:
-    collections = client_qd.get_collections().collections
-    if not any(c.name == QDRANT_COLLECTION for c in collections):
-        client_qd.recreate_collection(
+async def call_client(
+    fn: Callable[..., Any], limiter: asyncio.Semaphore, /, **kwargs: Any
+) -> Any:
+    """
+    Führt einen Client-Aufruf aus: im Async-Modus direkt awaited,
+    sonst der blockierende Client im Threadpool. Begrenzt durch `limiter`.
+    """
+    async with limiter:
+        with span(_call_stage(fn, limiter)):
+            if MEMORY_API_ASYNC:
+                return await fn(**kwargs)
+            return await run_in_threadpool(fn, **kwargs)
+
+
+def _call_stage(fn: Callable[..., Any], limiter: asyncio.Semaphore) -> str:
+    # Stufen-Name für Metriken: qdrant.search, qdrant.upsert, ..., openai.embeddings
+    if limiter is qdrant_limit:
+        return f"qdrant.{fn.__name__}"
+    return "openai.embeddings" if limiter is embed_limit else "openai.chat"
+
+
+async def ensure_collection() -> None:
+    # collection_exists löst auch Aliase auf (siehe migrate_collection.py)
+    exists = await call_client(
+        client_qd.collection_exists, qdrant_limit, collection_name=QDRANT_COLLECTION
+    )
+    if not exists:
+        await call_client(
+            client_qd.create_collection,
+            qdrant_limit,
             collection_name=QDRANT_COLLECTION,
-            vectors_config=VectorParams(size=VECTOR_SIZE, distance=DISTANCE_ENUM),
+            vectors_config=COLLECTION_VECTORS,
         )
 
+    # Payload-Indizes für serverseitige Filter (idempotent, auch für bestehende Collections)
+    for field_name, schema in PAYLOAD_INDEXES.items():
+        await call_client(
+            client_qd.create_payload_index,
+            qdrant_limit,
+            collection_name=QDRANT_COLLECTION,
+            field_name=field_name,
+            field_schema=schema,
+        )
 
-def embed_text(texts: List[str]) -> List[List[float]]:
-    if not texts:
-        return []
-    resp = client_oa.embeddings.create(
-        model=EMBED_MODEL,
+
+async def load_embedding_config() -> bool:
+    """
+    Liest das Modell der Collection, auf die QDRANT_COLLECTION gerade zeigt,
+    aus dem Register. Gibt True zurück, wenn sich Collection oder Modell
+    geändert haben; gecachte Suchergebnisse sind dann ungültig.
+    """
+    aliases = await call_client(client_qd.get_aliases, qdrant_limit)
+    collection = physical_collection(aliases, QDRANT_COLLECTION)
+    meta = None
+    if await call_client(
+        client_qd.collection_exists, qdrant_limit, collection_name=QDRANT_META_COLLECTION
+    ):
+        meta = parse_meta(
+            await call_client(
+                client_qd.retrieve,
+                qdrant_limit,
+                collection_name=QDRANT_META_COLLECTION,
+                ids=[meta_id(collection)],
+                with_payload=True,
+            )
+        )
+    model = meta["embed_model"] if meta else EMBED_MODEL
+    vector_size = int(meta.get("vector_size") or VECTOR_SIZE) if meta else VECTOR_SIZE
+    if (collection, model) == (embedding["collection"], embedding["model"]):
+        return False
+
+    embedding.update(model=model, vector_size=vector_size, collection=collection)
+    if model != EMBED_MODEL:
+        print(f"Embedding: {collection} nutzt laut Register {model}, nicht OPENAI_EMBED_MODEL")
+    print(f"Embedding: {collection} mit {model} ({vector_size} Dim.)")
+    search_cache.bump()
+    return True
+
+
+async def _embedding_config_loop() -> None:
+    while True:
+        await asyncio.sleep(EMBED_CONFIG_REFRESH)
+        try:
+            await load_embedding_config()
+        except Exception as exc:
+            print(f"Embedding: Register nicht lesbar: {exc}")
+
+
+async def _embed_remote(texts: List[str], model: str) -> List[List[float]]:
+    resp = await call_client(
+        client_oa.embeddings.create,
+        embed_limit,
+        model=model,
         input=texts,
     )
+    record_usage("embed_text", model, resp.usage)
     return [d.embedding for d in resp.data]
 
 
-def summarize_texts(texts: List[str]) -> str:
+# ein Batcher pro Modell: während eines Modellwechsels dürfen Anfragen mit
+# altem und neuem Modell nicht im selben Embedding-Aufruf landen
+embed_batchers: Dict[str, EmbeddingBatcher] = {}
+
+
+def _embed_batcher(model: str) -> EmbeddingBatcher:
+    batcher = embed_batchers.get(model)
+    if batcher is None:
+
+        async def embed(texts: List[str]) -> List[List[float]]:
+            return await _embed_remote(texts, model)
+
+        batcher = embed_batchers[model] = EmbeddingBatcher(
+            embed, window_ms=EMBED_BATCH_WINDOW_MS, max_batch=EMBED_BATCH_MAX
+        )
+    return batcher
+
+
+async def _embed_cache_io(fn: Callable[..., Any], *args: Any) -> Any:
+    # mit SQLite-Stufe im Threadpool, damit die Platte die Event-Loop nicht blockiert
+    if embed_cache.blocking:
+        return await run_in_threadpool(fn, *args)
+    return fn(*args)
+
+
+@traced("embed_text")
+async def embed_text(texts: List[str], model: Optional[str] = None) -> List[List[float]]:
+    """
+    Bettet `texts` mit `model` ein (Standard: aktives Modell). Schreibpfade
+    lesen das Modell vorher selbst und legen es als `embed_model` in der
+    Payload ab, damit reembed.py --repair Nachzügler eines Wechsels findet.
+    """
+    if not texts:
+        return []
+
+    model = model or embedding["model"]
+    keys = [cache_key(model, t) for t in texts]
+    unique = dict(zip(keys, texts))
+    found: Dict[str, List[float]] = await _embed_cache_io(embed_cache.get_many, list(unique))
+    missing = {key: text for key, text in unique.items() if key not in found}
+
+    if missing:
+        vectors = await _embed_batcher(model).embed(list(missing.values()))
+        fresh = list(zip(missing.keys(), vectors))
+        await _embed_cache_io(embed_cache.put_many, fresh)
+        found.update(fresh)
+
+    return [found[key] for key in keys]
+
+
+@traced("summarize_texts")
+async def summarize_texts(texts: List[str]) -> str:
     joined = "\n\n".join(texts)
     messages = [
         {
@@ -97,17 +316,315 @@ def summarize_texts(texts: List[str]) -> str:
             "content": joined,
         },
     ]
-    resp = client_oa.chat.completions.create(
+    resp = await call_client(
+        client_oa.chat.completions.create,
+        chat_limit,
         model=CHAT_MODEL,
         messages=messages,
         temperature=0.2,
     )
+    record_usage("summarize_texts", CHAT_MODEL, resp.usage)
     return resp.choices[0].message.content
 
 
+def _point_key(point_id: Any) -> Any:
+    """
+    Normalisiert Punkt-IDs so, wie Qdrant sie zurückgibt (UUIDs kleingeschrieben).
+    """
+    if isinstance(point_id, str):
+        try:
+            return str(uuid.UUID(point_id))
+        except ValueError:
+            return point_id
+    return point_id
+
+
+async def scroll_all(
+    scroll_filter: Optional[Filter] = None, batch_size: int = 512, with_vectors: bool = False
+) -> AsyncIterator[List[Any]]:
+    offset = None
+    while True:
+        points, offset = await call_client(
+            client_qd.scroll,
+            qdrant_limit,
+            collection_name=QDRANT_COLLECTION,
+            scroll_filter=scroll_filter,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=with_vectors,
+        )
+        if points:
+            yield points
+        if offset is None:
+            break
+
+
+async def rebuild_lexical_index() -> None:
+    lexical_index.begin_rebuild()
+    docs: List[Tuple[Any, Dict[str, Any]]] = []
+    async for points in scroll_all():
+        docs.extend((p.id, p.payload or {}) for p in points)
+    await run_in_threadpool(lexical_index.replace, docs)
+    print(f"Lexikalischer Index: {len(lexical_index)} Dokumente indexiert.")
+
+
+async def _lexical_index_loop() -> None:
+    # regelmäßiger Neuaufbau erfasst auch Schreibzugriffe am API vorbei (Self-Baker)
+    while True:
+        try:
+            await rebuild_lexical_index()
+        except Exception as exc:
+            print(f"Lexikalischer Index: Aufbau fehlgeschlagen: {exc}")
+        if LEXICAL_REBUILD_INTERVAL <= 0:
+            return
+        await asyncio.sleep(LEXICAL_REBUILD_INTERVAL)
+
+
+async def _send_baker_notifications() -> None:
+    global _baker_pending
+    while _baker_pending:
+        count, _baker_pending = _baker_pending, 0
+        try:
+            await webhook_client.post(BAKER_WEBHOOK_URL, json={"count": count})
+        except httpx.HTTPError as exc:
+            # Polling im Self-Baker fängt verpasste Benachrichtigungen auf
+            print(f"Self-Baker-Benachrichtigung fehlgeschlagen: {exc}")
+
+
+def notify_baker(payloads: List[Dict[str, Any]]) -> None:
+    """
+    Meldet neue ungebackene Einträge an den Self-Baker, ohne den Request zu
+    blockieren. Meldungen, die während eines laufenden POSTs eintreffen,
+    werden zusammengefasst.
+    """
+    global _baker_pending, _baker_sender
+    count = sum(1 for p in payloads if not p.get("baked"))
+    if not BAKER_WEBHOOK_URL or not count:
+        return
+    _baker_pending += count
+    if _baker_sender is None or _baker_sender.done():
+        _baker_sender = asyncio.create_task(_send_baker_notifications())
+
+
+def _dedup_scope(payload: Dict[str, Any]) -> Filter:
+    must: List[Any] = []
+    if payload.get("project"):
+        must.append(FieldCondition(key="project", match=MatchValue(value=payload["project"])))
+    # Zusammenfassungen des Self-Bakers werden nie als Duplikat verwendet
+    return Filter(
+        must=must, must_not=[FieldCondition(key="kind", match=MatchValue(value="summary"))]
+    )
+
+
+async def _find_duplicate(
+    payload: Dict[str, Any], vec: List[float]
+) -> Optional[Tuple[Any, Dict[str, Any], str]]:
+    """
+    Sucht einen bestehenden Punkt mit gleichem Inhalt: erst über den
+    Inhalts-Hash (Payload-Index), dann per Vektorähnlichkeit im selben Projekt.
+    """
+    scope = _dedup_scope(payload)
+    exact = Filter(
+        must=[
+            *scope.must,
+            FieldCondition(key="content_hash", match=MatchValue(value=payload["content_hash"])),
+        ],
+        must_not=scope.must_not,
+    )
+    points, _ = await call_client(
+        client_qd.scroll,
+        qdrant_limit,
+        collection_name=QDRANT_COLLECTION,
+        scroll_filter=exact,
+        limit=1,
+        with_payload=True,
+    )
+    if points:
+        return points[0].id, points[0].payload or {}, "exact"
+
+    results = await call_client(
+        client_qd.search,
+        qdrant_limit,
+        collection_name=QDRANT_COLLECTION,
+        query_vector=vec,
+        query_filter=scope,
+        search_params=SEARCH_PARAMS,
+        limit=1,
+        with_payload=True,
+    )
+    if results and _is_near_duplicate(results[0].score):
+        return results[0].id, results[0].payload or {}, "similar"
+    return None
+
+
+async def _find_exact_duplicates(
+    points: List[PointStruct],
+) -> List[Optional[Tuple[Any, Dict[str, Any], str]]]:
+    """
+    Nur der Inhalts-Hash, für alle `points` mit einem Scroll über die
+    Hashes statt einer Abfrage pro Punkt (Bulk-Import).
+    """
+    hashes = sorted({p.payload["content_hash"] for p in points})
+    by_hash: Dict[str, List[Any]] = {}
+    scope = Filter(
+        must=[FieldCondition(key="content_hash", match=MatchAny(any=hashes))],
+        must_not=[FieldCondition(key="kind", match=MatchValue(value="summary"))],
+    )
+    offset = None
+    while True:
+        records, offset = await call_client(
+            client_qd.scroll,
+            qdrant_limit,
+            collection_name=QDRANT_COLLECTION,
+            scroll_filter=scope,
+            limit=256,
+            offset=offset,
+            with_payload=True,
+        )
+        for r in records:
+            by_hash.setdefault((r.payload or {}).get("content_hash"), []).append(r)
+        if offset is None:
+            break
+
+    found: List[Optional[Tuple[Any, Dict[str, Any], str]]] = []
+    for point in points:
+        project = point.payload.get("project")
+        # wie _dedup_scope: ohne Projekt zählt jeder Treffer, sonst nur im selben Projekt
+        match = next(
+            (
+                r
+                for r in by_hash.get(point.payload["content_hash"], [])
+                if not project or r.payload.get("project") == project
+            ),
+            None,
+        )
+        found.append((match.id, match.payload or {}, "exact") if match else None)
+    return found
+
+
+def _is_near_duplicate(score: float) -> bool:
+    # euclid liefert eine Distanz (kleiner = ähnlicher), cosine eine Ähnlichkeit
+    if DISTANCE_ENUM == Distance.EUCLID:
+        return score <= DEDUP_THRESHOLD
+    return score >= DEDUP_THRESHOLD
+
+
+async def dedup_points(
+    points: List[PointStruct], candidates: Set[int], similar: bool = True
+) -> Tuple[List[PointStruct], List[Dict[str, Any]]]:
+    """
+    Führt Duplikate (Indizes in `candidates`) in bestehende Punkte bzw. in
+    einen früheren Punkt desselben Batches zusammen. Gibt die neu
+    einzufügenden Punkte und die durchgeführten Zusammenführungen zurück.
+    Mit `similar=False` nur über den Inhalts-Hash (eine Abfrage je Batch).
+    """
+    if not DEDUP_ENABLED or not candidates:
+        return points, []
+
+    fresh: List[PointStruct] = []
+    merges: List[Dict[str, Any]] = []
+    by_hash: Dict[Tuple[Any, str], PointStruct] = {}
+    lookups: List[PointStruct] = []
+    for i, point in enumerate(points):
+        if i not in candidates:
+            fresh.append(point)
+            continue
+        key = (point.payload.get("project"), point.payload["content_hash"])
+        first = by_hash.get(key)
+        if first is not None:
+            first.payload.update(merge_payload(first.payload, point.payload))
+            dedup_stats["exact"] += 1
+            merges.append(
+                {"id": first.id, "match": "exact", "seen_count": first.payload["seen_count"]}
+            )
+            continue
+        by_hash[key] = point
+        lookups.append(point)
+
+    dedup_stats["checked"] += len(lookups)
+    if not lookups:
+        found: List[Optional[Tuple[Any, Dict[str, Any], str]]] = []
+    elif similar:
+        found = await asyncio.gather(*(_find_duplicate(p.payload, p.vector) for p in lookups))
+    else:
+        found = await _find_exact_duplicates(lookups)
+
+    for point, duplicate in zip(lookups, found):
+        if duplicate is None:
+            fresh.append(point)
+            continue
+        existing_id, existing, match = duplicate
+        update = merge_payload(existing, point.payload)
+        await call_client(
+            client_qd.set_payload,
+            qdrant_limit,
+            collection_name=QDRANT_COLLECTION,
+            payload=update,
+            points=[existing_id],
+        )
+        lexical_index.add(_point_key(existing_id), {**existing, **update})
+        search_cache.bump()
+        dedup_stats[match] += 1
+        merges.append({"id": existing_id, "match": match, "seen_count": update["seen_count"]})
+
+    dedup_stats["inserted"] += len(fresh)
+    return fresh, merges
+
+
+def init_service() -> None:
+    """
+    Baut Clients, Embedding-Cache und Job-Warteschlange auf. Die Warteschlange
+    gibt beim Öffnen 'processing'-Jobs wieder frei; das darf nur der Prozess
+    tun, der sie auch abarbeitet. Mehrfache Aufrufe sind ohne Wirkung.
+    """
+    global client_oa, client_qd, embed_cache, summarize_queue, webhook_client
+
+    if client_qd is not None:
+        return
+    if MEMORY_API_ASYNC:
+        client_oa = AsyncOpenAI(
+            api_key=OPENAI_API_KEY,
+            base_url=OPENAI_BASE_URL,
+            http_client=DefaultAsyncHttpxClient(limits=http_limits),
+        )
+        qdrant_cls = AsyncQdrantClient
+    else:
+        client_oa = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
+        qdrant_cls = QdrantClient
+
+    # QDRANT_URL=":memory:" startet Qdrant im lokalen In-Memory-Modus (Tests/Benchmarks)
+    if QDRANT_URL == ":memory:":
+        client_qd = qdrant_cls(location=":memory:")
+    else:
+        client_qd = qdrant_cls(url=QDRANT_URL, limits=http_limits)
+
+    embed_cache = EmbeddingCache(max_items=EMBED_CACHE_SIZE, disk_path=EMBED_CACHE_PATH)
+    summarize_queue = SummarizeQueue(SUMMARIZE_QUEUE_PATH)
+    summarize_pending_gauge.set_function(summarize_queue.pending)
+    webhook_client = httpx.AsyncClient(timeout=2.0)
+
+
 @app.on_event("startup")
-def on_startup() -> None:
-    ensure_collection()
+async def on_startup() -> None:
+    init_service()
+    await ensure_collection()
+    await load_embedding_config()
+    if EMBED_CONFIG_REFRESH > 0:
+        service_tasks.append(asyncio.create_task(_embedding_config_loop()))
+    service_tasks.append(asyncio.create_task(_lexical_index_loop()))
+    for _ in range(SUMMARIZE_WORKERS):
+        service_tasks.append(asyncio.create_task(_summarize_worker()))
+
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    for task in service_tasks:
+        task.cancel()
+    await webhook_client.aclose()
+    if MEMORY_API_ASYNC:
+        await client_oa.close()
+        await client_qd.close()
 
 
 @app.get("/health")
@@ -115,16 +632,47 @@ def health() -> Dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/metrics")
+def metrics() -> Response:
+    body, content_type = metrics_payload()
+    return Response(content=body, media_type=content_type)
+
+
+@app.get("/stats")
+def stats() -> Dict[str, Any]:
+    return {
+        "embed_cache": embed_cache.stats(),
+        "embedding": dict(embedding),
+        "embed_batcher": _embed_batcher(embedding["model"]).stats(),
+        "lexical_index": {"ready": lexical_index.ready, "documents": len(lexical_index)},
+        "dedup": {"enabled": DEDUP_ENABLED, "threshold": DEDUP_THRESHOLD, **dedup_stats},
+        "search_cache": search_cache.stats(),
+        "summarize_queue": {
+            "workers": SUMMARIZE_WORKERS,
+            "max_pending": SUMMARIZE_QUEUE_MAX,
+            **summarize_queue.stats(),
+            **summarize_stats,
+        },
+    }
+
+
 @app.post("/memory/upsert")
-def upsert_item(item: MemoryItem) -> Dict[str, Any]:
+async def upsert_item(item: MemoryItem) -> Dict[str, Any]:
     text = item.text.strip()
     if not text:
         raise HTTPException(status_code=400, detail="Text darf nicht leer sein")
 
     item_id = item.id or str(uuid.uuid4())
-    vec = embed_text([text])[0]
+    model = embedding["model"]
+    vec = (await embed_text([text], model))[0]
 
-    payload = {"text": text, "baked": item.metadata.get("baked", False), **item.metadata}
+    payload = {
+        "text": text,
+        "baked": item.metadata.get("baked", False),
+        "content_hash": content_hash(text),
+        **item.metadata,
+        "embed_model": model,
+    }
 
     point = PointStruct(
         id=item_id,
@@ -132,13 +680,24 @@ def upsert_item(item: MemoryItem) -> Dict[str, Any]:
         payload=payload,
     )
 
-    client_qd.upsert(collection_name=QDRANT_COLLECTION, points=[point])
+    # explizite IDs und Zusammenfassungen werden immer geschrieben
+    candidates = {0} if item.id is None and payload.get("kind") != "summary" else set()
+    fresh, merges = await dedup_points([point], candidates)
+    if merges:
+        return {"status": "merged", **merges[0]}
+
+    await call_client(
+        client_qd.upsert, qdrant_limit, collection_name=QDRANT_COLLECTION, points=[point]
+    )
+    lexical_index.add(_point_key(item_id), payload)
+    search_cache.bump()
+    notify_baker([payload])
 
     return {"status": "stored", "id": item_id}
 
 
 @app.post("/memory/batch_upsert")
-def batch_upsert(items: List[MemoryItem]) -> Dict[str, Any]:
+async def batch_upsert(items: List[MemoryItem]) -> Dict[str, Any]:
     if not items:
         raise HTTPException(status_code=400, detail="Leere Liste")
 
@@ -146,12 +705,21 @@ def batch_upsert(items: List[MemoryItem]) -> Dict[str, Any]:
     if any(not t for t in texts):
         raise HTTPException(status_code=400, detail="Alle Texte müssen gefüllt sein")
 
-    vectors = embed_text(texts)
+    model = embedding["model"]
+    vectors = await embed_text(texts, model)
     points: List[PointStruct] = []
 
-    for it, vec in zip(items, vectors):
+    candidates: Set[int] = set()
+
+    for i, (it, vec) in enumerate(zip(items, vectors)):
         item_id = it.id or str(uuid.uuid4())
-        payload = {"text": it.text, "baked": it.metadata.get("baked", False), **it.metadata}
+        payload = {
+            "text": it.text,
+            "baked": it.metadata.get("baked", False),
+            "content_hash": content_hash(it.text),
+            **it.metadata,
+            "embed_model": model,
+        }
         points.append(
             PointStruct(
                 id=item_id,
@@ -159,53 +727,446 @@ def batch_upsert(items: List[MemoryItem]) -> Dict[str, Any]:
                 payload=payload,
             )
         )
+        if it.id is None and payload.get("kind") != "summary":
+            candidates.add(i)
 
-    client_qd.upsert(collection_name=QDRANT_COLLECTION, points=points)
+    points, merges = await dedup_points(points, candidates)
+    if points:
+        await call_client(
+            client_qd.upsert, qdrant_limit, collection_name=QDRANT_COLLECTION, points=points
+        )
+    lexical_index.add_many((_point_key(p.id), p.payload) for p in points)
+    search_cache.bump()
+    notify_baker([p.payload for p in points])
 
-    return {"status": "stored", "count": len(points)}
+    return {"status": "stored", "count": len(points), "merged": len(merges)}
 
 
-@app.post("/memory/search")
-def search(req: QueryRequest) -> Dict[str, Any]:
-    query = req.query.strip()
-    if not query:
-        raise HTTPException(status_code=400, detail="Query darf nicht leer sein")
+# Fortschritt laufender und zuletzt beendeter Bulk-Importe
+bulk_jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+
+async def _iter_ndjson_lines(request: Request) -> AsyncIterator[Tuple[int, bytes]]:
+    buffer = b""
+    line_no = 0
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for raw in lines:
+            line_no += 1
+            yield line_no, raw
+    if buffer:
+        yield line_no + 1, buffer
+
+
+def _parse_bulk_line(raw: bytes) -> Tuple[MemoryItem, str]:
+    item = MemoryItem.model_validate(json.loads(raw))
+    text = item.text.strip()
+    if not text:
+        raise ValueError("Text darf nicht leer sein")
+    return item, text
+
+
+def _record_bulk_chunk(job: Dict[str, Any], chunk: Dict[str, Any]) -> None:
+    merged = 0 if chunk["error"] else chunk["merged"]
+    stored = 0 if chunk["error"] else len(chunk["items"]) - merged
+    failed = len(chunk["line_errors"]) + (len(chunk["items"]) if chunk["error"] else 0)
+    job["stored"] += stored
+    job["merged"] += merged
+    job["failed"] += failed
+    job["chunks"].append(
+        {
+            "chunk": chunk["index"],
+            "first_line": chunk["first_line"],
+            "last_line": chunk["last_line"],
+            "stored": stored,
+            "merged": merged,
+            "failed": failed,
+            "error": chunk["error"],
+            "line_errors": chunk["line_errors"],
+        }
+    )
+    print(
+        f"Bulk-Import {job['job_id']}: Chunk {chunk['index']} "
+        f"(Zeilen {chunk['first_line']}-{chunk['last_line']}): "
+        f"{stored} gespeichert, {merged} zusammengeführt, {failed} fehlgeschlagen"
+    )
+
+
+@app.post("/memory/bulk_import")
+async def bulk_import(
+    request: Request,
+    chunk_size: int = Query(BULK_CHUNK_SIZE, ge=1, le=2048),
+    job_id: Optional[str] = None,
+    dedup: bool = True,
+) -> Dict[str, Any]:
+    """
+    Importiert MemoryItems aus einem NDJSON-Body (eine JSON-Zeile pro Item).
+    Der Body wird gestreamt gelesen und in Chunks zerlegt; Chunk N+1 wird
+    eingebettet, während Chunk N in Qdrant geschrieben wird. Fehlerhafte
+    Zeilen oder Chunks werden gemeldet, ohne den Import abzubrechen.
+    Duplikate werden nur über den Inhalts-Hash erkannt (eine Abfrage pro
+    Chunk, ohne Vektorähnlichkeit); `dedup=false` schaltet das ab.
+    Den Fortschritt liefert GET /memory/bulk_import/{job_id}.
+    """
+    job_id = job_id or str(uuid.uuid4())
+    job: Dict[str, Any] = {
+        "job_id": job_id,
+        "status": "running",
+        "lines": 0,
+        "stored": 0,
+        "merged": 0,
+        "failed": 0,
+        "chunks": [],
+    }
+    bulk_jobs[job_id] = job
+    while len(bulk_jobs) > BULK_JOBS_KEEP:
+        bulk_jobs.popitem(last=False)
+
+    embed_queue: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue(BULK_MAX_IN_FLIGHT)
+    upsert_queue: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue(BULK_MAX_IN_FLIGHT)
+
+    async def embed_stage() -> None:
+        while (chunk := await embed_queue.get()) is not None:
+            if chunk["items"]:
+                try:
+                    chunk["model"] = embedding["model"]
+                    chunk["vectors"] = await embed_text(
+                        [text for _, _, text in chunk["items"]], chunk["model"]
+                    )
+                except Exception as exc:
+                    chunk["error"] = f"Embedding fehlgeschlagen: {exc}"
+            await upsert_queue.put(chunk)
+        await upsert_queue.put(None)
+
+    async def upsert_stage() -> None:
+        while (chunk := await upsert_queue.get()) is not None:
+            if chunk["items"] and not chunk["error"]:
+                points = [
+                    PointStruct(
+                        id=item.id or str(uuid.uuid4()),
+                        vector=vec,
+                        payload={
+                            "text": text,
+                            "baked": item.metadata.get("baked", False),
+                            "content_hash": content_hash(text),
+                            **item.metadata,
+                            "embed_model": chunk["model"],
+                        },
+                    )
+                    for (_, item, text), vec in zip(chunk["items"], chunk["vectors"])
+                ]
+                candidates = {
+                    i
+                    for i, ((_, item, _), p) in enumerate(zip(chunk["items"], points))
+                    if dedup and item.id is None and p.payload.get("kind") != "summary"
+                }
+                try:
+                    points, merges = await dedup_points(points, candidates, similar=False)
+                    chunk["merged"] = len(merges)
+                    if points:
+                        await call_client(
+                            client_qd.upsert,
+                            qdrant_limit,
+                            collection_name=QDRANT_COLLECTION,
+                            points=points,
+                        )
+                except Exception as exc:
+                    chunk["error"] = f"Upsert fehlgeschlagen: {exc}"
+                else:
+                    lexical_index.add_many((_point_key(p.id), p.payload) for p in points)
+                    search_cache.bump()
+                    notify_baker([p.payload for p in points])
+            _record_bulk_chunk(job, chunk)
+
+    def new_chunk(index: int, first_line: int) -> Dict[str, Any]:
+        return {
+            "index": index,
+            "first_line": first_line,
+            "last_line": first_line,
+            "items": [],
+            "line_errors": [],
+            "vectors": None,
+            "model": None,
+            "merged": 0,
+            "error": None,
+        }
+
+    stages = [asyncio.create_task(embed_stage()), asyncio.create_task(upsert_stage())]
+    try:
+        chunk = new_chunk(0, 1)
+        async for line_no, raw in _iter_ndjson_lines(request):
+            if not raw.strip():
+                continue
+            job["lines"] += 1
+            try:
+                item, text = _parse_bulk_line(raw)
+            except (ValueError, ValidationError) as exc:
+                chunk["line_errors"].append({"line": line_no, "error": str(exc)})
+            else:
+                chunk["items"].append((line_no, item, text))
+            chunk["last_line"] = line_no
+
+            if len(chunk["items"]) >= chunk_size:
+                await embed_queue.put(chunk)
+                chunk = new_chunk(chunk["index"] + 1, line_no + 1)
 
-    qvec = embed_text([query])[0]
+        if chunk["items"] or chunk["line_errors"]:
+            await embed_queue.put(chunk)
+        await embed_queue.put(None)
+        await asyncio.gather(*stages)
+    except BaseException:
+        for task in stages:
+            task.cancel()
+        job["status"] = "aborted"
+        raise
 
-    results = client_qd.search(
+    job["status"] = "done"
+    return job
+
+
+@app.get("/memory/bulk_import/{job_id}")
+def bulk_import_status(job_id: str) -> Dict[str, Any]:
+    job = bulk_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unbekannter Import-Job")
+    return job
+
+
+async def _vector_search(
+    query: str, limit: int, query_filter: Optional[Filter]
+) -> List[Dict[str, Any]]:
+    qvec = (await embed_text([query]))[0]
+
+    results = await call_client(
+        client_qd.search,
+        qdrant_limit,
         collection_name=QDRANT_COLLECTION,
         query_vector=qvec,
-        limit=req.top_k,
+        query_filter=query_filter,
+        search_params=SEARCH_PARAMS,
+        limit=limit,
         with_payload=True,
     )
 
     matches = []
     for res in results:
-        matches.append(
-            {
-                "id": res.id,
-                "score": res.score,
-                "payload": res.payload,
-            }
+        match = {
+            "id": res.id,
+            "score": _similarity(res.score),
+            "payload": res.payload,
+            "source": "vector",
+        }
+        if DISTANCE_ENUM == Distance.EUCLID:
+            match["distance"] = res.score
+        matches.append(match)
+    return matches
+
+
+def _similarity(score: float) -> float:
+    # Qdrant-Score auf 0..1 (größer = ähnlicher): euclid liefert eine Distanz,
+    # cosine kann bei gegenläufigen Vektoren negativ werden
+    if DISTANCE_ENUM == Distance.EUCLID:
+        return 1.0 / (1.0 + score)
+    return max(0.0, score)
+
+
+async def _lexical_payloads(
+    hits: List[LexicalHit], query_filter: Optional[Filter]
+) -> Dict[Any, Dict[str, Any]]:
+    """
+    Lädt die Payloads der BM25-Treffer und wendet dabei den Suchfilter an.
+    """
+    if not hits:
+        return {}
+    conditions: List[Any] = [HasIdCondition(has_id=[h.id for h in hits])]
+    if query_filter is not None:
+        conditions.extend(query_filter.must or [])
+    points, _ = await call_client(
+        client_qd.scroll,
+        qdrant_limit,
+        collection_name=QDRANT_COLLECTION,
+        scroll_filter=Filter(must=conditions),
+        limit=len(hits),
+        with_payload=True,
+    )
+    return {p.id: p.payload for p in points}
+
+
+def _lexical_is_confident(query: str, hits: List[LexicalHit]) -> bool:
+    """
+    Eindeutiger Stichwort-Treffer: kurze Query, alle Terme im besten Dokument
+    und deutlicher Abstand zum zweitbesten Treffer.
+    """
+    if HYBRID_SKIP_MARGIN <= 0 or not hits:
+        return False
+    if len(set(tokenize(query))) > HYBRID_SKIP_MAX_TERMS:
+        return False
+    top = hits[0]
+    if top.coverage < 1.0:
+        return False
+    return len(hits) == 1 or top.score >= HYBRID_SKIP_MARGIN * hits[1].score
+
+
+async def _hybrid_search(
+    query: str, top_k: int, query_filter: Optional[Filter]
+) -> List[Dict[str, Any]]:
+    """
+    BM25 und Vektorsuche, per RRF fusioniert. `score` ist der auf 0..1
+    skalierte RRF-Score (1.0 = Rang 1 in beiden Rankings), der Rohwert steht
+    in `rrf` bzw. bei rein lexikalischen Treffern in `bm25`.
+    """
+    if not lexical_index.ready:
+        return await _vector_search(query, top_k, query_filter)
+
+    candidates = max(top_k, HYBRID_CANDIDATES)
+    hits = lexical_index.search(query, candidates)
+
+    if _lexical_is_confident(query, hits):
+        payloads = await _lexical_payloads(hits, query_filter)
+        if hits[0].id in payloads:
+            # Embedding-Aufruf komplett sparen; Score wie im hybriden Fall aus den Rängen
+            bm25 = {h.id: h.score for h in hits}
+            ranked = reciprocal_rank_fusion([[h.id for h in hits if h.id in payloads]], k=RRF_K)
+            return [
+                {
+                    "id": doc_id,
+                    "score": rrf_normalize(score, 1, RRF_K),
+                    "bm25": bm25[doc_id],
+                    "payload": payloads[doc_id],
+                    "source": "lexical",
+                }
+                for doc_id, score in ranked[:top_k]
+            ]
+        dense = await _vector_search(query, candidates, query_filter)
+    else:
+        dense, payloads = await asyncio.gather(
+            _vector_search(query, candidates, query_filter),
+            _lexical_payloads(hits, query_filter),
         )
 
+    for match in dense:
+        payloads[match["id"]] = match["payload"]
+
+    fused = reciprocal_rank_fusion(
+        [[h.id for h in hits if h.id in payloads], [m["id"] for m in dense]], k=RRF_K
+    )
+    return [
+        {
+            "id": doc_id,
+            "score": rrf_normalize(score, 2, RRF_K),
+            "rrf": score,
+            "payload": payloads[doc_id],
+            "source": "hybrid",
+        }
+        for doc_id, score in fused[:top_k]
+    ]
+
+
+@app.post("/memory/search")
+async def search(req: QueryRequest) -> Dict[str, Any]:
+    query = req.query.strip()
+    if not query:
+        raise HTTPException(status_code=400, detail="Query darf nicht leer sein")
+
+    try:
+        query_filter = build_filter(req.filter)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"Ungültiger Filter: {exc}")
+
+    key = search_key(query, req.top_k, req.mode, req.filter)
+    cached = search_cache.get(key)
+    if cached is not None:
+        return {"matches": cached}
+
+    # Generation vor der Suche merken: Schreibzugriffe währenddessen verwerfen das Ergebnis
+    generation = search_cache.generation
+    if req.mode == "hybrid":
+        matches = await _hybrid_search(query, req.top_k, query_filter)
+    else:
+        matches = await _vector_search(query, req.top_k, query_filter)
+
+    search_cache.put(key, generation, matches)
     return {"matches": matches}
 
 
-def _summarize_and_store(texts: List[str], metadata: Dict[str, Any]) -> None:
-    summary = summarize_texts(texts)
+@app.post("/memory/embedding/reload")
+async def reload_embedding() -> Dict[str, Any]:
+    """
+    Liest das Embedding-Modell sofort aus dem Register, z.B. direkt nach dem
+    Alias-Wechsel durch reembed.py, und verwirft gecachte Suchergebnisse.
+    """
+    changed = await load_embedding_config()
+    return {"changed": changed, "generation": search_cache.bump(), **embedding}
+
+
+@app.post("/memory/cache/invalidate")
+def invalidate_cache() -> Dict[str, Any]:
+    """
+    Verwirft alle gecachten Suchergebnisse, z.B. nach Schreibzugriffen am
+    API vorbei (Self-Baker).
+    """
+    return {"status": "invalidated", "generation": search_cache.bump()}
+
+
+async def _summarize_and_store(texts: List[str], metadata: Dict[str, Any]) -> None:
+    summary = await summarize_texts(texts)
     meta = {**metadata, "kind": metadata.get("kind", "summary"), "baked": True}
     item = MemoryItem(text=summary, metadata=meta)
-    upsert_item(item)
+    await upsert_item(item)
+
+
+async def _summarize_worker() -> None:
+    """
+    Arbeitet die Job-Warteschlange ab; Jobs mit gleichen Metadaten (bis auf
+    Tags und Zeitstempel) innerhalb von SUMMARIZE_GROUP_WINDOW Sekunden werden
+    in einem Aufruf zusammengefasst. SQLite-Zugriffe laufen im Threadpool.
+    """
+    while True:
+        jobs = await run_in_threadpool(
+            summarize_queue.claim_group, SUMMARIZE_GROUP_WINDOW, SUMMARIZE_GROUP_MAX_TEXTS
+        )
+        if not jobs:
+            summarize_wakeup.clear()
+            try:
+                await asyncio.wait_for(
+                    summarize_wakeup.wait(), timeout=max(0.2, SUMMARIZE_GROUP_WINDOW / 2)
+                )
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        ids = [job["id"] for job in jobs]
+        texts = [text for job in jobs for text in job["texts"]]
+        try:
+            # ein Trace pro Gruppe; die Trace-IDs der einreihenden Anfragen
+            # werden nicht in der Warteschlange gespeichert
+            with span("summarize_group", job_ids=ids):
+                await _summarize_and_store(texts, merge_metadata(jobs))
+        except Exception as exc:
+            print(f"Summarize-Queue: Jobs {ids} fehlgeschlagen: {exc}")
+            await run_in_threadpool(summarize_queue.retry, ids, str(exc))
+            summarize_stats["failed_groups"] += 1
+        else:
+            await run_in_threadpool(summarize_queue.ack, ids)
+            summarize_stats["groups"] += 1
+            summarize_stats["jobs"] += len(jobs)
 
 
 @app.post("/memory/summarize_and_store")
-def summarize_and_store(
-    req: SummarizeRequest, background_tasks: BackgroundTasks
-) -> Dict[str, Any]:
+async def summarize_and_store(req: SummarizeRequest) -> Dict[str, Any]:
     if not req.texts:
         raise HTTPException(status_code=400, detail="texts darf nicht leer sein")
 
-    background_tasks.add_task(_summarize_and_store, req.texts, req.metadata)
-    return {"status": "scheduled", "items": len(req.texts)}
+    # Gegendruck: volle Warteschlange -> 429, der Aufrufer wiederholt später
+    if summarize_queue.pending() >= SUMMARIZE_QUEUE_MAX:
+        summarize_stats["rejected"] += 1
+        raise HTTPException(
+            status_code=429,
+            detail="Summarize-Warteschlange voll",
+            headers={"Retry-After": str(max(1, int(SUMMARIZE_GROUP_WINDOW)))},
+        )
+
+    job_id = await run_in_threadpool(summarize_queue.enqueue, req.texts, req.metadata)
+    summarize_wakeup.set()
+    return {"status": "scheduled", "job_id": job_id, "items": len(req.texts)}
@@ -0,0 +1,422 @@
+"""
+Baut die Memory-Collection mit der aktuellen Speicher-Konfiguration
+(QDRANT_ON_DISK, QDRANT_QUANTIZATION, QDRANT_HNSW_*) neu auf, ohne die
+Memory-API anzuhalten:
+
+    QDRANT_QUANTIZATION=scalar QDRANT_ON_DISK=true python migrate_collection.py
+
+Ablauf:
+1. neue Collection `<QDRANT_COLLECTION>_<Zeitstempel>` mit neuer Konfiguration
+   und Payload-Indizes anlegen,
+2. alle Punkte samt Vektoren per Scroll-Cursor kopieren (kein Re-Embedding)
+   und so lange abgleichen, bis keine Änderungen mehr nachkommen: neue Punkte,
+   geänderte Payloads (z.B. baked-Flags, Duplikat-Zähler) und Löschungen,
+3. den Alias QDRANT_COLLECTION atomar auf die neue Collection umstellen,
+4. Änderungen, die noch kurz vor dem Wechsel in der alten Collection
+   ankamen, per Drei-Wege-Abgleich übernehmen. Was seit dem Wechsel in der
+   neuen Collection geändert wurde, hat Vorrang.
+
+Die alte Collection bleibt erhalten (--drop-source löscht sie nach Schritt 4).
+
+Ist QDRANT_COLLECTION noch eine echte Collection (erste Migration), lässt sie
+sich nicht atomar durch einen gleichnamigen Alias ersetzen. Dann zeigt ein
+neuer Alias auf die neue Collection:
+
+    python migrate_collection.py --new-alias jar_el_memory_live
+    # QDRANT_COLLECTION=jar_el_memory_live setzen, Memory-API und Self-Baker neu starten
+    python migrate_collection.py --finish
+
+`--finish` übernimmt die Schreibzugriffe, die bis zum Neustart noch in der
+alten Collection landeten (Stand in MIGRATE_STATE).
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import httpx
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import (
+    CreateAlias,
+    CreateAliasOperation,
+    DeleteAlias,
+    DeleteAliasOperation,
+    PointIdsList,
+    PointStruct,
+    VectorParams,
+)
+
+from collection_meta import read_meta, write_meta
+from config import COLLECTION_VECTORS, QDRANT_COLLECTION, QDRANT_META_COLLECTION, QDRANT_URL
+from filters import PAYLOAD_INDEXES
+
+MIGRATE_STATE = os.getenv("MIGRATE_STATE", "migrate_state.json")
+MEMORY_API_URL = os.getenv("MEMORY_API_URL", "http://localhost:8000")
+
+
+def make_client() -> QdrantClient:
+    if QDRANT_URL == ":memory:":
+        return QdrantClient(location=":memory:")
+    return QdrantClient(url=QDRANT_URL, timeout=120)
+
+
+def resolve_alias(client: QdrantClient, alias: str) -> Optional[str]:
+    for description in client.get_aliases().aliases:
+        if description.alias_name == alias:
+            return description.collection_name
+    return None
+
+
+def invalidate_search_cache(reload_embedding: bool = False) -> bool:
+    """
+    Verwirft die gecachten Suchergebnisse der laufenden Memory-API, nachdem ein
+    Skript am API vorbei geschrieben oder den Alias umgestellt hat. Mit
+    `reload_embedding` liest sie zusätzlich das Modell-Register neu.
+    """
+    endpoint = "/memory/embedding/reload" if reload_embedding else "/memory/cache/invalidate"
+    try:
+        resp = httpx.post(f"{MEMORY_API_URL}{endpoint}", timeout=10)
+        resp.raise_for_status()
+    except httpx.HTTPError as exc:
+        print(
+            f"Cache-Invalidierung über {MEMORY_API_URL} fehlgeschlagen ({exc}); "
+            "alte Suchergebnisse verfallen erst nach SEARCH_CACHE_TTL, sofort nur "
+            "mit einem Neustart der Memory-API."
+        )
+        return False
+    print(f"Suchergebnis-Cache der Memory-API unter {MEMORY_API_URL} verworfen.")
+    return True
+
+
+def create_target(client: QdrantClient, name: str, vectors: VectorParams) -> None:
+    client.create_collection(collection_name=name, vectors_config=vectors)
+    for field_name, schema in PAYLOAD_INDEXES.items():
+        client.create_payload_index(
+            collection_name=name, field_name=field_name, field_schema=schema
+        )
+
+
+def payload_hash(payload: Optional[Dict[str, Any]]) -> str:
+    # embed_model unterscheidet sich nach einem Re-Embedding und zählt nicht als Änderung
+    data = {k: v for k, v in (payload or {}).items() if k != "embed_model"}
+    raw = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _key(point_id: Any) -> str:
+    return str(point_id)
+
+
+def _point_id(key: str) -> Any:
+    # Qdrant-IDs sind UUIDs oder ganze Zahlen; JSON-Schlüssel sind immer Strings
+    return int(key) if key.isdigit() else key
+
+
+class PointCopier:
+    """
+    Gleicht die Punkte zweier Collections ab und kopiert dabei die Vektoren
+    unverändert. `Reembedder` (reembed.py) bettet stattdessen neu ein.
+
+    `base` hält pro Punkt-ID den Payload-Hash, mit dem der Punkt zuletzt ins
+    Ziel geschrieben wurde; daran erkennt `sync_late`, auf welcher Seite sich
+    ein Punkt seitdem geändert hat.
+    """
+
+    copy_vectors = True
+
+    def __init__(self, client: QdrantClient, batch_size: int = 256) -> None:
+        self.client = client
+        self.batch_size = batch_size
+
+    def write(self, target: str, records: List[Any]) -> int:
+        if not records:
+            return 0
+        points = [PointStruct(id=r.id, vector=r.vector, payload=r.payload) for r in records]
+        self.client.upsert(collection_name=target, points=points, wait=True)
+        return len(points)
+
+    def target_payload(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return payload
+
+    def _write_payload(self, target: str, point_id: Any, payload: Dict[str, Any]) -> None:
+        self.client.overwrite_payload(
+            collection_name=target, payload=self.target_payload(payload), points=[point_id]
+        )
+
+    def _delete(self, target: str, keys: List[str]) -> None:
+        if keys:
+            self.client.delete(
+                collection_name=target,
+                points_selector=PointIdsList(points=[_point_id(k) for k in keys]),
+                wait=True,
+            )
+
+    def _pages(
+        self, collection: str, with_payload: bool = True, with_vectors: bool = False
+    ) -> Iterator[List[Any]]:
+        offset = None
+        while True:
+            records, offset = self.client.scroll(
+                collection_name=collection,
+                limit=self.batch_size,
+                offset=offset,
+                with_payload=with_payload,
+                with_vectors=with_vectors,
+            )
+            if records:
+                yield records
+            if offset is None:
+                return
+
+    def _present(self, target: str, ids: List[Any]) -> Dict[str, Dict[str, Any]]:
+        return {
+            _key(r.id): r.payload or {}
+            for r in self.client.retrieve(
+                collection_name=target, ids=ids, with_payload=True, with_vectors=False
+            )
+        }
+
+    def sync(self, source: str, target: str, base: Dict[str, str]) -> int:
+        """
+        Macht `target` gleich `source` (solange nur dieser Abgleich ins Ziel
+        schreibt): fehlende und geänderte Punkte übernehmen, im Ziel
+        überzählige löschen. Gibt die Anzahl der Änderungen zurück.
+        """
+        changed = 0
+        seen: Set[str] = set()
+        for records in self._pages(source, with_vectors=self.copy_vectors):
+            present = self._present(target, [r.id for r in records])
+            stale = []
+            for r in records:
+                key = _key(r.id)
+                seen.add(key)
+                payload = r.payload or {}
+                current = present.get(key)
+                if current is None or current.get("text") != payload.get("text"):
+                    stale.append(r)
+                elif payload_hash(current) != payload_hash(payload):
+                    self._write_payload(target, r.id, payload)
+                    changed += 1
+                base[key] = payload_hash(payload)
+            changed += self.write(target, stale)
+
+        extra = [
+            _key(r.id)
+            for records in self._pages(target, with_payload=False)
+            for r in records
+            if _key(r.id) not in seen
+        ]
+        self._delete(target, extra)
+        for key in extra:
+            base.pop(key, None)
+        return changed + len(extra)
+
+    def converge(self, source: str, target: str, base: Dict[str, str], rounds: int = 5) -> int:
+        """
+        Wiederholt `sync`, bis ein Durchlauf nichts mehr ändert (höchstens
+        `rounds` Mal), damit die Lücke bis zum Alias-Wechsel klein bleibt.
+        """
+        total = 0
+        for _ in range(rounds):
+            changed = self.sync(source, target, base)
+            total += changed
+            if not changed:
+                break
+        return total
+
+    def sync_late(self, source: str, target: str, base: Dict[str, str]) -> Tuple[int, int]:
+        """
+        Drei-Wege-Abgleich nach dem Wechsel, wenn auch ins Ziel geschrieben
+        wird: Änderungen aus `source` seit `base` werden übernommen, sofern
+        der Punkt im Ziel seitdem unverändert ist; sonst gewinnt das Ziel.
+        Gibt (übernommen, Konflikte) zurück.
+        """
+        applied = 0
+        conflicts = 0
+        seen: Set[str] = set()
+        for records in self._pages(source, with_vectors=self.copy_vectors):
+            changed = [r for r in records if payload_hash(r.payload) != base.get(_key(r.id))]
+            seen.update(_key(r.id) for r in records)
+            if not changed:
+                continue
+            present = self._present(target, [r.id for r in changed])
+            stale = []
+            for r in changed:
+                key = _key(r.id)
+                payload = r.payload or {}
+                current = present.get(key)
+                if key not in base:
+                    # neu in der alten Collection
+                    if current is None:
+                        stale.append(r)
+                    else:
+                        conflicts += 1
+                elif current is None or payload_hash(current) != base[key]:
+                    # im Ziel seitdem gelöscht oder geändert
+                    conflicts += 1
+                elif current.get("text") != payload.get("text"):
+                    stale.append(r)
+                else:
+                    self._write_payload(target, r.id, payload)
+                    applied += 1
+            applied += self.write(target, stale)
+
+        gone = [key for key in base if key not in seen]
+        for start in range(0, len(gone), self.batch_size):
+            chunk = gone[start:start + self.batch_size]
+            present = self._present(target, [_point_id(k) for k in chunk])
+            deletable = [k for k in chunk if k in present and payload_hash(present[k]) == base[k]]
+            conflicts += sum(1 for k in chunk if k in present and k not in deletable)
+            self._delete(target, deletable)
+            applied += len(deletable)
+        return applied, conflicts
+
+
+def create_alias(client: QdrantClient, alias: str, target: str) -> None:
+    client.update_collection_aliases(
+        change_aliases_operations=[
+            CreateAliasOperation(create_alias=CreateAlias(collection_name=target, alias_name=alias))
+        ]
+    )
+
+
+def switch_alias(client: QdrantClient, alias: str, target: str) -> str:
+    """
+    Stellt den bestehenden Alias `alias` atomar auf `target` um und gibt die
+    vorherige Collection zurück.
+    """
+    previous = resolve_alias(client, alias)
+    if previous is None:
+        raise ValueError(
+            f"{alias} ist eine Collection, kein Alias; erste Migration mit --new-alias"
+        )
+
+    # beide Operationen in einem Request -> atomarer Wechsel
+    client.update_collection_aliases(
+        change_aliases_operations=[
+            DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=alias)),
+            CreateAliasOperation(create_alias=CreateAlias(collection_name=target, alias_name=alias)),
+        ]
+    )
+    return previous
+
+
+def finish_late_sync(
+    copier: PointCopier, previous: str, target: str, base: Dict[str, str], drop_source: bool
+) -> None:
+    applied, conflicts = copier.sync_late(previous, target, base)
+    if applied:
+        print(f"Migration: {applied} späte Änderungen nachgezogen.")
+        invalidate_search_cache()
+    if conflicts:
+        print(f"Migration: {conflicts} Punkte auf beiden Seiten geändert, neue Collection behalten.")
+    if drop_source:
+        copier.client.delete_collection(collection_name=previous)
+        print(f"Migration: alte Collection {previous} gelöscht.")
+    else:
+        print(f"Migration: alte Collection {previous} bleibt erhalten.")
+
+
+def save_state(state: Dict[str, Any]) -> None:
+    tmp = MIGRATE_STATE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, MIGRATE_STATE)
+
+
+def migrate(
+    client: QdrantClient,
+    alias: str,
+    vectors: VectorParams,
+    batch_size: int = 256,
+    target: Optional[str] = None,
+    drop_source: bool = False,
+    new_alias: Optional[str] = None,
+) -> str:
+    previous = resolve_alias(client, alias)
+    if previous is None and not new_alias:
+        raise SystemExit(
+            f"{alias} ist noch eine echte Collection und lässt sich nicht atomar ersetzen; "
+            "mit --new-alias NAME migrieren (siehe --help)."
+        )
+    source = previous or alias
+    target = target or f"{alias}_{time.strftime('%Y%m%d%H%M%S')}"
+
+    print(f"Migration: {source} -> {target}")
+    # Vektorgröße der Quelle übernehmen (nach reembed.py evtl. ≠ QDRANT_VECTOR_SIZE)
+    size = client.get_collection(source).config.params.vectors.size
+    create_target(client, target, vectors.model_copy(update={"size": size}))
+    meta = read_meta(client, QDRANT_META_COLLECTION, source)
+    if meta is not None:
+        # Embedding-Modell der Quelle gilt auch für die Kopie
+        write_meta(client, QDRANT_META_COLLECTION, target, meta["embed_model"], size)
+    copier = PointCopier(client, batch_size)
+    base: Dict[str, str] = {}
+    synced = copier.converge(source, target, base)
+    print(f"Migration: {len(base)} Punkte abgeglichen ({synced} Änderungen).")
+
+    if previous is None:
+        create_alias(client, new_alias, target)
+        save_state({"source": source, "target": target, "base": base})
+        print(
+            f"Migration: Alias {new_alias} zeigt auf {target}, {source} bleibt unverändert. "
+            f"Jetzt QDRANT_COLLECTION={new_alias} setzen, Memory-API und Self-Baker neu "
+            "starten und danach `python migrate_collection.py --finish` ausführen."
+        )
+        return target
+
+    switch_alias(client, alias, target)
+    print(f"Migration: Alias {alias} zeigt jetzt auf {target}.")
+    invalidate_search_cache()
+    finish_late_sync(copier, previous, target, base, drop_source)
+    return target
+
+
+def finish(client: QdrantClient, batch_size: int = 256, drop_source: bool = False) -> None:
+    if not os.path.exists(MIGRATE_STATE):
+        raise SystemExit(f"Kein Migrationsstand in {MIGRATE_STATE}.")
+    with open(MIGRATE_STATE, encoding="utf-8") as f:
+        state = json.load(f)
+    finish_late_sync(
+        PointCopier(client, batch_size), state["source"], state["target"], state["base"], drop_source
+    )
+    os.remove(MIGRATE_STATE)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--target", help="Name der neuen Collection (Standard: mit Zeitstempel)")
+    parser.add_argument(
+        "--new-alias", help="erste Migration: Alias für die neue Collection (≠ QDRANT_COLLECTION)"
+    )
+    parser.add_argument(
+        "--finish", action="store_true", help="nach dem Neustart späte Schreibzugriffe nachziehen"
+    )
+    parser.add_argument(
+        "--drop-source", action="store_true", help="alte Collection nach dem Abgleich löschen"
+    )
+    args = parser.parse_args()
+
+    client = make_client()
+    if args.finish:
+        finish(client, batch_size=args.batch_size, drop_source=args.drop_source)
+        return
+    migrate(
+        client,
+        QDRANT_COLLECTION,
+        COLLECTION_VECTORS,
+        batch_size=args.batch_size,
+        target=args.target,
+        drop_source=args.drop_source,
+        new_alias=args.new_alias,
+    )
+
+
+if __name__ == "__main__":
+    main()
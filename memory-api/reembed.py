@@ -0,0 +1,351 @@
+"""
+Bettet alle Punkte der Memory-Collection mit einem neuen Embedding-Modell neu
+ein, während die Memory-API weiterläuft:
+
+    python reembed.py --model NEUES_MODELL --vector-size 768
+    python reembed.py --model NEUES_MODELL --vector-size 768 --swap
+    python reembed.py --repair
+
+Ablauf:
+1. Schatten-Collection `<QDRANT_COLLECTION>_<Zeitstempel>` mit der neuen
+   Vektorgröße und Payload-Indizes anlegen,
+2. die Texte aller Punkte per Scroll-Cursor in großen Batches lesen, mit dem
+   neuen Modell einbetten und samt Payload in die Schatten-Collection
+   schreiben; der Fortschritt steht nach jedem Batch im Checkpoint
+   (REEMBED_CHECKPOINT), ein abgebrochener Lauf setzt dort wieder an,
+3. abgleichen, bis keine Änderungen mehr nachkommen (neue und geänderte
+   Punkte, Löschungen; neu eingebettet wird nur bei geändertem Text),
+4. mit `--swap`: Modell und Vektorgröße der Schatten-Collection im Register
+   (QDRANT_META_COLLECTION) eintragen, den Alias QDRANT_COLLECTION atomar
+   umstellen und die Memory-API (POST /memory/embedding/reload) sofort auf
+   das neue Modell umschalten. Der Self-Baker liest das Register vor jedem
+   Schreiben, weitere Memory-API-Instanzen binnen EMBED_CONFIG_REFRESH;
+   ein Neustart ist nicht nötig,
+5. späte Änderungen aus der alten Collection per Drei-Wege-Abgleich
+   übernehmen und alle Punkte neu einbetten, die nach dem Wechsel noch mit
+   dem alten Modell geschrieben wurden (Payload-Feld `embed_model`).
+
+Die alte Collection wird nie gelöscht. `--swap` setzt voraus, dass
+QDRANT_COLLECTION bereits ein Alias ist (sonst zuerst
+`python migrate_collection.py --new-alias NAME`). `--repair` wiederholt
+Schritt 5 für die aktuelle Collection, z.B. wenn eine Instanz das neue
+Modell erst spät übernommen hat.
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+from openai import OpenAI
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import FieldCondition, Filter, MatchValue, PointStruct
+
+from collection_meta import read_meta, write_meta
+from config import (
+    COLLECTION_VECTORS,
+    EMBED_MODEL,
+    OPENAI_API_KEY,
+    OPENAI_BASE_URL,
+    QDRANT_COLLECTION,
+    QDRANT_META_COLLECTION,
+)
+from migrate_collection import (
+    MEMORY_API_URL,
+    PointCopier,
+    create_target,
+    invalidate_search_cache,
+    make_client,
+    resolve_alias,
+    switch_alias,
+)
+
+REEMBED_CHECKPOINT = os.getenv("REEMBED_CHECKPOINT", "reembed_checkpoint.json")
+
+
+class RateLimiter:
+    """
+    Begrenzt die eingebetteten Texte pro Sekunde (0 = unbegrenzt), damit der
+    Job den Embedding-Dienst nicht der laufenden Memory-API wegnimmt.
+    """
+
+    def __init__(self, texts_per_s: float) -> None:
+        self.texts_per_s = texts_per_s
+        self._next = time.monotonic()
+
+    def acquire(self, n: int) -> None:
+        if self.texts_per_s <= 0:
+            return
+        now = time.monotonic()
+        if self._next > now:
+            time.sleep(self._next - now)
+        self._next = max(self._next, now) + n / self.texts_per_s
+
+
+class Reembedder(PointCopier):
+    """
+    Abgleich wie `PointCopier`, schreibt aber statt der alten Vektoren neu
+    eingebettete und markiert jede Payload mit `embed_model`.
+    """
+
+    copy_vectors = False
+
+    def __init__(
+        self,
+        client: QdrantClient,
+        model: str,
+        batch_size: int = 512,
+        embed_batch: int = 64,
+        texts_per_s: float = 0.0,
+        retries: int = 3,
+    ) -> None:
+        super().__init__(client, batch_size)
+        self.model = model
+        self.embed_batch = embed_batch
+        self.retries = retries
+        self.limiter = RateLimiter(texts_per_s)
+        if not OPENAI_API_KEY or not OPENAI_BASE_URL:
+            raise RuntimeError("OPENAI_API_KEY oder OPENAI_BASE_URL fehlt")
+        self.openai = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        vectors: List[List[float]] = []
+        for start in range(0, len(texts), self.embed_batch):
+            chunk = texts[start : start + self.embed_batch]
+            self.limiter.acquire(len(chunk))
+            for attempt in range(self.retries + 1):
+                try:
+                    resp = self.openai.embeddings.create(model=self.model, input=chunk)
+                    break
+                except Exception as exc:
+                    if attempt == self.retries:
+                        raise
+                    print(f"Re-Embedding: Embedding fehlgeschlagen ({exc}), neuer Versuch ...")
+                    time.sleep(2 ** attempt)
+            vectors.extend(d.embedding for d in resp.data)
+        return vectors
+
+    def write(self, target: str, records: List[Any]) -> int:
+        """
+        Bettet die Texte von `records` neu ein und schreibt sie nach `target`.
+        Punkte ohne Text werden übersprungen.
+        """
+        records = [r for r in records if (r.payload or {}).get("text")]
+        if not records:
+            return 0
+        vectors = self.embed([r.payload["text"] for r in records])
+        points = [
+            PointStruct(id=r.id, vector=vec, payload=self.target_payload(r.payload))
+            for r, vec in zip(records, vectors)
+        ]
+        self.client.upsert(collection_name=target, points=points, wait=True)
+        return len(points)
+
+    def target_payload(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return {**payload, "embed_model": self.model}
+
+    def embed_all(self, source: str, target: str, checkpoint: Dict[str, Any]) -> None:
+        offset = checkpoint.get("offset")
+        while True:
+            records, offset = self.client.scroll(
+                collection_name=source,
+                limit=self.batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=False,
+            )
+            checkpoint["embedded"] += self.write(target, records)
+            checkpoint["offset"] = offset
+            checkpoint["pass_done"] = offset is None
+            save_checkpoint(checkpoint)
+            print(f"Re-Embedding: {checkpoint['embedded']} Punkte eingebettet ...")
+            if offset is None:
+                return
+
+    def repair(self, collection: str) -> int:
+        """
+        Bettet alle Punkte neu ein, die nicht mit `self.model` erzeugt wurden.
+        """
+        not_current = Filter(
+            must_not=[FieldCondition(key="embed_model", match=MatchValue(value=self.model))]
+        )
+        offset = None
+        repaired = 0
+        while True:
+            records, offset = self.client.scroll(
+                collection_name=collection,
+                scroll_filter=not_current,
+                limit=self.batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=False,
+            )
+            repaired += self.write(collection, records)
+            if offset is None:
+                return repaired
+
+
+def load_checkpoint() -> Optional[Dict[str, Any]]:
+    if not os.path.exists(REEMBED_CHECKPOINT):
+        return None
+    with open(REEMBED_CHECKPOINT, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_checkpoint(checkpoint: Dict[str, Any]) -> None:
+    # erst vollständig schreiben, dann atomar ersetzen
+    tmp = REEMBED_CHECKPOINT + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp, REEMBED_CHECKPOINT)
+
+
+def reload_memory_api() -> None:
+    # Memory-API sofort auf das Modell der neuen Collection umschalten
+    try:
+        resp = httpx.post(f"{MEMORY_API_URL}/memory/embedding/reload", timeout=10)
+        resp.raise_for_status()
+        print(f"Re-Embedding: Memory-API nutzt jetzt {resp.json().get('model')}.")
+    except httpx.HTTPError as exc:
+        print(
+            f"Re-Embedding: Memory-API unter {MEMORY_API_URL} nicht erreichbar ({exc}); "
+            "sie übernimmt das neue Modell binnen EMBED_CONFIG_REFRESH."
+        )
+
+
+def reembed(
+    reembedder: Reembedder,
+    alias: str,
+    vector_size: int,
+    target: Optional[str] = None,
+    swap: bool = False,
+) -> str:
+    client = reembedder.client
+    if swap and resolve_alias(client, alias) is None:
+        raise SystemExit(
+            f"{alias} ist noch eine echte Collection und lässt sich nicht atomar umstellen; "
+            "zuerst `python migrate_collection.py --new-alias NAME` ausführen."
+        )
+    checkpoint = load_checkpoint()
+    if checkpoint is not None and checkpoint["model"] != reembedder.model:
+        raise SystemExit(
+            f"Checkpoint {REEMBED_CHECKPOINT} gehört zu Modell {checkpoint['model']}; "
+            "Datei löschen, um neu zu beginnen."
+        )
+
+    if checkpoint is None:
+        source = resolve_alias(client, alias) or alias
+        target = target or f"{alias}_{time.strftime('%Y%m%d%H%M%S')}"
+        print(f"Re-Embedding: {source} -> {target} mit {reembedder.model} ({vector_size} Dim.)")
+        create_target(
+            client, target, COLLECTION_VECTORS.model_copy(update={"size": vector_size})
+        )
+        checkpoint = {
+            "source": source,
+            "target": target,
+            "model": reembedder.model,
+            "vector_size": vector_size,
+            "offset": None,
+            "pass_done": False,
+            "embedded": 0,
+        }
+        save_checkpoint(checkpoint)
+    else:
+        print(
+            f"Re-Embedding: setze {checkpoint['source']} -> {checkpoint['target']} "
+            f"nach {checkpoint['embedded']} Punkten fort"
+        )
+    source, target = checkpoint["source"], checkpoint["target"]
+
+    if not checkpoint["pass_done"]:
+        reembedder.embed_all(source, target, checkpoint)
+    base: Dict[str, str] = {}
+    synced = reembedder.converge(source, target, base)
+    print(f"Re-Embedding: {checkpoint['embedded']} Punkte eingebettet, {synced} nachgezogen.")
+
+    if not swap:
+        print("Re-Embedding: Schatten-Collection bereit, Alias unverändert (--swap zum Umstellen).")
+        return target
+
+    current = resolve_alias(client, alias)
+    if current != source:
+        raise SystemExit(
+            f"Alias {alias} zeigt inzwischen auf {current}, nicht auf {source}; "
+            f"{REEMBED_CHECKPOINT} löschen und neu beginnen."
+        )
+    write_meta(client, QDRANT_META_COLLECTION, target, reembedder.model, checkpoint["vector_size"])
+    switch_alias(client, alias, target)
+    print(f"Re-Embedding: Alias {alias} zeigt jetzt auf {target}.")
+    reload_memory_api()
+
+    # Schreibzugriffe zwischen Abgleich und Alias-Wechsel
+    applied, conflicts = reembedder.sync_late(source, target, base)
+    if applied:
+        print(f"Re-Embedding: {applied} späte Änderungen nachgezogen.")
+    if conflicts:
+        print(f"Re-Embedding: {conflicts} Punkte auf beiden Seiten geändert, neue Collection behalten.")
+    # Punkte, die nach dem Wechsel noch mit dem alten Modell geschrieben wurden
+    repaired = reembedder.repair(target)
+    if repaired:
+        print(f"Re-Embedding: {repaired} Punkte mit altem Modell neu eingebettet.")
+    invalidate_search_cache()
+    os.remove(REEMBED_CHECKPOINT)
+    print(
+        f"Re-Embedding: fertig, alte Collection {source} bleibt erhalten. Haben weitere "
+        "Instanzen das Modell erst später übernommen, `python reembed.py --repair` ausführen."
+    )
+    return target
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--model",
+        help="neues Embedding-Modell (bei --repair Standard: Modell laut Register bzw. "
+        "OPENAI_EMBED_MODEL)",
+    )
+    parser.add_argument("--vector-size", type=int, help="Vektorgröße des neuen Modells")
+    parser.add_argument("--target", help="Name der Schatten-Collection (Standard: mit Zeitstempel)")
+    parser.add_argument("--batch-size", type=int, default=512, help="Punkte pro Scroll-Seite")
+    parser.add_argument("--embed-batch", type=int, default=64, help="Texte pro Embedding-Aufruf")
+    parser.add_argument(
+        "--rate", type=float, default=0.0, help="höchstens so viele Texte pro Sekunde (0 = aus)"
+    )
+    parser.add_argument("--swap", action="store_true", help="Alias nach dem Lauf umstellen")
+    parser.add_argument(
+        "--repair",
+        action="store_true",
+        help="Punkte ohne aktuelles embed_model in QDRANT_COLLECTION neu einbetten",
+    )
+    args = parser.parse_args()
+
+    client = make_client()
+    model = args.model
+    if args.repair and not model:
+        meta = read_meta(client, QDRANT_META_COLLECTION, QDRANT_COLLECTION)
+        model = meta["embed_model"] if meta else EMBED_MODEL
+    reembedder = Reembedder(
+        client,
+        model or EMBED_MODEL,
+        batch_size=args.batch_size,
+        embed_batch=args.embed_batch,
+        texts_per_s=args.rate,
+    )
+    if args.repair:
+        repaired = reembedder.repair(QDRANT_COLLECTION)
+        print(f"Re-Embedding: {repaired} Punkte repariert.")
+        if repaired:
+            invalidate_search_cache()
+        return
+
+    if not args.model or not args.vector_size:
+        parser.error("--model und --vector-size sind erforderlich")
+    reembed(reembedder, QDRANT_COLLECTION, args.vector_size, target=args.target, swap=args.swap)
+
+
+if __name__ == "__main__":
+    main()
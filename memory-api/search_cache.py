@@ -0,0 +1,118 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from embedding_cache import normalize_text
+
+
+def search_key(query: str, top_k: int, mode: str, filter_spec: Optional[Dict[str, Any]]) -> str:
+    """
+    Schlüssel aus normalisierter Query (ohne Groß-/Kleinschreibung), top_k,
+    Suchmodus und kanonisch serialisiertem Filter.
+    """
+    digest = hashlib.sha256()
+    digest.update(normalize_text(query).casefold().encode("utf-8"))
+    digest.update(f"\0{top_k}\0{mode}\0".encode("utf-8"))
+    digest.update(json.dumps(filter_spec or {}, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class SearchCache:
+    """
+    Cache für Suchergebnisse mit TTL und LRU-Verdrängung. Jeder Schreibzugriff
+    erhöht die Generation der Collection; Einträge älterer Generationen
+    gelten als veraltet und werden nicht mehr ausgeliefert.
+    """
+
+    def __init__(self, max_items: int = 1000, ttl_s: float = 60.0) -> None:
+        self.max_items = max_items
+        self.ttl_s = ttl_s
+        self.generation = 0
+        self._entries: "OrderedDict[str, Tuple[int, float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bumped_at = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.stale = 0
+        self.invalidations = 0
+        self.max_served_age_s = 0.0
+        self._served_age_total = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_items > 0 and self.ttl_s > 0
+
+    def bump(self) -> int:
+        with self._lock:
+            self.generation += 1
+            self.invalidations += 1
+            self._bumped_at = time.monotonic()
+            return self.generation
+
+    def get(self, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            generation, stored_at, result = entry
+            if generation != self.generation:
+                del self._entries[key]
+                self.stale += 1
+                self.misses += 1
+                return None
+            if now - stored_at > self.ttl_s:
+                del self._entries[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            age = now - stored_at
+            self._served_age_total += age
+            self.max_served_age_s = max(self.max_served_age_s, age)
+            return result
+
+    def put(self, key: str, generation: int, result: Any) -> None:
+        """
+        Speichert ein Ergebnis, das unter `generation` berechnet wurde. Ist die
+        Generation inzwischen überholt, wird es verworfen.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = (generation, time.monotonic(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_items": self.max_items,
+                "ttl_s": self.ttl_s,
+                "generation": self.generation,
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "stale": self.stale,
+                "invalidations": self.invalidations,
+                "hit_rate": (self.hits / total) if total else 0.0,
+                # Alter ausgelieferter Treffer: obere Schranke ist ttl_s, sofern
+                # alle Schreibzugriffe die Generation erhöhen
+                "mean_served_age_s": (self._served_age_total / self.hits) if self.hits else 0.0,
+                "max_served_age_s": self.max_served_age_s,
+                "since_last_invalidation_s": time.monotonic() - self._bumped_at,
+            }
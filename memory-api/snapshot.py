@@ -0,0 +1,270 @@
+"""
+Export und Import der Memory-Collection als kompakte Snapshot-Datei, ohne
+Re-Embedding:
+
+    python snapshot.py export memory.jsnap [--float16]
+    python snapshot.py import memory.jsnap [--workers 4 --batch-size 512] [--force]
+
+Dateiformat:
+- 4096 Byte Header: Magic "JELSNAP1", Länge (uint32 LE) und JSON mit
+  count, dim, dtype, distance, embed_model und den Offsets der Blöcke,
+- Vektorblock ab Offset 4096: count x dim float32/float16 (little endian),
+  zusammenhängend und per numpy.memmap direkt lesbar,
+- Payload-Block: gzip-komprimiertes JSONL {"id": ..., "payload": ...} in
+  derselben Reihenfolge wie die Vektoren.
+
+Der Import verweigert Snapshots, deren Embedding-Modell oder Distanz nicht
+zur Ziel-Collection passt (Modell laut Register collection_meta.py, sonst
+OPENAI_EMBED_MODEL); `--force` lädt trotzdem. Eine neu angelegte oder
+passende Collection erhält das Modell des Snapshots im Register.
+
+Der Import schreibt direkt in Qdrant, an der Memory-API vorbei. Danach ruft
+er deshalb POST /memory/embedding/reload der laufenden API (MEMORY_API_URL)
+auf: sie liest das Register neu und verwirft ihren Suchergebnis-Cache. Ist
+sie nicht erreichbar, liefert sie bis zu SEARCH_CACHE_TTL Sekunden alte
+Treffer (und das alte Modell bis zu EMBED_CONFIG_REFRESH Sekunden); sofort
+wirksam ist dann nur ein Neustart. In den lexikalischen Index übernimmt sie
+importierte Punkte beim nächsten periodischen Neuaufbau.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import shutil
+import struct
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, BinaryIO, Dict, Iterator, List
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import PointStruct
+
+from collection_meta import read_meta, write_meta
+from config import COLLECTION_VECTORS, EMBED_MODEL, QDRANT_COLLECTION, QDRANT_META_COLLECTION
+from migrate_collection import (
+    create_target,
+    invalidate_search_cache,
+    make_client,
+    resolve_alias,
+)
+
+MAGIC = b"JELSNAP1"
+HEADER_SIZE = 4096
+DTYPES = {"float32": "<f4", "float16": "<f2"}
+
+
+def _write_header(f: BinaryIO, header: Dict[str, Any]) -> None:
+    raw = json.dumps(header).encode("utf-8")
+    if len(MAGIC) + 4 + len(raw) > HEADER_SIZE:
+        raise ValueError("Snapshot-Header zu groß")
+    f.seek(0)
+    f.write(MAGIC + struct.pack("<I", len(raw)) + raw)
+    f.write(b"\0" * (HEADER_SIZE - len(MAGIC) - 4 - len(raw)))
+
+
+def read_header(path: str) -> Dict[str, Any]:
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} ist keine Snapshot-Datei")
+        (length,) = struct.unpack("<I", f.read(4))
+        return json.loads(f.read(length))
+
+
+def export_snapshot(
+    client: QdrantClient, collection: str, path: str, dtype: str = "float32", batch_size: int = 1024
+) -> Dict[str, Any]:
+    info = client.get_collection(collection).config.params.vectors
+    meta = read_meta(client, QDRANT_META_COLLECTION, collection)
+    header: Dict[str, Any] = {
+        "version": 2,
+        "collection": collection,
+        "dim": info.size,
+        "distance": info.distance.value,
+        "embed_model": meta["embed_model"] if meta else EMBED_MODEL,
+        "dtype": dtype,
+        "count": 0,
+        "vectors_offset": HEADER_SIZE,
+    }
+
+    with open(path, "wb") as out, tempfile.TemporaryFile() as tmp:
+        _write_header(out, header)
+        out.seek(HEADER_SIZE)
+        with gzip.GzipFile(fileobj=tmp, mode="wb") as payloads:
+            offset = None
+            while True:
+                records, offset = client.scroll(
+                    collection_name=collection,
+                    limit=batch_size,
+                    offset=offset,
+                    with_payload=True,
+                    with_vectors=True,
+                )
+                if records:
+                    block = np.asarray([r.vector for r in records], dtype=DTYPES[dtype])
+                    out.write(block.tobytes())
+                    for r in records:
+                        line = json.dumps({"id": r.id, "payload": r.payload}, ensure_ascii=False)
+                        payloads.write(line.encode("utf-8") + b"\n")
+                    header["count"] += len(records)
+                    print(f"Export: {header['count']} Punkte ...")
+                if offset is None:
+                    break
+
+        header["payload_offset"] = out.tell()
+        tmp.seek(0)
+        shutil.copyfileobj(tmp, out)
+        header["payload_bytes"] = out.tell() - header["payload_offset"]
+        _write_header(out, header)
+
+    print(f"Export: {header['count']} Punkte nach {path} ({os.path.getsize(path)} Bytes).")
+    return header
+
+
+def _iter_batches(path: str, header: Dict[str, Any], batch_size: int) -> Iterator[List[PointStruct]]:
+    vectors = np.memmap(
+        path,
+        dtype=DTYPES[header["dtype"]],
+        mode="r",
+        offset=header["vectors_offset"],
+        shape=(header["count"], header["dim"]),
+    )
+    with open(path, "rb") as f:
+        f.seek(header["payload_offset"])
+        with gzip.GzipFile(fileobj=f, mode="rb") as payloads:
+            batch: List[PointStruct] = []
+            for i, line in enumerate(payloads):
+                record = json.loads(line)
+                batch.append(
+                    PointStruct(
+                        id=record["id"],
+                        vector=vectors[i].astype(np.float32).tolist(),
+                        payload=record["payload"],
+                    )
+                )
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+
+def import_snapshot(
+    client: QdrantClient,
+    collection: str,
+    path: str,
+    batch_size: int = 512,
+    workers: int = 4,
+    force: bool = False,
+) -> int:
+    header = read_header(path)
+    # ist QDRANT_COLLECTION ein Alias (nach einer Migration), in dessen Ziel laden
+    collection = resolve_alias(client, collection) or collection
+    exists = client.collection_exists(collection)
+    if exists:
+        # nach reembed.py kann die Vektorgröße von QDRANT_VECTOR_SIZE abweichen
+        vectors = client.get_collection(collection).config.params.vectors
+        dim, distance = vectors.size, vectors.distance.value
+        meta = read_meta(client, QDRANT_META_COLLECTION, collection)
+        model = meta["embed_model"] if meta else EMBED_MODEL
+    else:
+        dim, distance = COLLECTION_VECTORS.size, COLLECTION_VECTORS.distance.value
+        # eine neue Collection übernimmt das Modell des Snapshots
+        model = header.get("embed_model") or EMBED_MODEL
+    if header["dim"] != dim:
+        raise ValueError(f"Snapshot hat {header['dim']} Dimensionen, {collection} hat {dim}")
+
+    snap_model = header.get("embed_model")
+    mismatches = []
+    if snap_model is None:
+        print(f"Import: {path} nennt kein Embedding-Modell (Snapshot-Version 1), ungeprüft.")
+    elif snap_model != model:
+        mismatches.append(f"Modell {snap_model} statt {model}")
+    if header["distance"].lower() != distance.lower():
+        mismatches.append(f"Distanz {header['distance']} statt {distance}")
+    if mismatches and not force:
+        raise ValueError(
+            f"Snapshot passt nicht zu {collection}: {', '.join(mismatches)} "
+            "(mit --force trotzdem laden)"
+        )
+    if mismatches:
+        print(f"Import: {', '.join(mismatches)}; lade wegen --force trotzdem.")
+    if not exists:
+        create_target(client, collection, COLLECTION_VECTORS)
+
+    def upsert(batch: List[PointStruct]) -> int:
+        client.upsert(collection_name=collection, points=batch, wait=True)
+        return len(batch)
+
+    imported = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending: List[Any] = []
+        for batch in _iter_batches(path, header, batch_size):
+            pending.append(pool.submit(upsert, batch))
+            # höchstens 2 Batches pro Worker im Speicher halten
+            if len(pending) >= workers * 2:
+                imported += pending.pop(0).result()
+                print(f"Import: {imported}/{header['count']} Punkte ...")
+        for fut in pending:
+            imported += fut.result()
+
+    print(f"Import: {imported} Punkte aus {path} nach {collection} geladen.")
+    if snap_model is not None and snap_model == model:
+        write_meta(client, QDRANT_META_COLLECTION, collection, snap_model, header["dim"])
+    elif snap_model is not None:
+        print(
+            f"Import: Register von {collection} bleibt bei {model}; Punkte mit "
+            f"{snap_model} mit `python reembed.py --repair` neu einbetten."
+        )
+    invalidate_search_cache(reload_embedding=True)
+    return imported
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    exp = sub.add_parser("export", help="Collection in eine Snapshot-Datei schreiben")
+    exp.add_argument("path")
+    exp.add_argument("--float16", action="store_true", help="Vektoren als float16 speichern")
+    exp.add_argument("--batch-size", type=int, default=1024)
+
+    imp = sub.add_parser("import", help="Snapshot-Datei in die Collection laden")
+    imp.add_argument("path")
+    imp.add_argument("--batch-size", type=int, default=512)
+    imp.add_argument("--workers", type=int, default=4)
+    imp.add_argument(
+        "--force",
+        action="store_true",
+        help="auch bei abweichendem Embedding-Modell oder abweichender Distanz laden",
+    )
+
+    for p in (exp, imp):
+        p.add_argument("--collection", default=QDRANT_COLLECTION)
+
+    args = parser.parse_args()
+    client = make_client()
+    if args.command == "export":
+        export_snapshot(
+            client,
+            args.collection,
+            args.path,
+            dtype="float16" if args.float16 else "float32",
+            batch_size=args.batch_size,
+        )
+    else:
+        import_snapshot(
+            client,
+            args.collection,
+            args.path,
+            batch_size=args.batch_size,
+            workers=args.workers,
+            force=args.force,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+# Felder, die sich innerhalb einer Gruppe unterscheiden dürfen
+MERGED_FIELDS = ("tags", "created_at")
+
+
+def group_key(metadata: Dict[str, Any]) -> str:
+    """
+    Gruppenschlüssel eines Jobs: alle Metadaten außer Tags und Zeitstempel.
+    Nur Jobs mit gleichem Schlüssel werden gemeinsam zusammengefasst.
+    """
+    rest = {k: v for k, v in metadata.items() if k not in MERGED_FIELDS}
+    return json.dumps(rest, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def merge_metadata(jobs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Metadaten einer Gruppe (gleicher group_key): die des ältesten Jobs mit
+    vereinigten Tags, dem jüngsten Zeitstempel und der Anzahl
+    zusammengefasster Texte.
+    """
+    merged = dict(jobs[0]["metadata"])
+    tags: List[Any] = []
+    for job in jobs:
+        for tag in job["metadata"].get("tags") or []:
+            if tag not in tags:
+                tags.append(tag)
+    if tags:
+        merged["tags"] = tags
+    created = [j["metadata"]["created_at"] for j in jobs if j["metadata"].get("created_at")]
+    if created:
+        merged["created_at"] = max(created)
+    if len(jobs) > 1:
+        merged["source_count"] = sum(len(j["texts"]) for j in jobs)
+    return merged
+
+
+class SummarizeQueue:
+    """
+    Persistente Job-Warteschlange für summarize_and_store (SQLite, WAL).
+    Jobs mit gleichen Metadaten (bis auf Tags und Zeitstempel), die kurz
+    nacheinander eintreffen, werden gemeinsam geholt und in einem LLM-Aufruf
+    zusammengefasst. Alle Methoden blockieren (SQLite) und gehören im
+    Event-Loop in den Threadpool; nur `pending` liest einen Zähler.
+    """
+
+    def __init__(self, path: str, max_attempts: int = 5, backoff_s: float = 5.0) -> None:
+        self.max_attempts = max_attempts
+        self.backoff_s = backoff_s
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " project TEXT NOT NULL,"
+            " texts TEXT NOT NULL,"
+            " metadata TEXT NOT NULL,"
+            " status TEXT NOT NULL DEFAULT 'pending',"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " enqueued_at REAL NOT NULL,"
+            " available_at REAL NOT NULL,"
+            " error TEXT,"
+            " group_key TEXT"
+            ")"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "group_key" not in columns:
+            # Warteschlange einer älteren Version: Schlüssel nachtragen
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN group_key TEXT")
+        legacy = self._conn.execute(
+            "SELECT id, metadata FROM jobs WHERE group_key IS NULL"
+        ).fetchall()
+        self._conn.executemany(
+            "UPDATE jobs SET group_key = ? WHERE id = ?",
+            [(group_key(json.loads(metadata)), job_id) for job_id, metadata in legacy],
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, available_at)")
+        # Jobs, die bei einem Absturz in Arbeit waren, erneut einplanen
+        self._conn.execute("UPDATE jobs SET status = 'pending' WHERE status = 'processing'")
+        self._pending = self._conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE status = 'pending'"
+        ).fetchone()[0]
+
+    def enqueue(self, texts: List[str], metadata: Dict[str, Any]) -> int:
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO jobs (project, texts, metadata, enqueued_at, available_at, group_key)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    str(metadata.get("project") or ""),
+                    json.dumps(texts, ensure_ascii=False),
+                    json.dumps(metadata, ensure_ascii=False),
+                    now,
+                    now,
+                    group_key(metadata),
+                ),
+            )
+            self._pending += 1
+        return cur.lastrowid
+
+    def pending(self) -> int:
+        # mitgezählt statt per SQL, damit Gegendruck-Prüfung und Metrik-Abfrage
+        # weder SQLite noch die Sperre brauchen
+        return self._pending
+
+    def claim_group(self, window_s: float, max_texts: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Holt den ältesten fälligen Job, sobald er `window_s` Sekunden alt ist,
+        zusammen mit weiteren wartenden Jobs mit gleichem group_key (bis
+        `max_texts` Texte).
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                head = self._conn.execute(
+                    "SELECT group_key FROM jobs WHERE status = 'pending' AND available_at <= ?"
+                    " AND enqueued_at <= ? ORDER BY id LIMIT 1",
+                    (now, now - window_s),
+                ).fetchone()
+                if head is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                rows = self._conn.execute(
+                    "SELECT id, texts, metadata FROM jobs WHERE status = 'pending'"
+                    " AND available_at <= ? AND group_key = ? ORDER BY id",
+                    (now, head[0]),
+                ).fetchall()
+                jobs: List[Dict[str, Any]] = []
+                count = 0
+                for job_id, texts, metadata in rows:
+                    texts = json.loads(texts)
+                    if jobs and count + len(texts) > max_texts:
+                        break
+                    jobs.append({"id": job_id, "texts": texts, "metadata": json.loads(metadata)})
+                    count += len(texts)
+                self._conn.executemany(
+                    "UPDATE jobs SET status = 'processing' WHERE id = ?",
+                    [(j["id"],) for j in jobs],
+                )
+                self._conn.execute("COMMIT")
+                self._pending -= len(jobs)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return jobs
+
+    def ack(self, ids: List[int]) -> None:
+        with self._lock:
+            self._conn.executemany("DELETE FROM jobs WHERE id = ?", [(i,) for i in ids])
+
+    def retry(self, ids: List[int], error: str) -> None:
+        """
+        Plant fehlgeschlagene Jobs mit exponentiellem Backoff neu ein; nach
+        `max_attempts` Versuchen bleiben sie als 'failed' liegen.
+        """
+        now = time.time()
+        with self._lock:
+            for job_id in ids:
+                row = self._conn.execute(
+                    "SELECT attempts FROM jobs WHERE id = ?", (job_id,)
+                ).fetchone()
+                if row is None:
+                    continue
+                attempts = row[0] + 1
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, attempts = ?, available_at = ?, error = ?"
+                    " WHERE id = ?",
+                    (
+                        "failed" if attempts >= self.max_attempts else "pending",
+                        attempts,
+                        now + self.backoff_s * 2 ** (attempts - 1),
+                        error,
+                        job_id,
+                    ),
+                )
+                if attempts < self.max_attempts:
+                    self._pending += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {"pending": 0, "processing": 0, "failed": 0}
+        counts.update(dict(rows))
+        return counts
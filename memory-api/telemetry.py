@@ -0,0 +1,196 @@
+"""
+Metriken und Spans für Memory-API, Self-Baker und MCP-Server (die Datei liegt
+identisch in allen drei Diensten, da jeder ein eigenes Image baut; nur in
+memory-api/ ändern und mit `python sync_shared.py` verteilen).
+
+- `span(stage)` misst eine Stufe (Embedding, Qdrant-Aufruf, LLM-Aufruf, ...)
+  als Prometheus-Histogramm und schreibt mit TRACE_LOG=true eine JSON-Zeile
+  mit Trace-ID, Dauer und Attributen.
+- `record_usage` zählt die Token aus der `usage` einer OpenAI-Antwort.
+- Die Trace-ID liegt in einer ContextVar, wird über TRACE_HEADER zwischen den
+  Diensten weitergereicht und von asyncio-Tasks und asyncio.to_thread geerbt.
+"""
+
+import functools
+import inspect
+import json
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+
+TRACE_HEADER = "X-Trace-Id"
+
+# Stufen reichen von Cache-Treffern (< 1 ms) bis zu LLM-Aufrufen (Sekunden)
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+STAGE_SECONDS = Histogram(
+    "jarel_stage_seconds",
+    "Dauer einzelner Verarbeitungsstufen",
+    ["stage", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "jarel_llm_tokens_total",
+    "Token laut usage der OpenAI-Antworten",
+    ["stage", "model", "type"],
+)
+
+trace_id_var: ContextVar[Optional[str]] = ContextVar("trace_id", default=None)
+
+
+@functools.lru_cache(maxsize=None)
+def trace_log_enabled() -> bool:
+    # erst beim ersten Span gelesen, damit eine danach geladene .env noch greift
+    return os.getenv("TRACE_LOG", "false").lower() in ("1", "true", "yes")
+
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex
+
+
+def current_trace_id() -> Optional[str]:
+    return trace_id_var.get()
+
+
+def trace_headers() -> Dict[str, str]:
+    trace_id = trace_id_var.get()
+    return {TRACE_HEADER: trace_id} if trace_id else {}
+
+
+def record_span(stage: str, status: str, duration: float, attrs: Dict[str, Any]) -> None:
+    STAGE_SECONDS.labels(stage, status).observe(duration)
+    if trace_log_enabled():
+        print(
+            json.dumps(
+                {
+                    "trace_id": trace_id_var.get(),
+                    "span": stage,
+                    "status": status,
+                    "duration_ms": round(duration * 1000, 2),
+                    **attrs,
+                },
+                ensure_ascii=False,
+                default=str,
+            )
+        )
+
+
+@contextmanager
+def span(stage: str, **attrs: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Misst den Block als Stufe `stage`. Ohne laufenden Trace wird ein neuer
+    begonnen. Das gelieferte Dict nimmt weitere Attribute für die Log-Zeile auf.
+    """
+    token = None
+    if trace_id_var.get() is None:
+        token = trace_id_var.set(new_trace_id())
+    status = "ok"
+    start = time.perf_counter()
+    try:
+        yield attrs
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        record_span(stage, status, time.perf_counter() - start, attrs)
+        if token is not None:
+            trace_id_var.reset(token)
+
+
+def traced(stage: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Dekorator-Variante von `span` für synchrone und asynchrone Funktionen.
+    """
+
+    def decorate(fn: Callable[..., Any]) -> Callable[..., Any]:
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with span(stage):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(stage):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def record_usage(
+    stage: str, model: str, usage: Any, attrs: Optional[Dict[str, Any]] = None
+) -> None:
+    """
+    Zählt prompt-/completion-Token einer OpenAI-Antwort (Embeddings liefern
+    nur prompt_tokens). Fehlt `usage`, wird nichts gezählt.
+    """
+    if usage is None:
+        return
+    for kind in ("prompt", "completion"):
+        tokens = getattr(usage, f"{kind}_tokens", None)
+        if tokens:
+            LLM_TOKENS.labels(stage, model, kind).inc(tokens)
+            if attrs is not None:
+                attrs[f"{kind}_tokens"] = tokens
+
+
+class TraceMiddleware:
+    """
+    ASGI-Middleware: übernimmt die Trace-ID aus TRACE_HEADER (oder vergibt
+    eine neue), misst jede Anfrage pro Route und gibt die Trace-ID in der
+    Antwort zurück.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        header = TRACE_HEADER.lower().encode("latin-1")
+        incoming = next((v for k, v in scope["headers"] if k == header), b"")
+        trace_id = incoming.decode("latin-1")[:64] or new_trace_id()
+        token = trace_id_var.set(trace_id)
+        status_code = 500
+
+        async def send_with_trace(message: Dict[str, Any]) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (header, trace_id.encode("latin-1")),
+                ]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_trace)
+        finally:
+            # Routen-Vorlage statt konkretem Pfad, damit die Label-Menge klein bleibt
+            route = getattr(scope.get("route"), "path", "unmatched")
+            record_span(
+                f"http {scope['method']} {route}",
+                "error" if status_code >= 500 else "ok",
+                time.perf_counter() - start,
+                {"status_code": status_code},
+            )
+            trace_id_var.reset(token)
+
+
+def metrics_payload() -> Tuple[bytes, str]:
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,81 @@
+"""
+Register der Embedding-Modelle: mit welchem Modell (und welcher Vektorgröße)
+die Punkte einer physischen Collection erzeugt wurden. Qdrant 1.9 kennt keine
+Collection-Metadaten, daher liegt pro Collection ein Punkt ohne Vektor in
+einer eigenen Register-Collection (QDRANT_META_COLLECTION).
+
+reembed.py trägt das neue Modell ein, bevor es den Alias umstellt;
+Memory-API und Self-Baker lösen den Alias auf und lesen das Modell der
+Collection, auf die er gerade zeigt. Ohne Eintrag gelten
+OPENAI_EMBED_MODEL und QDRANT_VECTOR_SIZE.
+
+Identische Kopie in memory-api/ und self-baker/; nur in memory-api/ ändern
+und mit `python sync_shared.py` verteilen.
+"""
+
+import uuid
+from typing import Any, Dict, List, Optional
+
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import PointStruct
+
+_NAMESPACE = uuid.UUID("0b5c8f6e-4d3a-5e21-9f7c-2a1b3c4d5e6f")
+
+
+def meta_id(collection: str) -> str:
+    # deterministische Punkt-ID pro physischer Collection
+    return str(uuid.uuid5(_NAMESPACE, collection))
+
+
+def physical_collection(aliases: Any, name: str) -> str:
+    """
+    Collection hinter `name` laut `get_aliases()`; ist `name` kein Alias,
+    ist es selbst die Collection.
+    """
+    for description in aliases.aliases:
+        if description.alias_name == name:
+            return description.collection_name
+    return name
+
+
+def parse_meta(records: List[Any]) -> Optional[Dict[str, Any]]:
+    if not records or not (records[0].payload or {}).get("embed_model"):
+        return None
+    return dict(records[0].payload)
+
+
+def read_meta(client: QdrantClient, meta_collection: str, name: str) -> Optional[Dict[str, Any]]:
+    """
+    Registereintrag der Collection hinter `name` (Alias oder Collection),
+    None ohne Eintrag.
+    """
+    collection = physical_collection(client.get_aliases(), name)
+    if not client.collection_exists(meta_collection):
+        return None
+    records = client.retrieve(
+        collection_name=meta_collection, ids=[meta_id(collection)], with_payload=True
+    )
+    return parse_meta(records)
+
+
+def write_meta(
+    client: QdrantClient, meta_collection: str, collection: str, model: str, vector_size: int
+) -> None:
+    if not client.collection_exists(meta_collection):
+        # reine Payload-Punkte, keine Vektoren
+        client.create_collection(collection_name=meta_collection, vectors_config={})
+    client.upsert(
+        collection_name=meta_collection,
+        points=[
+            PointStruct(
+                id=meta_id(collection),
+                vector={},
+                payload={
+                    "collection": collection,
+                    "embed_model": model,
+                    "vector_size": vector_size,
+                },
+            )
+        ],
+        wait=True,
+    )
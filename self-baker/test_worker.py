@@ -0,0 +1,58 @@
+"""
+Offline-Tests des Self-Bakers (ohne Qdrant und LLM):
+
+    python -m pytest test_worker.py   bzw.   python test_worker.py
+"""
+
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("OPENAI_BASE_URL", "http://localhost:9/v1")
+
+import worker  # noqa: E402
+
+
+def test_failing_project_does_not_discard_others() -> None:
+    entries = [
+        {"id": 1, "payload": {"project": "A", "text": "a"}},
+        {"id": 2, "payload": {"project": "B", "text": "b"}},
+        {"id": 3, "payload": {"project": "C", "text": "c"}},
+    ]
+    written = {}
+
+    def bake_project(project, project_entries):
+        if project == "B":
+            raise RuntimeError("LLM nicht erreichbar")
+        return [{"id": f"node-{project}"}], [e["id"] for e in project_entries]
+
+    def write(nodes, baked_ids):
+        written["nodes"] = nodes
+        written["baked_ids"] = baked_ids
+
+    saved = (
+        worker.fetch_unbaked,
+        worker.bake_project,
+        worker.write_summaries_and_mark_baked,
+        worker.invalidate_search_cache,
+    )
+    worker.fetch_unbaked = lambda page_size: iter([entries])
+    worker.bake_project = bake_project
+    worker.write_summaries_and_mark_baked = write
+    worker.invalidate_search_cache = lambda: None
+    try:
+        worker.run_once()
+    finally:
+        (
+            worker.fetch_unbaked,
+            worker.bake_project,
+            worker.write_summaries_and_mark_baked,
+            worker.invalidate_search_cache,
+        ) = saved
+
+    assert sorted(written["baked_ids"]) == [1, 3]
+    assert sorted(n["id"] for n in written["nodes"]) == ["node-A", "node-C"]
+
+
+if __name__ == "__main__":
+    test_failing_project_does_not_discard_others()
+    print("ok")
@@ -1,25 +1,63 @@
+import contextvars
+import json
 import os
+import threading
 import time
+import uuid
 from collections import defaultdict
-from typing import Any, Dict, List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import requests
 from dotenv import load_dotenv
 from openai import OpenAI
 from qdrant_client import QdrantClient
-from qdrant_client.http.models import Filter, FieldCondition, MatchValue
+from qdrant_client.http.models import (
+    FieldCondition,
+    Filter,
+    MatchValue,
+    PointsList,
+    PointStruct,
+    SetPayload,
+    SetPayloadOperation,
+    UpsertOperation,
+)
+
+from collection_meta import read_meta
+from telemetry import metrics_payload, record_usage, span, trace_headers, traced
 
 load_dotenv()
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")
 CHAT_MODEL = os.getenv("OPENAI_CHAT_MODEL", "GPT-OSS20B")
+EMBED_MODEL = os.getenv(
+    "OPENAI_EMBED_MODEL", "jeffh/intfloat-multilingual-e5-large:q8_0"
+)
 
 QDRANT_URL = os.getenv("QDRANT_URL", "http://qdrant:6333")
 QDRANT_COLLECTION = os.getenv("QDRANT_COLLECTION", "jar_el_memory")
+# Register der Embedding-Modelle (siehe memory-api/reembed.py)
+QDRANT_META_COLLECTION = os.getenv("QDRANT_META_COLLECTION", "jar_el_memory_meta")
 
 MEMORY_API_URL = os.getenv("MEMORY_API_URL", "http://memory-api:8000")
 
+# Backlog-Verarbeitung: Seitengröße des Scroll-Cursors, parallele Worker und
+# Token-Budget pro Zusammenfassungs-Prompt
+SELF_BAKER_PAGE_SIZE = int(os.getenv("SELF_BAKER_PAGE_SIZE", "256"))
+SELF_BAKER_WORKERS = int(os.getenv("SELF_BAKER_WORKERS", "4"))
+SELF_BAKER_MAX_PROMPT_TOKENS = int(os.getenv("SELF_BAKER_MAX_PROMPT_TOKENS", "6000"))
+SELF_BAKER_EMBED_BATCH = int(os.getenv("SELF_BAKER_EMBED_BATCH", "64"))
+
+# Ereignisgesteuertes Backen: Memory-API meldet neue ungebackene Einträge per
+# Webhook (POST /notify). Intervall-Polling bleibt als Fallback aktiv.
+SELF_BAKER_PORT = int(os.getenv("SELF_BAKER_PORT", "8090"))
+SELF_BAKER_DEBOUNCE = float(os.getenv("SELF_BAKER_DEBOUNCE", "5"))
+SELF_BAKER_MAX_DELAY = float(os.getenv("SELF_BAKER_MAX_DELAY", "60"))
+SELF_BAKER_MAX_BATCH = int(os.getenv("SELF_BAKER_MAX_BATCH", "50"))
+
 if not OPENAI_API_KEY or not OPENAI_BASE_URL:
     raise RuntimeError("OPENAI_API_KEY oder OPENAI_BASE_URL fehlt")
 
@@ -27,7 +65,10 @@ client_oa = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
 client_qd = QdrantClient(url=QDRANT_URL)
 
 
-def fetch_unbaked(limit: int = 100) -> List[Dict[str, Any]]:
+def fetch_unbaked(page_size: int = 256) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Liefert alle ungebackenen Punkte seitenweise über den Scroll-Cursor.
+    """
     f = Filter(
         must=[
             FieldCondition(
@@ -36,40 +77,115 @@ def fetch_unbaked(limit: int = 100) -> List[Dict[str, Any]]:
             )
         ]
     )
-    points, _ = client_qd.scroll(
-        collection_name=QDRANT_COLLECTION,
-        scroll_filter=f,
-        limit=limit,
-        with_payload=True,
-    )
-    return [{"id": p.id, "payload": p.payload} for p in points]
+    offset = None
+    while True:
+        with span("qdrant.scroll"):
+            points, offset = client_qd.scroll(
+                collection_name=QDRANT_COLLECTION,
+                scroll_filter=f,
+                limit=page_size,
+                offset=offset,
+                with_payload=True,
+            )
+        if points:
+            yield [{"id": p.id, "payload": p.payload} for p in points]
+        if offset is None:
+            break
 
 
-def mark_baked(ids: List[Any]) -> None:
-    if not ids:
-        return
-    client_qd.set_payload(
-        collection_name=QDRANT_COLLECTION,
-        payload={"baked": True},
-        points=ids,
-    )
+def estimate_tokens(text: str) -> int:
+    # grobe Schätzung (~4 Zeichen pro Token), ohne Tokenizer-Abhängigkeit
+    return len(text) // 4 + 1
+
+
+def split_by_token_budget(
+    entries: List[Dict[str, Any]], max_tokens: int
+) -> List[List[Dict[str, Any]]]:
+    """
+    Teilt die Einträge einer Projektgruppe in Teil-Batches, deren Notizen
+    zusammen höchstens `max_tokens` Tokens umfassen.
+    """
+    batches: List[List[Dict[str, Any]]] = []
+    current: List[Dict[str, Any]] = []
+    used = 0
+    for e in entries:
+        tokens = estimate_tokens(e["payload"].get("text", ""))
+        if current and used + tokens > max_tokens:
+            batches.append(current)
+            current, used = [], 0
+        current.append(e)
+        used += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+# Zusammenfassungsbaum pro Projekt: Tag -> Woche -> Projekt. Die Knoten haben
+# deterministische IDs und werden bei jedem Durchlauf an Ort und Stelle
+# aktualisiert, statt neue Summary-Punkte anzulegen.
+SUMMARY_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "jar-el/self-baker/summary")
+
+
+def summary_id(project: str, level: str, period: str = "") -> str:
+    return str(uuid.uuid5(SUMMARY_NAMESPACE, f"{project}|{level}|{period}"))
+
+
+def note_day(payload: Dict[str, Any]) -> date:
+    created_at = str(payload.get("created_at") or "")
+    try:
+        return date.fromisoformat(created_at[:10])
+    except ValueError:
+        return datetime.now(timezone.utc).date()
+
+
+def week_key(day: date) -> str:
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
 
+def week_days(key: str) -> List[date]:
+    year, week = key.split("-W")
+    return [date.fromisocalendar(int(year), int(week), d) for d in range(1, 8)]
 
-def summarize_for_project(project: str, entries: List[Dict[str, Any]]) -> str:
-    texts = [e["payload"].get("text", "") for e in entries]
+
+def fetch_summaries(ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    with span("qdrant.retrieve"):
+        points = client_qd.retrieve(
+            collection_name=QDRANT_COLLECTION,
+            ids=ids,
+            with_payload=True,
+            with_vectors=False,
+        )
+    return {str(p.id): p.payload for p in points}
+
+
+@traced("summarize_for_project")
+def summarize_for_project(
+    project: str, scope: str, texts: List[str], previous: Optional[str] = None
+) -> str:
+    """
+    Faltet neue Notizen (oder Teil-Zusammenfassungen) in die bisherige
+    Zusammenfassung eines Knotens ein. Ohne `previous` entsteht eine neue.
+    """
     joined = "\n\n".join(texts)
     messages = [
         {
             "role": "system",
             "content": (
                 "Du bist ein Langzeit-Speicheragent. "
-                "Fasse die folgenden Notizen für das Projekt zu einer kompakten Memory-Notiz zusammen. "
-                "Behalte nur langfristig relevante Fakten, Entscheidungen, Präferenzen und To-Dos."
+                "Aktualisiere die bisherige Memory-Notiz des Projekts mit den neuen Inhalten "
+                "zu einer kompakten Memory-Notiz, die die alte vollständig ersetzt. "
+                "Behalte nur langfristig relevante Fakten, Entscheidungen, Präferenzen und To-Dos "
+                "und nimm nichts doppelt auf."
             ),
         },
         {
             "role": "user",
-            "content": f"Projekt: {project}\n\nNotizen:\n{joined}",
+            "content": (
+                f"Projekt: {project}\nZeitraum: {scope}\n\n"
+                f"Bisherige Memory-Notiz:\n{previous or '(noch keine)'}\n\n"
+                f"Neue Inhalte:\n{joined}"
+            ),
         },
     ]
     resp = client_oa.chat.completions.create(
@@ -77,63 +193,362 @@ def summarize_for_project(project: str, entries: List[Dict[str, Any]]) -> str:
         messages=messages,
         temperature=0.2,
     )
+    record_usage("summarize_for_project", CHAT_MODEL, resp.usage)
     return resp.choices[0].message.content
 
 
-def upsert_summary_to_memory(project: str, summary: str) -> None:
+def summary_node(
+    project: str,
+    summary: str,
+    level: str,
+    period: str = "",
+    parent_id: Optional[str] = None,
+    source_count: int = 0,
+    source_ids: Optional[List[Any]] = None,
+) -> Dict[str, Any]:
     payload = {
         "text": summary,
-        "metadata": {
-            "project": project,
-            "kind": "summary",
-            "baked": True,
-            "tags": ["auto-summary", "self-baked"],
-        },
+        "project": project,
+        "kind": "summary",
+        "baked": True,
+        "level": level,
+        "period": period or None,
+        "parent_id": parent_id,
+        "source_count": source_count,
+        "updated_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        "tags": ["auto-summary", "self-baked", f"summary-{level}"],
     }
-    url = f"{MEMORY_API_URL}/memory/upsert"
-    resp = requests.post(url, json=payload, timeout=60)
-    resp.raise_for_status()
-    print(f"Self-Baker: Summary für Projekt {project} im Memory gespeichert.")
+    if source_ids is not None:
+        payload["source_ids"] = source_ids
+    return {"id": summary_id(project, level, period), "payload": payload}
 
 
-def run_once() -> None:
-    unbaked = fetch_unbaked(limit=200)
-    if not unbaked:
-        print("Self-Baker: nichts zu tun.")
+def current_embed_model() -> str:
+    # Modell der Collection, auf die QDRANT_COLLECTION gerade zeigt; nach einem
+    # Wechsel durch reembed.py ohne Neustart, ohne Registereintrag OPENAI_EMBED_MODEL
+    meta = read_meta(client_qd, QDRANT_META_COLLECTION, QDRANT_COLLECTION)
+    return meta["embed_model"] if meta else EMBED_MODEL
+
+
+@traced("embed_texts")
+def embed_texts(texts: List[str], model: str) -> List[List[float]]:
+    vectors: List[List[float]] = []
+    for start in range(0, len(texts), SELF_BAKER_EMBED_BATCH):
+        resp = client_oa.embeddings.create(
+            model=model,
+            input=texts[start:start + SELF_BAKER_EMBED_BATCH],
+        )
+        record_usage("embed_texts", model, resp.usage)
+        vectors.extend(d.embedding for d in resp.data)
+    return vectors
+
+
+def write_summaries_and_mark_baked(nodes: List[Dict[str, Any]], baked_ids: List[Any]) -> None:
+    """
+    Schreibt alle Summary-Knoten eines Durchlaufs und die baked-Flags der
+    verarbeiteten Notizen in einem einzigen Qdrant-Batch. Dank
+    deterministischer IDs ist eine Wiederholung nach Abbruch idempotent.
+    Der Weg führt an der Memory-API vorbei: ihr lexikalischer Index kennt die
+    Knoten erst nach dem nächsten Neuaufbau (LEXICAL_REBUILD_INTERVAL).
+    Das Modell steht als `embed_model` in der Payload (reembed.py --repair).
+    """
+    operations: List[Any] = []
+    if nodes:
+        model = current_embed_model()
+        vectors = embed_texts([n["payload"]["text"] for n in nodes], model)
+        points = [
+            PointStruct(id=n["id"], vector=vec, payload={**n["payload"], "embed_model": model})
+            for n, vec in zip(nodes, vectors)
+        ]
+        operations.append(UpsertOperation(upsert=PointsList(points=points)))
+    if baked_ids:
+        operations.append(
+            SetPayloadOperation(set_payload=SetPayload(payload={"baked": True}, points=baked_ids))
+        )
+    if not operations:
         return
+    with span("qdrant.batch_update_points"):
+        client_qd.batch_update_points(
+            collection_name=QDRANT_COLLECTION,
+            update_operations=operations,
+            wait=True,
+        )
 
-    by_project: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
-    for e in unbaked:
-        project = e["payload"].get("project", "Allgemein")
-        by_project[project].append(e)
 
-    for project, entries in by_project.items():
-        try:
-            summary = summarize_for_project(project, entries)
-        except Exception as exc:
-            print(f"Fehler beim Zusammenfassen für Projekt {project}: {exc}")
-            continue
+def invalidate_search_cache() -> None:
+    # Schreibzugriffe am API vorbei -> gecachte Suchergebnisse der Memory-API verwerfen
+    try:
+        resp = requests.post(
+            f"{MEMORY_API_URL}/memory/cache/invalidate", headers=trace_headers(), timeout=5
+        )
+        resp.raise_for_status()
+    except requests.RequestException as exc:
+        print(f"Self-Baker: Cache-Invalidierung fehlgeschlagen: {exc}")
+
+
+def bake_day(
+    project: str, day: date, entries: List[Dict[str, Any]], node: Optional[Dict[str, Any]]
+) -> Optional[Dict[str, Any]]:
+    period = day.isoformat()
+    summary = (node or {}).get("text")
+    source_count = (node or {}).get("source_count", 0)
+    source_ids = list((node or {}).get("source_ids", []))
 
+    # bereits eingefaltete Notizen (z.B. nach verlorenem baked-Flag) überspringen
+    folded = set(source_ids)
+    fresh = [e for e in entries if e["id"] not in folded]
+    if not fresh:
+        return None
+
+    # Token-Budget gilt für bisherige Zusammenfassung + neue Notizen
+    budget = max(
+        SELF_BAKER_MAX_PROMPT_TOKENS // 2,
+        SELF_BAKER_MAX_PROMPT_TOKENS - estimate_tokens(summary or ""),
+    )
+    for batch in split_by_token_budget(fresh, budget):
+        texts = [e["payload"].get("text", "") for e in batch]
+        summary = summarize_for_project(project, f"Tag {period}", texts, summary)
+        source_count += len(batch)
+        source_ids.extend(e["id"] for e in batch)
+
+    return summary_node(
+        project,
+        summary,
+        "day",
+        period,
+        parent_id=summary_id(project, "week", week_key(day)),
+        source_count=source_count,
+        source_ids=source_ids,
+    )
+
+
+def bake_week(project: str, key: str, updated_days: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    day_ids = [summary_id(project, "day", d.isoformat()) for d in week_days(key)]
+    days = {**fetch_summaries([i for i in day_ids if i not in updated_days]), **updated_days}
+    texts = [days[i]["text"] for i in day_ids if i in days]
+    summary = summarize_for_project(project, f"Woche {key}", texts)
+    return summary_node(
+        project,
+        summary,
+        "week",
+        key,
+        parent_id=summary_id(project, "project"),
+        source_count=sum(days[i].get("source_count", 0) for i in day_ids if i in days),
+    )
+
+
+def bake_project(
+    project: str, entries: List[Dict[str, Any]]
+) -> Tuple[List[Dict[str, Any]], List[Any]]:
+    """
+    Berechnet die aktualisierten Summary-Knoten eines Projekts. Gibt die
+    Knoten und die IDs der verarbeiteten Notizen zurück; geschrieben wird
+    gesammelt in run_once.
+    """
+    by_day: Dict[date, List[Dict[str, Any]]] = defaultdict(list)
+    for e in entries:
+        by_day[note_day(e["payload"])].append(e)
+
+    day_ids = {day: summary_id(project, "day", day.isoformat()) for day in by_day}
+    existing = fetch_summaries(list(day_ids.values()))
+    nodes: List[Dict[str, Any]] = []
+    baked_ids: List[Any] = []
+    for day in sorted(by_day):
         try:
-            upsert_summary_to_memory(project, summary)
+            node = bake_day(project, day, by_day[day], existing.get(day_ids[day]))
         except Exception as exc:
-            print(f"Fehler beim Schreiben der Summary für Projekt {project}: {exc}")
+            print(f"Fehler beim Backen von Projekt {project}, Tag {day}: {exc}")
             continue
+        if node is not None:
+            nodes.append(node)
+        baked_ids.extend(e["id"] for e in by_day[day])
 
-        ids = [e["id"] for e in entries]
-        mark_baked(ids)
+    if not nodes:
+        return nodes, baked_ids
 
-        print(f"Self-Baker: Projekt {project}, {len(entries)} Einträge gebacken.")
+    try:
+        updated_days = {n["id"]: n["payload"] for n in nodes}
+        weeks = sorted({week_key(day) for day in by_day})
+        week_nodes = [bake_week(project, key, updated_days) for key in weeks]
+
+        project_id = summary_id(project, "project")
+        previous = fetch_summaries([project_id]).get(project_id) or {}
+        scope = f"Gesamtprojekt (aktualisierte Wochen: {', '.join(weeks)})"
+        summary = summarize_for_project(
+            project, scope, [n["payload"]["text"] for n in week_nodes], previous.get("text")
+        )
+        folded = sum(n["payload"]["source_count"] for n in nodes) - sum(
+            existing.get(n["id"], {}).get("source_count", 0) for n in nodes
+        )
+        nodes.extend(week_nodes)
+        nodes.append(
+            summary_node(
+                project,
+                summary,
+                "project",
+                source_count=previous.get("source_count", 0) + folded,
+            )
+        )
+    except Exception as exc:
+        print(f"Fehler beim Aktualisieren der Wochen-/Projekt-Summary für {project}: {exc}")
+
+    return nodes, baked_ids
+
+
+def run_once() -> None:
+    by_project: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    total = 0
+    for page in fetch_unbaked(page_size=SELF_BAKER_PAGE_SIZE):
+        for e in page:
+            project = e["payload"].get("project", "Allgemein")
+            by_project[project].append(e)
+        total += len(page)
+
+    if not total:
+        print("Self-Baker: nichts zu tun.")
+        return
+
+    print(f"Self-Baker: {total} ungebackene Einträge in {len(by_project)} Projekten.")
+
+    # Projekte parallel, innerhalb eines Projekts sequenziell (Baum-Updates)
+    nodes: List[Dict[str, Any]] = []
+    baked_ids: List[Any] = []
+    with ThreadPoolExecutor(max_workers=SELF_BAKER_WORKERS) as pool:
+        # Worker-Threads im Kontext des Durchlaufs -> gleiche Trace-ID
+        futures = {
+            pool.submit(contextvars.copy_context().run, bake_project, project, entries): project
+            for project, entries in by_project.items()
+        }
+        for fut in as_completed(futures):
+            try:
+                project_nodes, project_ids = fut.result()
+            except Exception as exc:
+                # übrige Projekte trotzdem schreiben; dieses kommt im nächsten Durchlauf dran
+                print(f"Self-Baker: Projekt {futures[fut]} fehlgeschlagen: {exc}")
+                continue
+            nodes.extend(project_nodes)
+            baked_ids.extend(project_ids)
+            print(f"Self-Baker: Projekt {futures[fut]}, {len(project_ids)} Einträge gebacken.")
+
+    write_summaries_and_mark_baked(nodes, baked_ids)
+    invalidate_search_cache()
+    print(
+        f"Self-Baker: Durchlauf fertig, {len(baked_ids)}/{total} Einträge gebacken, "
+        f"{len(nodes)} Summary-Knoten geschrieben."
+    )
+
+
+class BakeTrigger:
+    """
+    Sammelt Benachrichtigungen über neue ungebackene Einträge und entscheidet,
+    wann der nächste Durchlauf startet: nach einer Ruhephase (Debounce), wenn
+    genug Einträge anstehen (max. Batchgröße), spätestens nach `max_delay`
+    seit der ersten Meldung oder nach Ablauf des Polling-Intervalls.
+    """
+
+    def __init__(self, debounce: float, max_delay: float, max_batch: int) -> None:
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self._cond = threading.Condition()
+        self._pending = 0
+        self._first_at: Optional[float] = None
+        self._last_at: Optional[float] = None
+
+    def notify(self, count: int = 1) -> None:
+        with self._cond:
+            now = time.monotonic()
+            self._pending += max(1, count)
+            self._last_at = now
+            if self._first_at is None:
+                self._first_at = now
+            self._cond.notify_all()
+
+    def wait(self, interval: float) -> str:
+        deadline = time.monotonic() + interval
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if self._pending >= self.max_batch:
+                    reason = "max_batch"
+                    break
+                if self._pending and now - self._last_at >= self.debounce:
+                    reason = "debounce"
+                    break
+                if self._pending and now - self._first_at >= self.max_delay:
+                    reason = "max_delay"
+                    break
+                if now >= deadline:
+                    reason = "interval"
+                    break
+
+                wake = deadline
+                if self._pending:
+                    wake = min(wake, self._last_at + self.debounce, self._first_at + self.max_delay)
+                self._cond.wait(timeout=max(0.0, wake - now))
+
+            self._pending = 0
+            self._first_at = None
+            self._last_at = None
+            return reason
+
+
+def start_notify_server(trigger: BakeTrigger, port: int) -> ThreadingHTTPServer:
+    class NotifyHandler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:
+            if self.path != "/notify":
+                self.send_error(404)
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                body = json.loads(self.rfile.read(length) or b"{}")
+                count = int(body.get("count", 1))
+            except (ValueError, AttributeError):
+                self.send_error(400)
+                return
+            trigger.notify(count)
+            self.send_response(204)
+            self.end_headers()
+
+        def do_GET(self) -> None:
+            if self.path == "/metrics":
+                body, content_type = metrics_payload()
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            if self.path != "/health":
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(b'{"status": "ok"}')
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), NotifyHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Self-Baker: warte auf Benachrichtigungen an Port {port}.")
+    return server
 
 
 def main_loop() -> None:
     interval_seconds = int(os.getenv("SELF_BAKER_INTERVAL", "600"))
+    trigger = BakeTrigger(SELF_BAKER_DEBOUNCE, SELF_BAKER_MAX_DELAY, SELF_BAKER_MAX_BATCH)
+    if SELF_BAKER_PORT:
+        start_notify_server(trigger, SELF_BAKER_PORT)
+
     while True:
         try:
-            run_once()
+            with span("bake_run"):
+                run_once()
         except Exception as exc:
             print(f"Self-Baker Fehler: {exc}")
-        time.sleep(interval_seconds)
+        reason = trigger.wait(interval_seconds)
+        print(f"Self-Baker: neuer Durchlauf ({reason}).")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,61 @@
+"""
+Hält die Module, die mehrere Dienste als Kopie enthalten, identisch. Jeder
+Dienst baut sein Image aus dem eigenen Verzeichnis (und die Memory-API
+bindet es als /app ein), daher liegt die Datei in jedem Dienst selbst.
+Maßgeblich ist die Fassung in memory-api/:
+
+    python sync_shared.py           # Kopien aus memory-api/ aktualisieren
+    python sync_shared.py --check   # Exit-Code 1, wenn eine Kopie abweicht
+
+Nach jeder Änderung an einer der Dateien ausführen (bzw. --check vor dem Commit).
+"""
+
+import argparse
+import shutil
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent
+SOURCE_DIR = "memory-api"
+
+# Datei -> Dienste mit einer Kopie
+SHARED: Dict[str, List[str]] = {
+    "telemetry.py": ["mcp", "self-baker"],
+    "collection_meta.py": ["self-baker"],
+}
+
+
+def diverged() -> List[Path]:
+    result = []
+    for name, services in SHARED.items():
+        source = (ROOT / SOURCE_DIR / name).read_bytes()
+        for service in services:
+            copy = ROOT / service / name
+            if not copy.exists() or copy.read_bytes() != source:
+                result.append(copy)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--check", action="store_true", help="nur prüfen, nichts kopieren")
+    args = parser.parse_args()
+
+    stale = diverged()
+    if args.check:
+        for path in stale:
+            print(f"{path.relative_to(ROOT)} weicht von {SOURCE_DIR}/{path.name} ab")
+        sys.exit(1 if stale else 0)
+
+    for path in stale:
+        shutil.copyfile(ROOT / SOURCE_DIR / path.name, path)
+        print(f"{path.relative_to(ROOT)} aktualisiert")
+    if not stale:
+        print("Alle Kopien aktuell.")
+
+
+if __name__ == "__main__":
+    main()